@@ -0,0 +1,35 @@
+"""Shared dependencies for API route handlers."""
+
+import math
+
+from fastapi import HTTPException
+
+from localrag.core import LocalRAG
+from localrag.utils.admission import AdmissionError
+
+# Lazy-initialized RAG instance, shared by all routes so that admission
+# limits apply to the whole process rather than per router
+_rag: LocalRAG | None = None
+
+
+def get_rag() -> LocalRAG:
+    global _rag
+    if _rag is None:
+        _rag = LocalRAG()
+    return _rag
+
+
+def shutdown_rag(timeout: float) -> bool:
+    """Drain in-flight model calls of the shared instance, if one was created."""
+    if _rag is None:
+        return True
+    return _rag.drain(timeout)
+
+
+def admission_http_error(error: AdmissionError) -> HTTPException:
+    """Translate an admission rejection into a 429/503 with Retry-After."""
+    return HTTPException(
+        status_code=error.status_code,
+        detail=str(error),
+        headers={"Retry-After": str(math.ceil(error.retry_after))},
+    )
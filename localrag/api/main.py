@@ -1,14 +1,17 @@
 """FastAPI application entry point."""
 
+import argparse
 from contextlib import asynccontextmanager
 
 import uvicorn
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 
 from localrag import __version__
 from localrag.config import settings
+from localrag.api.deps import get_rag, shutdown_rag
 from localrag.api.routes import documents, query, health
 
 
@@ -16,8 +19,14 @@ from localrag.api.routes import documents, query, health
 async def lifespan(app: FastAPI):
     """Application startup and shutdown."""
     logger.info(f"Starting LocalRAG v{__version__} | mode={settings.mode.value}")
+    if settings.api_preload:
+        # Open the index and load the model before the first request arrives
+        rag = await run_in_threadpool(get_rag)
+        await run_in_threadpool(rag.warm_up)
     yield
-    logger.info("Shutting down LocalRAG")
+    logger.info("Shutting down LocalRAG, draining in-flight requests")
+    if not await run_in_threadpool(shutdown_rag, settings.api_shutdown_timeout):
+        logger.warning("Shutdown timeout reached with model calls still running")
 
 
 app = FastAPI(
@@ -42,10 +51,34 @@ app.include_router(documents.router, prefix="/api/v1/documents", tags=["Document
 app.include_router(query.router, prefix="/api/v1", tags=["Query"])
 
 
-if __name__ == "__main__":
+def serve(workers: int | None = None, reload: bool = False) -> None:
+    """Run the API server.
+
+    In production mode ``workers`` processes (default ``settings.api_workers``)
+    share the on-disk index; ingestion is serialized across them by the
+    index write lock. ``reload`` starts a single auto-reloading dev server.
+    """
+    if reload:
+        uvicorn.run(
+            "localrag.api.main:app",
+            host=settings.api_host,
+            port=settings.api_port,
+            reload=True,
+        )
+        return
+
     uvicorn.run(
         "localrag.api.main:app",
         host=settings.api_host,
         port=settings.api_port,
-        reload=True,
+        workers=workers or settings.api_workers,
+        timeout_graceful_shutdown=int(settings.api_shutdown_timeout),
     )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the LocalRAG API server")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: api_workers)")
+    parser.add_argument("--reload", action="store_true", help="Auto-reload for development")
+    args = parser.parse_args()
+    serve(workers=args.workers, reload=args.reload)
@@ -6,6 +6,12 @@ from pydantic import BaseModel, Field
 class QueryRequest(BaseModel):
     question: str = Field(..., description="Natural language question", min_length=1)
     top_k: int = Field(default=5, ge=1, le=20, description="Number of chunks to retrieve")
+    timeout_ms: int | None = Field(
+        default=None,
+        ge=100,
+        le=600_000,
+        description="Latency budget in milliseconds; defaults to the server's query_timeout",
+    )
 
 
 class SourceResponse(BaseModel):
@@ -20,6 +26,9 @@ class QueryResponse(BaseModel):
     sources: list[SourceResponse]
     model: str
     mode: str
+    degraded: bool = Field(
+        default=False, description="The answer timed out; only the sources are returned"
+    )
 
 
 class DocumentInfo(BaseModel):
@@ -33,12 +42,35 @@ class UploadResponse(BaseModel):
     files_processed: int
     chunks_created: int
     chunks_stored: int
+    chunks_deduplicated: int = 0
+    pages_parsed: int = 0
+    parse_seconds: float = 0.0
+    pages_per_second: float = 0.0
+    parse_cache_hits: int = 0
+
+
+class AdmissionStats(BaseModel):
+    max_concurrent: int
+    max_queue: int
+    active: int
+    queued: int
+    queued_by_priority: dict[str, int]
+    admitted: int
+    rejected: int
+    timed_out: int
+    wait_ms_p50: float
+    wait_ms_p99: float
+    avg_service_ms: float
 
 
 class StatsResponse(BaseModel):
     collection: str
     total_chunks: int
     storage_path: str
+    index: dict[str, str | int | None] = Field(default_factory=dict)
+    shards: dict[str, int] = Field(default_factory=dict)
+    parents: dict[str, int] = Field(default_factory=dict)
+    admission: dict[str, AdmissionStats] = Field(default_factory=dict)
 
 
 class HealthResponse(BaseModel):
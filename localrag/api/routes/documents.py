@@ -4,24 +4,16 @@ import shutil
 from pathlib import Path
 
 from fastapi import APIRouter, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from loguru import logger
 
+from localrag.api.deps import admission_http_error, get_rag
 from localrag.api.models import StatsResponse, UploadResponse
 from localrag.config import settings
-from localrag.core import LocalRAG
+from localrag.utils.admission import AdmissionError
 
 router = APIRouter()
 
-# Lazy-initialized RAG instance
-_rag: LocalRAG | None = None
-
-
-def _get_rag() -> LocalRAG:
-    global _rag
-    if _rag is None:
-        _rag = LocalRAG()
-    return _rag
-
 
 @router.post("/upload", response_model=UploadResponse)
 async def upload_document(file: UploadFile):
@@ -41,13 +33,15 @@ async def upload_document(file: UploadFile):
         logger.info(f"Uploaded: {file.filename}")
 
         # Ingest the document
-        rag = _get_rag()
-        result = rag.ingest(file_path)
+        rag = get_rag()
+        result = await run_in_threadpool(rag.ingest, file_path)
 
         return UploadResponse(
             message=f"Successfully ingested {file.filename}",
             **result,
         )
+    except AdmissionError as e:
+        raise admission_http_error(e)
     except Exception as e:
         logger.error(f"Upload failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -56,5 +50,5 @@ async def upload_document(file: UploadFile):
 @router.get("/stats", response_model=StatsResponse)
 async def get_stats():
     """Get collection statistics."""
-    rag = _get_rag()
+    rag = get_rag()
     return StatsResponse(**rag.get_stats())
@@ -1,29 +1,29 @@
 """Query endpoint — ask questions across ingested documents."""
 
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from loguru import logger
 
+from localrag.api.deps import admission_http_error, get_rag
 from localrag.api.models import QueryRequest, QueryResponse, SourceResponse
-from localrag.core import LocalRAG
+from localrag.utils.admission import AdmissionError
 
 router = APIRouter()
 
-_rag: LocalRAG | None = None
-
-
-def _get_rag() -> LocalRAG:
-    global _rag
-    if _rag is None:
-        _rag = LocalRAG()
-    return _rag
-
 
 @router.post("/query", response_model=QueryResponse)
 async def query_documents(request: QueryRequest):
     """Ask a question across all ingested documents."""
     try:
-        rag = _get_rag()
-        answer = rag.query(question=request.question, top_k=request.top_k)
+        rag = get_rag()
+        if request.timeout_ms is not None:
+            timeout = request.timeout_ms / 1000
+        else:
+            timeout = rag.settings.query_timeout or None
+        # Run off the event loop so queued requests don't block the server
+        answer = await run_in_threadpool(
+            rag.query, question=request.question, top_k=request.top_k, timeout=timeout
+        )
 
         return QueryResponse(
             answer=answer.text,
@@ -38,7 +38,10 @@ async def query_documents(request: QueryRequest):
             ],
             model=answer.model,
             mode=answer.mode,
+            degraded=answer.degraded,
         )
+    except AdmissionError as e:
+        raise admission_http_error(e)
     except Exception as e:
         logger.error(f"Query failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
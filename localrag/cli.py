@@ -0,0 +1,402 @@
+"""Command-line interface for LocalRAG."""
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from pathlib import Path
+
+from loguru import logger
+
+from localrag.core import LocalRAG
+from localrag.ingestion.pipeline import list_supported_files
+from localrag.utils.admission import AdmissionError, Priority
+
+
+def _print_json(data: dict) -> None:
+    print(json.dumps(data, indent=2, default=str))
+
+
+def _read_questions(args: argparse.Namespace) -> list[str]:
+    """Questions from the command line, or one per line from ``--file``."""
+    questions = list(args.question)
+    if args.file:
+        lines = Path(args.file).read_text(encoding="utf-8").splitlines()
+        questions.extend(line.strip() for line in lines if line.strip())
+    if not questions:
+        raise ValueError("Give a question or --file with one question per line")
+    return questions
+
+
+def _cmd_ingest(rag: LocalRAG, args: argparse.Namespace) -> None:
+    path = Path(args.path)
+    if not path.exists():
+        raise FileNotFoundError(f"Path not found: {path}")
+
+    progress = None
+    if not args.no_progress:
+        from tqdm import tqdm
+
+        total = len(list_supported_files(path)) if path.is_dir() else 1
+        progress = tqdm(total=total, unit="file", file=sys.stderr, dynamic_ncols=True)
+
+    def report(counts: dict) -> None:
+        progress.update(counts["files_processed"] - progress.n)
+        progress.set_postfix(chunks=counts["chunks_stored"])
+
+    try:
+        summary = rag.ingest(path, progress=report if progress else None)
+    finally:
+        if progress is not None:
+            progress.close()
+    _print_json(summary)
+
+
+def _cmd_watch(rag: LocalRAG, args: argparse.Namespace) -> None:
+    def report(change: dict) -> None:
+        print(json.dumps(change), flush=True)
+
+    try:
+        rag.watch(
+            args.paths,
+            debounce=args.debounce,
+            poll_interval=args.interval,
+            use_events=False if args.poll else None,
+            on_change=report,
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+def _cmd_query(rag: LocalRAG, args: argparse.Namespace) -> None:
+    questions = _read_questions(args)
+    if len(questions) == 1 and not args.file:
+        answer = rag.query(questions[0], args.top_k, timeout=args.timeout)
+        _print_json({"question": questions[0], **asdict(answer)})
+        return
+
+    # Batches print one JSON object per line so results stream as they finish
+    for question in questions:
+        try:
+            answer = rag.query(question, args.top_k, priority=Priority.BATCH, timeout=args.timeout)
+            record = asdict(answer)
+        except AdmissionError as e:
+            record = {"error": str(e)}
+        print(json.dumps({"question": question, **record}, default=str), flush=True)
+
+
+def _cmd_stats(rag: LocalRAG, args: argparse.Namespace) -> None:
+    _print_json(rag.get_stats())
+
+
+def _cmd_reset(rag: LocalRAG, args: argparse.Namespace) -> None:
+    if not args.yes:
+        try:
+            confirmed = input("Delete all ingested documents? [y/N] ").strip().lower() == "y"
+        except EOFError:
+            confirmed = False
+        if not confirmed:
+            raise RuntimeError("Reset aborted; pass --yes to skip the prompt")
+    rag.reset()
+    _print_json({"reset": True})
+
+
+def _cmd_bench(rag: LocalRAG, args: argparse.Namespace) -> None:
+    questions = _read_questions(args) * args.repeat
+    if not args.cold:
+        rag.warm_up()
+    stages = {"retrieve": lambda q: rag.retrieve(q, args.top_k)}
+    if not args.retrieval_only:
+        stages["query"] = lambda q: rag.query(q, args.top_k)
+
+    report = {"queries": len(questions), "concurrency": args.concurrency}
+    for name, call in stages.items():
+        report[name] = _bench_stage(call, questions, args.concurrency)
+    report["admission"] = rag.get_stats()["admission"]
+    _print_json(report)
+
+
+def _bench_stage(call, questions: list[str], concurrency: int) -> dict:
+    """Run ``call`` over the questions and summarize latency and throughput."""
+
+    def timed(question: str) -> float | None:
+        started = time.perf_counter()
+        try:
+            call(question)
+        except AdmissionError:
+            return None
+        return (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = sorted(ms for ms in pool.map(timed, questions) if ms is not None)
+    wall = time.perf_counter() - started
+
+    def pct(q: float) -> float:
+        return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))], 1)
+
+    return {
+        "ok": len(latencies),
+        "rejected": len(questions) - len(latencies),
+        "qps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "latency_ms_mean": round(sum(latencies) / len(latencies), 1) if latencies else None,
+        "latency_ms_p50": pct(0.50) if latencies else None,
+        "latency_ms_p95": pct(0.95) if latencies else None,
+        "latency_ms_p99": pct(0.99) if latencies else None,
+    }
+
+
+def _cmd_snapshot_export(rag: LocalRAG, args: argparse.Namespace) -> None:
+    _print_json(rag.export_snapshot(args.path))
+
+
+def _cmd_snapshot_import(rag: LocalRAG, args: argparse.Namespace) -> None:
+    _print_json(rag.import_snapshot(args.path, replace=args.replace))
+
+
+def _cmd_index_calibrate(rag: LocalRAG, args: argparse.Namespace) -> None:
+    build_params = []
+    for spec in args.build:
+        m, _, construction_ef = spec.partition(":")
+        build_params.append((int(m), int(construction_ef)))
+
+    _print_json(
+        rag.calibrate_index(
+            search_efs=[int(v) for v in args.search_ef.split(",")],
+            build_params=build_params,
+            sample_size=args.queries,
+            k=args.k,
+            target_recall=args.target_recall,
+        )
+    )
+
+
+def _cmd_shard_list(rag: LocalRAG, args: argparse.Namespace) -> None:
+    _print_json(rag.get_stats().get("shards", {}))
+
+
+def _cmd_shard_drop(rag: LocalRAG, args: argparse.Namespace) -> None:
+    _print_json(rag.drop_shard(args.shard))
+
+
+def _cmd_shard_rebuild(rag: LocalRAG, args: argparse.Namespace) -> None:
+    _print_json(rag.rebuild_shard(args.shard, args.path))
+
+
+def _cmd_shard_retain(rag: LocalRAG, args: argparse.Namespace) -> None:
+    _print_json({"dropped": rag.apply_retention(args.max_age_years)})
+
+
+def _parse_grid(specs: list[str]) -> dict[str, list]:
+    """Parse ``field=v1,v2`` specs into a sweep grid, coercing numbers."""
+    grid = {}
+    for spec in specs:
+        name, sep, values = spec.partition("=")
+        if not sep or not values:
+            raise ValueError(f"Invalid --grid {spec!r}, expected field=v1,v2")
+        grid[name.strip()] = [_coerce(v.strip()) for v in values.split(",")]
+    return grid
+
+
+def _coerce(value: str):
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return {"true": True, "false": False}.get(value.lower(), value)
+
+
+def _cmd_eval_sweep(args: argparse.Namespace) -> None:
+    from localrag.evaluation.sweep import load_questions, run_sweep, select_cheapest
+
+    results = run_sweep(
+        questions=load_questions(Path(args.questions)),
+        corpus=Path(args.corpus),
+        grid=_parse_grid(args.grid),
+        work_dir=Path(args.work_dir) if args.work_dir else None,
+        generate=args.generate,
+    )
+    best = select_cheapest(
+        results,
+        min_recall=args.min_recall,
+        min_mrr=args.min_mrr,
+        min_ndcg=args.min_ndcg,
+        cost=args.cost,
+    )
+    _print_json(
+        {
+            "results": [r.to_dict() for r in results],
+            "recommended": best.config if best else None,
+        }
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="localrag",
+        description="Privacy-first document intelligence.",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="Show debug logging")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="Ingest a file or directory directly")
+    ingest.add_argument("path", help="File or directory of documents")
+    ingest.add_argument(
+        "--workers", type=int, dest="ingest_workers", help="Files parsed concurrently"
+    )
+    ingest.add_argument(
+        "--batch-size", type=int, dest="ingest_batch_size", help="Chunks embedded per batch"
+    )
+    ingest.add_argument("--no-progress", action="store_true", help="Hide the progress bar")
+    ingest.set_defaults(
+        handler=_cmd_ingest, settings_fields=("ingest_workers", "ingest_batch_size")
+    )
+
+    watch = commands.add_parser(
+        "watch", help="Keep the index in sync with directories as files change"
+    )
+    watch.add_argument("paths", nargs="+", help="Directories to watch")
+    watch.add_argument("--debounce", type=float, help="Seconds a file must be quiet")
+    watch.add_argument("--poll", action="store_true", help="Poll instead of using file events")
+    watch.add_argument("--interval", type=float, help="Seconds between polls")
+    watch.set_defaults(handler=_cmd_watch)
+
+    query = commands.add_parser("query", help="Ask questions over the ingested documents")
+    query.add_argument("question", nargs="*", help="Question(s) to ask")
+    query.add_argument("-f", "--file", help="File with one question per line; prints JSON Lines")
+    query.add_argument("-k", "--top-k", type=int, help="Chunks to retrieve")
+    query.add_argument(
+        "--timeout", type=float, help="Seconds per question before returning sources only"
+    )
+    query.set_defaults(handler=_cmd_query)
+
+    stats = commands.add_parser("stats", help="Show index and admission statistics")
+    stats.set_defaults(handler=_cmd_stats)
+
+    reset = commands.add_parser("reset", help="Delete all ingested documents")
+    reset.add_argument("-y", "--yes", action="store_true", help="Do not ask for confirmation")
+    reset.set_defaults(handler=_cmd_reset)
+
+    bench = commands.add_parser("bench", help="Measure query latency and throughput")
+    bench.add_argument("question", nargs="*", help="Question(s) to run")
+    bench.add_argument("-f", "--file", help="File with one question per line")
+    bench.add_argument("-k", "--top-k", type=int, help="Chunks to retrieve")
+    bench.add_argument("--repeat", type=int, default=1, help="Times to run each question")
+    bench.add_argument("--concurrency", type=int, default=1, help="Concurrent queries")
+    bench.add_argument(
+        "--retrieval-only", action="store_true", help="Skip generation; time retrieval only"
+    )
+    bench.add_argument("--cold", action="store_true", help="Don't preload the model before timing")
+    bench.set_defaults(handler=_cmd_bench)
+
+    snapshot = commands.add_parser("snapshot", help="Export or import an index snapshot")
+    snapshot_commands = snapshot.add_subparsers(dest="snapshot_command", required=True)
+
+    export = snapshot_commands.add_parser("export", help="Write the index to a snapshot file")
+    export.add_argument("path", help="Destination .npz file")
+    export.set_defaults(handler=_cmd_snapshot_export)
+
+    load = snapshot_commands.add_parser("import", help="Load a snapshot without re-embedding")
+    load.add_argument("path", help="Snapshot .npz file")
+    load.add_argument("--replace", action="store_true", help="Delete all current documents first")
+    load.set_defaults(handler=_cmd_snapshot_import)
+
+    index = commands.add_parser("index", help="Vector index maintenance")
+    index_commands = index.add_subparsers(dest="index_command", required=True)
+
+    calibrate = index_commands.add_parser(
+        "calibrate", help="Measure recall/latency of HNSW settings on the live collection"
+    )
+    calibrate.add_argument(
+        "--search-ef", default="16,32,64,128,256", help="Comma-separated search_ef candidates"
+    )
+    calibrate.add_argument(
+        "--build",
+        action="append",
+        default=[],
+        metavar="M:CONSTRUCTION_EF",
+        help="Also try these build parameters on a scratch copy; repeatable",
+    )
+    calibrate.add_argument("--queries", type=int, default=200, help="Sampled query vectors")
+    calibrate.add_argument("-k", type=int, default=10, help="Neighbours compared")
+    calibrate.add_argument("--target-recall", type=float, default=0.95)
+    calibrate.set_defaults(handler=_cmd_index_calibrate)
+
+    shard = commands.add_parser("shard", help="Manage shard collections")
+    shard_commands = shard.add_subparsers(dest="shard_command", required=True)
+
+    shard_list = shard_commands.add_parser("list", help="Show chunk counts per shard")
+    shard_list.set_defaults(handler=_cmd_shard_list)
+
+    drop = shard_commands.add_parser("drop", help="Delete every chunk in one shard")
+    drop.add_argument("shard", help="Shard collection name")
+    drop.set_defaults(handler=_cmd_shard_drop)
+
+    rebuild = shard_commands.add_parser(
+        "rebuild", help="Drop a shard and re-ingest only the documents routed to it"
+    )
+    rebuild.add_argument("shard", help="Shard collection name")
+    rebuild.add_argument("path", help="File or directory to ingest from")
+    rebuild.set_defaults(handler=_cmd_shard_rebuild)
+
+    retain = shard_commands.add_parser(
+        "retain", help="Drop date shards older than a number of years"
+    )
+    retain.add_argument("max_age_years", type=int, help="Years of documents to keep")
+    retain.set_defaults(handler=_cmd_shard_retain)
+
+    evaluate = commands.add_parser("eval", help="Evaluate retrieval quality and cost")
+    eval_commands = evaluate.add_subparsers(dest="eval_command", required=True)
+
+    sweep = eval_commands.add_parser("sweep", help="Sweep settings over a grid")
+    sweep.add_argument("questions", help="JSONL file of {question, relevant} records")
+    sweep.add_argument("corpus", help="File or directory to index")
+    sweep.add_argument(
+        "--grid",
+        action="append",
+        default=[],
+        metavar="FIELD=V1,V2",
+        help="Settings values to sweep; repeat for more fields",
+    )
+    sweep.add_argument("--min-recall", type=float, default=0.0)
+    sweep.add_argument("--min-mrr", type=float, default=0.0)
+    sweep.add_argument("--min-ndcg", type=float, default=0.0)
+    sweep.add_argument(
+        "--cost",
+        default="prompt_tokens",
+        choices=["prompt_tokens", "latency_ms_p50", "latency_ms_p95", "index_bytes"],
+        help="What 'cheapest' minimizes",
+    )
+    sweep.add_argument("--work-dir", help="Keep the per-configuration indexes here")
+    sweep.add_argument("--generate", action="store_true", help="Include generation latency")
+    sweep.set_defaults(handler=_cmd_eval_sweep, needs_rag=False)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    logger.remove()
+    logger.add(sys.stderr, level="DEBUG" if args.verbose else "WARNING")
+
+    overrides = {
+        name: getattr(args, name)
+        for name in getattr(args, "settings_fields", ())
+        if getattr(args, name) is not None
+    }
+    try:
+        if getattr(args, "needs_rag", True):
+            args.handler(LocalRAG(**overrides), args)
+        else:
+            args.handler(args)
+    except (FileNotFoundError, ValueError, RuntimeError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
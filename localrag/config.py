@@ -2,6 +2,7 @@
 
 from enum import Enum
 from pathlib import Path
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -42,24 +43,86 @@ class Settings(BaseSettings):
     chunk_size: int = 512
     chunk_overlap: int = 50
 
+    # Small-to-big retrieval. With parent_chunk_size > 0, chunk_size-sized
+    # chunks are embedded but the LLM is given the parent sections (up to
+    # parent_chunk_size characters, within one page) they were cut from, or
+    # with parent_window > 0 only that many characters either side of each hit
+    parent_chunk_size: int = 0
+    parent_window: int = 0
+
+    # Parsing
+    parse_workers: int = 4
+    pdf_parallel_min_pages: int = 64
+    use_parse_cache: bool = True
+    csv_group_rows: bool = False
+    strip_page_boilerplate: bool = True
+
+    # Ingestion
+    ingest_batch_size: int = 256
+    ingest_workers: int = 1
+
+    # Deduplication: near-duplicate chunks (estimated Jaccard similarity at or
+    # above the threshold) are stored once and list every source
+    dedup_chunks: bool = True
+    dedup_threshold: float = 0.9
+
+    # Watch folders
+    watch_debounce: float = 2.0
+    watch_poll_interval: float = 1.0
+
     # Retrieval
     top_k: int = 5
     use_hybrid_search: bool = True
     use_reranker: bool = False
 
+    # Vector index (HNSW). Space, M and construction_ef only take effect when
+    # the collection is created; search_ef is also applied to existing ones
+    hnsw_space: Literal["l2", "cosine", "ip"] = "l2"
+    hnsw_m: int = 16
+    hnsw_construction_ef: int = 100
+    hnsw_search_ef: int = 100
+
+    # Sharding. "source" hashes files over num_shards collections, "date"
+    # keeps one collection per year of the document date
+    shard_by: Literal["none", "source", "date"] = "none"
+    num_shards: int = 4
+    shard_search_workers: int = 8
+
     # Storage
     chroma_path: Path = Path("./data/chroma")
     upload_path: Path = Path("./data/uploads")
+    parse_cache_path: Path = Path("./data/parse_cache")
+    watch_cursor_path: Path = Path("./data/watch_cursor.json")
     collection_name: str = "localrag_docs"
 
     # API
     api_host: str = "0.0.0.0"
     api_port: int = 8000
     api_workers: int = 1
+    api_preload: bool = True
+    api_shutdown_timeout: float = 30.0
     cors_origins: list[str] = ["*"]
 
+    # Admission control (concurrency limits in front of the model backend)
+    llm_max_concurrency: int = 2
+    embed_max_concurrency: int = 4
+    admission_queue_size: int = 32
+    admission_timeout: float = 30.0
+
+    # Query deadlines. API queries get query_timeout seconds unless the request
+    # sets its own budget (0 = no deadline). Generation is skipped when less than
+    # query_min_generation seconds are left after retrieval, and the sources are
+    # returned without an answer
+    query_timeout: float = 8.0
+    query_min_generation: float = 1.0
+
     # Ollama
     ollama_base_url: str = "http://localhost:11434"
+    ollama_keep_alive: str = "30m"  # how long the model stays loaded; "-1m" = forever
+    ollama_preload: bool = True
+    ollama_num_ctx: int = 4096  # smallest context window; doubled for larger prompts
+    ollama_num_ctx_max: int = 32768
+    ollama_timeout: float = 300.0
 
     def validate_cloud_mode(self) -> None:
         """Ensure API keys are set when using cloud mode."""
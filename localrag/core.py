@@ -1,14 +1,34 @@
 """Core LocalRAG orchestrator — ties together ingestion, retrieval, and generation."""
 
+import contextvars
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
 from dataclasses import dataclass, field
+from datetime import date
+from itertools import islice
 from pathlib import Path
 
+from langchain_core.documents import Document
 from loguru import logger
 
 from localrag.config import LLMMode, Settings, settings
-from localrag.ingestion.pipeline import IngestionPipeline
+from localrag.ingestion.docstore import expand_to_parents
+from localrag.ingestion.pipeline import IngestionPipeline, ParseStats
 from localrag.retrieval.engine import RetrievalEngine
 from localrag.llm.factory import create_llm_client
+from localrag.llm.prompts import format_context
+from localrag.utils.admission import (
+    AdmissionController,
+    AdmissionTimeoutError,
+    Priority,
+    priority_scope,
+)
+from localrag.utils.deadline import Deadline, DeadlineExceededError, deadline_scope
+from localrag.utils.locking import FileSemaphore
 
 
 @dataclass
@@ -23,12 +43,18 @@ class Source:
 
 @dataclass
 class Answer:
-    """A response from LocalRAG with source citations."""
+    """A response from LocalRAG with source citations.
+
+    ``degraded`` is set when the deadline ran out before an answer could be
+    generated; ``text`` then says so and ``sources`` still lists the
+    retrieved passages.
+    """
 
     text: str
     sources: list[Source] = field(default_factory=list)
     model: str = ""
     mode: str = ""
+    degraded: bool = False
 
 
 class LocalRAG:
@@ -63,55 +89,158 @@ class LocalRAG:
             f"llm={self.settings.llm_model} | embeddings={self.settings.embed_model}"
         )
 
+        # Slots are shared by every process using this index (API workers,
+        # CLI bulk loads, the watcher), so the limits hold for the backend
+        slots = self.settings.chroma_path / ".admission"
+        self._llm_admission = AdmissionController(
+            "llm",
+            max_concurrent=self.settings.llm_max_concurrency,
+            max_queue=self.settings.admission_queue_size,
+            timeout=self.settings.admission_timeout,
+            shared=FileSemaphore(slots / "llm", self.settings.llm_max_concurrency),
+        )
+        self._embed_admission = AdmissionController(
+            "embeddings",
+            max_concurrent=self.settings.embed_max_concurrency,
+            max_queue=self.settings.admission_queue_size,
+            timeout=self.settings.admission_timeout,
+            shared=FileSemaphore(slots / "embeddings", self.settings.embed_max_concurrency),
+        )
+
         self._ingestion = IngestionPipeline(self.settings)
-        self._retrieval = RetrievalEngine(self.settings)
+        self._retrieval = RetrievalEngine(self.settings, admission=self._embed_admission)
         self._llm = create_llm_client(self.settings)
-
-    def ingest(self, path: str | Path, **kwargs) -> dict:
+        self._generation_lock = threading.Lock()
+        self._generation_pool: ThreadPoolExecutor | None = None
+
+    def ingest(
+        self,
+        path: str | Path,
+        progress: Callable[[dict], None] | None = None,
+        **kwargs,
+    ) -> dict:
         """Ingest documents from a file or directory.
 
         Args:
             path: Path to a single file or directory of documents.
+            progress: Called after each stored batch with the running
+                ``files_processed`` / ``chunks_stored`` counts.
 
         Returns:
             Summary dict with counts and any errors.
         """
         path = Path(path)
         logger.info(f"Ingesting documents from: {path}")
-
+        return self._ingest(path, progress=progress)
+
+    def _ingest(
+        self,
+        path: Path,
+        shard: str | None = None,
+        progress: Callable[[dict], None] | None = None,
+    ) -> dict:
+        parse_stats = ParseStats()
         if path.is_file():
-            documents = self._ingestion.process_file(path)
+            documents = self._ingestion.iter_file(path, parse_stats)
         elif path.is_dir():
-            documents = self._ingestion.process_directory(path)
+            documents = self._ingestion.iter_directory(
+                path, parse_stats, workers=self.settings.ingest_workers
+            )
         else:
             raise FileNotFoundError(f"Path not found: {path}")
 
-        # Store chunks in vector DB
-        stored = self._retrieval.add_documents(documents)
+        if shard is not None:
+            documents = (d for d in documents if self._retrieval.shard_for(d.metadata) == shard)
+
+        # Store chunks in vector DB in bounded batches so large inputs stream
+        # through in constant memory; bulk embedding yields to interactive queries
+        sources: set[str] = set()
+        created = stored = 0
+        with priority_scope(Priority.INGEST):
+            for batch in _batched(documents, self.settings.ingest_batch_size):
+                sources.update(d.metadata.get("source", "") for d in batch)
+                created += len(batch)
+                # Parents first, so a chunk is never searchable without its parent
+                self._ingestion.store_parents(batch)
+                stored += self._retrieval.add_documents(batch)
+                if progress is not None:
+                    progress({"files_processed": len(sources), "chunks_stored": stored})
 
         summary = {
-            "files_processed": len(set(d.metadata.get("source", "") for d in documents)),
-            "chunks_created": len(documents),
+            "files_processed": len(sources),
+            "chunks_created": created,
             "chunks_stored": stored,
+            "chunks_deduplicated": created - stored,
+            "pages_parsed": parse_stats.pages,
+            "parse_seconds": round(parse_stats.seconds, 3),
+            "pages_per_second": parse_stats.pages_per_second,
+            "parse_cache_hits": parse_stats.cache_hits,
         }
         logger.info(f"Ingestion complete: {summary}")
         return summary
 
-    def query(self, question: str, top_k: int | None = None) -> Answer:
+    def query(
+        self,
+        question: str,
+        top_k: int | None = None,
+        priority: Priority = Priority.INTERACTIVE,
+        timeout: float | None = None,
+    ) -> Answer:
         """Ask a question across all ingested documents.
 
         Args:
             question: Natural language question.
             top_k: Number of chunks to retrieve (overrides settings).
+            priority: Admission priority for the embedding and generation
+                calls; batch jobs should pass ``Priority.BATCH``.
+            timeout: Latency budget in seconds. Admission waits are capped
+                by it, the answer is shortened to fit, and if it cannot be
+                generated in time the retrieved sources are returned with
+                ``degraded`` set. No limit by default.
 
         Returns:
             Answer with text and source citations.
+
+        Raises:
+            AdmissionError: If the model backend is saturated.
         """
         k = top_k or self.settings.top_k
-        logger.info(f"Query: '{question}' | top_k={k}")
+        logger.info(f"Query: '{question}' | top_k={k} | timeout={timeout}")
+
+        deadline = Deadline.after(timeout) if timeout else None
+        with priority_scope(priority), deadline_scope(deadline):
+            return self._answer(question, k, deadline)
+
+    def retrieve(
+        self,
+        question: str,
+        top_k: int | None = None,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> list[Document]:
+        """Return the chunks a query would use as context, without generating.
+
+        Args:
+            question: Natural language question.
+            top_k: Number of chunks to retrieve (overrides settings).
+            priority: Admission priority for the query embedding.
 
-        # Retrieve relevant chunks
-        retrieved = self._retrieval.search(question, top_k=k)
+        Returns:
+            Retrieved chunks, best first, with ``score`` in their metadata.
+            With small-to-big retrieval these are the chunks' parent sections.
+        """
+        with priority_scope(priority):
+            hits = self._retrieval.search(question, top_k=top_k or self.settings.top_k)
+        return self._expand(hits)
+
+    def _answer(self, question: str, k: int, deadline: Deadline | None = None) -> Answer:
+        # Retrieve relevant chunks; the embedding slot wait is capped by the deadline
+        try:
+            retrieved = self._retrieval.search(question, top_k=k)
+        except (DeadlineExceededError, AdmissionTimeoutError) as e:
+            if deadline is None:
+                raise
+            logger.warning(f"Returning without sources, retrieval ran out of time: {e}")
+            return self._sources_only([])
 
         if not retrieved:
             return Answer(
@@ -121,17 +250,10 @@ class LocalRAG:
                 mode=self.settings.mode.value,
             )
 
-        # Build context from retrieved chunks
-        context = "\n\n---\n\n".join(
-            f"[Source: {r.metadata.get('source', 'unknown')}, "
-            f"Page: {r.metadata.get('page', 'N/A')}]\n{r.page_content}"
-            for r in retrieved
-        )
-
-        # Generate answer with LLM
-        response = self._llm.generate(question=question, context=context)
+        # Build context from retrieved chunks, or the sections around them
+        context = format_context(self._expand(retrieved))
 
-        # Build source citations
+        # Build source citations from the matched chunks themselves
         sources = [
             Source(
                 document=r.metadata.get("source", "unknown"),
@@ -144,6 +266,21 @@ class LocalRAG:
             for r in retrieved
         ]
 
+        # Generate answer with LLM, falling back to the sources alone when
+        # the deadline leaves no time for it
+        if deadline is None:
+            with self._llm_admission.slot():
+                response = self._llm.generate(question=question, context=context)
+        elif deadline.remaining() < self.settings.query_min_generation:
+            logger.warning(f"Skipping generation: {deadline.remaining():.2f}s left after retrieval")
+            return self._sources_only(sources)
+        else:
+            try:
+                response = self._generate_within(question, context, deadline)
+            except (DeadlineExceededError, AdmissionTimeoutError) as e:
+                logger.warning(f"Returning sources without an answer: {e}")
+                return self._sources_only(sources)
+
         return Answer(
             text=response,
             sources=sources,
@@ -151,11 +288,277 @@ class LocalRAG:
             mode=self.settings.mode.value,
         )
 
+    def _expand(self, hits: list[Document]) -> list[Document]:
+        """Swap retrieved chunks for their parent sections, when those are stored."""
+        parents = self._ingestion.parents
+        if parents is None or not hits:
+            return hits
+        return expand_to_parents(hits, parents, window=self.settings.parent_window)
+
+    def _generate_within(self, question: str, context: str, deadline: Deadline) -> str:
+        """Generate on a worker thread and stop waiting for it at the deadline.
+
+        The worker keeps its admission slot until the client notices the
+        deadline and gives up, so the slot count stays truthful.
+        """
+        if self._generation_pool is None:
+            with self._generation_lock:
+                if self._generation_pool is None:
+                    self._generation_pool = ThreadPoolExecutor(
+                        max_workers=self.settings.llm_max_concurrency
+                        + self.settings.admission_queue_size,
+                        thread_name_prefix="localrag-generate",
+                    )
+
+        def generate() -> str:
+            with self._llm_admission.slot():
+                if deadline.expired:
+                    raise DeadlineExceededError("Deadline passed while waiting for the model")
+                return self._llm.generate(question=question, context=context, deadline=deadline)
+
+        # Carry the priority and deadline scopes over to the worker thread
+        future = self._generation_pool.submit(contextvars.copy_context().run, generate)
+        try:
+            return future.result(timeout=deadline.remaining())
+        except FutureTimeout:
+            future.cancel()
+            raise DeadlineExceededError("Generation did not finish before the deadline") from None
+
+    def _sources_only(self, sources: list[Source]) -> Answer:
+        return Answer(
+            text=(
+                "The answer could not be generated in time. "
+                "The most relevant passages are listed in the sources."
+                if sources
+                else "The documents could not be searched in time. Please try again."
+            ),
+            sources=sources,
+            model=self.settings.llm_model,
+            mode=self.settings.mode.value,
+            degraded=True,
+        )
+
     def get_stats(self) -> dict:
-        """Return collection statistics."""
-        return self._retrieval.get_stats()
+        """Return collection and admission-control statistics."""
+        stats = self._retrieval.get_stats()
+        stats["admission"] = {
+            "llm": self._llm_admission.get_stats(),
+            "embeddings": self._embed_admission.get_stats(),
+        }
+        if self._ingestion.parents is not None:
+            stats["parents"] = self._ingestion.parents.stats()
+        return stats
+
+    def calibrate_index(
+        self,
+        search_efs: list[int],
+        build_params: list[tuple[int, int]] | None = None,
+        sample_size: int = 200,
+        k: int = 10,
+        target_recall: float = 0.95,
+    ) -> dict:
+        """Measure recall vs. exact search and latency for candidate HNSW settings.
+
+        See :func:`localrag.retrieval.calibration.calibrate_index`. Apply the
+        recommended ``search_ef`` with ``LOCALRAG_HNSW_SEARCH_EF``; ``M`` and
+        ``construction_ef`` need a rebuilt collection.
+        """
+        from localrag.retrieval.calibration import calibrate_index
+
+        return calibrate_index(
+            self._retrieval,
+            search_efs=search_efs,
+            build_params=build_params,
+            sample_size=sample_size,
+            k=k,
+            target_recall=target_recall,
+        )
+
+    def warm_up(self) -> None:
+        """Load the generation model ahead of the first query."""
+        self._llm.preload()
+
+    def drain(self, timeout: float) -> bool:
+        """Stop accepting model calls and wait for in-flight ones to finish.
+
+        Returns:
+            True if all calls finished within ``timeout`` seconds.
+        """
+        # Embeddings first, so queries already past retrieval can still generate
+        deadline = time.monotonic() + timeout
+        drained = self._embed_admission.drain(timeout)
+        remaining = max(0.0, deadline - time.monotonic())
+        return self._llm_admission.drain(remaining) and drained
+
+    def export_snapshot(self, path: str | Path) -> dict:
+        """Write a consistent, compressed snapshot of the index to ``path``.
+
+        The snapshot contains chunk text, metadata, embeddings and parent
+        sections, so another node can load it with :meth:`import_snapshot`
+        without re-parsing or re-embedding.
+
+        Returns:
+            The snapshot manifest (counts, embed model, format version).
+        """
+        return self._retrieval.export_snapshot(Path(path), parents=self._ingestion.parents)
+
+    def import_snapshot(self, path: str | Path, replace: bool = False) -> dict:
+        """Load a snapshot written by :meth:`export_snapshot`.
+
+        Args:
+            path: Snapshot file.
+            replace: Delete all current documents before loading.
+
+        Returns:
+            The snapshot manifest.
+        """
+        manifest = self._retrieval.import_snapshot(
+            Path(path), replace=replace, parents=self._ingestion.parents
+        )
+        if replace:
+            self._prune_parents()
+        return manifest
+
+    def delete_document(self, path: str | Path) -> int:
+        """Remove every chunk ingested from a file.
+
+        Args:
+            path: The file's path; it does not need to exist any more.
+
+        Returns:
+            Number of chunks removed.
+        """
+        removed = self._delete_source(str(Path(path).resolve()))
+        logger.info(f"Removed {removed} chunks of {path}")
+        return removed
+
+    def replace_document(self, path: str | Path) -> dict:
+        """Re-ingest a changed file, keeping its old chunks until the new ones are stored.
+
+        The old chunks are set aside under a staging source path while the
+        file is ingested, and deleted only once that succeeds; chunks whose
+        text did not change are kept rather than re-embedded. If ingestion
+        fails, whatever was stored of the new version is removed and the old
+        chunks are restored.
+
+        Args:
+            path: The changed file.
+
+        Returns:
+            Ingestion summary, with ``chunks_removed`` counting the old
+            chunks deleted.
+        """
+        source_path = str(Path(path).resolve())
+        staged = f"{source_path}#replaced-{uuid.uuid4().hex}"
+        self._rename_source(source_path, staged)
+        try:
+            summary = self.ingest(path)
+        except BaseException:
+            self._delete_source(source_path)
+            self._rename_source(staged, source_path)
+            raise
+        summary["chunks_removed"] = self._delete_source(staged)
+        return summary
+
+    def _delete_source(self, source_path: str) -> int:
+        removed = self._retrieval.delete_source(source_path)
+        if self._ingestion.parents is not None:
+            self._ingestion.parents.remove_source(source_path)
+        return removed
+
+    def _rename_source(self, old: str, new: str) -> None:
+        self._retrieval.rename_source(old, new)
+        if self._ingestion.parents is not None:
+            self._ingestion.parents.rename_source(old, new)
+
+    def watch(self, paths: list[str | Path], **kwargs) -> None:
+        """Keep the index in sync with one or more directories until interrupted.
+
+        See :class:`localrag.ingestion.watcher.FolderWatcher` for the options.
+        """
+        from localrag.ingestion.watcher import FolderWatcher
+
+        FolderWatcher(self, paths, **kwargs).run()
+
+    def rebuild_shard(self, shard: str, path: str | Path) -> dict:
+        """Drop one shard and re-ingest only the chunks that route to it.
+
+        The other shards stay online and searchable throughout.
+
+        Args:
+            shard: Shard collection name, as listed in ``get_stats()["shards"]``.
+            path: File or directory the shard's documents are ingested from.
+
+        Returns:
+            Ingestion summary for the rebuilt shard.
+        """
+        path = Path(path)
+        if not path.exists():
+            raise FileNotFoundError(f"Path not found: {path}")
+
+        self.drop_shard(shard)
+        logger.info(f"Rebuilding shard {shard} from: {path}")
+        return self._ingest(path, shard=shard)
+
+    def drop_shard(self, shard: str) -> dict:
+        """Delete every chunk in one shard.
+
+        Returns:
+            What was removed: the shard's chunks, files and parent sections.
+        """
+        sources = self._retrieval.source_paths([shard])
+        chunks = self._retrieval.drop_shard(shard)
+        return {
+            "shard": shard,
+            "chunks_removed": chunks,
+            "files_removed": len(sources),
+            "parents_removed": self._remove_parents(sources),
+        }
+
+    def apply_retention(self, max_age_years: int) -> list[str]:
+        """Drop date shards for years more than ``max_age_years`` before this one.
+
+        Requires ``shard_by="date"``.
+
+        Returns:
+            Names of the dropped shards.
+        """
+        year = date.today().year - max_age_years
+        sources = self._retrieval.source_paths(self._retrieval.shards_before(year))
+        dropped = self._retrieval.drop_shards_before(year)
+        self._remove_parents(sources)
+        return dropped
 
     def reset(self) -> None:
         """Delete all ingested documents and reset the vector store."""
         self._retrieval.reset()
+        if self._ingestion.parents is not None:
+            self._ingestion.parents.clear()
         logger.warning("All documents deleted. Vector store reset.")
+
+    def _remove_parents(self, source_paths: set[str]) -> int:
+        """Delete the stored parent sections of files whose shard was dropped.
+
+        A file's chunks all route to the same shard, so these files have no
+        chunks left anywhere.
+
+        Returns:
+            Number of parent sections deleted.
+        """
+        if self._ingestion.parents is None or not source_paths:
+            return 0
+        removed = sum(self._ingestion.parents.remove_source(p) for p in source_paths)
+        logger.info(f"Removed {removed} parent sections of {len(source_paths)} files")
+        return removed
+
+    def _prune_parents(self) -> None:
+        """Delete stored parent sections of files that no longer have chunks."""
+        if self._ingestion.parents is not None:
+            removed = self._ingestion.parents.retain(self._retrieval.source_paths())
+            logger.info(f"Pruned {removed} parent sections")
+
+
+def _batched(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
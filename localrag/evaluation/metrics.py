@@ -0,0 +1,41 @@
+"""Retrieval quality metrics over labeled relevant sources.
+
+Relevance is binary. Retrieved chunks are reduced to relevance keys in rank
+order, and a key counts only the first time it appears, so several chunks from
+the same relevant document are not rewarded more than once.
+"""
+
+import math
+
+
+def _first_hits(retrieved: list[str], relevant: set[str], k: int) -> list[int]:
+    """Return 0-based ranks within the top ``k`` where a new relevant key appears."""
+    seen: set[str] = set()
+    ranks = []
+    for rank, key in enumerate(retrieved[:k]):
+        if key in relevant and key not in seen:
+            seen.add(key)
+            ranks.append(rank)
+    return ranks
+
+
+def recall_at_k(retrieved: list[str], relevant: set[str], k: int) -> float:
+    """Fraction of relevant keys found in the top ``k`` results."""
+    if not relevant:
+        return 0.0
+    return len(_first_hits(retrieved, relevant, k)) / len(relevant)
+
+
+def reciprocal_rank(retrieved: list[str], relevant: set[str], k: int) -> float:
+    """1 / rank of the first relevant result in the top ``k``, or 0."""
+    hits = _first_hits(retrieved, relevant, k)
+    return 1.0 / (hits[0] + 1) if hits else 0.0
+
+
+def ndcg_at_k(retrieved: list[str], relevant: set[str], k: int) -> float:
+    """Normalized discounted cumulative gain of the top ``k`` results."""
+    if not relevant:
+        return 0.0
+    dcg = sum(1.0 / math.log2(rank + 2) for rank in _first_hits(retrieved, relevant, k))
+    ideal = sum(1.0 / math.log2(rank + 2) for rank in range(min(len(relevant), k)))
+    return dcg / ideal
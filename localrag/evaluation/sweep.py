@@ -0,0 +1,266 @@
+"""Offline retrieval-quality and cost sweeps over ``Settings`` grids.
+
+Given a corpus and questions labeled with their relevant sources, every
+combination of the swept settings is indexed and queried, and retrieval
+quality (recall@k, MRR, nDCG) is reported next to what the configuration
+costs (index size, ingest time, query latency, prompt tokens). Configurations
+that only differ in query-time settings such as ``top_k`` share one index.
+
+Labels name a source file (``contract.pdf``) or a single page of it
+(``contract.pdf#3``).
+"""
+
+import itertools
+import json
+import statistics
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from langchain_core.documents import Document
+from loguru import logger
+
+from localrag.core import LocalRAG
+from localrag.evaluation.metrics import ndcg_at_k, recall_at_k, reciprocal_rank
+from localrag.llm.prompts import build_messages, format_context
+from localrag.utils.admission import Priority
+from localrag.utils.tokens import count_tokens
+
+# Settings that change what gets indexed; configurations that agree on all of
+# these can be answered from the same index
+INDEX_FIELDS = (
+    "mode",
+    "embed_model",
+    "chunk_size",
+    "chunk_overlap",
+    "parent_chunk_size",
+    "csv_group_rows",
+    "strip_page_boilerplate",
+    "dedup_chunks",
+    "dedup_threshold",
+    "hnsw_space",
+    "hnsw_m",
+    "hnsw_construction_ef",
+    "hnsw_search_ef",
+    "shard_by",
+    "num_shards",
+)
+
+
+@dataclass
+class EvalQuestion:
+    """A question and the sources that answer it."""
+
+    question: str
+    relevant: set[str]
+
+
+@dataclass
+class SweepResult:
+    """Quality and cost of one configuration, averaged over all questions."""
+
+    config: dict
+    recall_at_k: float
+    mrr: float
+    ndcg_at_k: float
+    index_chunks: int
+    index_bytes: int
+    ingest_seconds: float
+    latency_ms_p50: float
+    latency_ms_p95: float
+    prompt_tokens: float
+    per_question: list[dict] = field(default_factory=list, repr=False)
+
+    def to_dict(self, include_questions: bool = False) -> dict:
+        data = asdict(self)
+        if not include_questions:
+            data.pop("per_question")
+        return data
+
+
+def load_questions(path: Path) -> list[EvalQuestion]:
+    """Load labeled questions from a JSON Lines file.
+
+    Each line is ``{"question": "...", "relevant": ["a.pdf", "b.pdf#2"]}``.
+    """
+    questions = []
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if not record.get("question") or not record.get("relevant"):
+                raise ValueError(f"{path}:{line_no}: needs 'question' and 'relevant'")
+            questions.append(EvalQuestion(record["question"], set(record["relevant"])))
+    return questions
+
+
+def expand_grid(grid: dict[str, list]) -> list[dict]:
+    """Return every combination of the swept values, in a stable order."""
+    if not grid:
+        return [{}]
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def run_sweep(
+    questions: list[EvalQuestion],
+    corpus: Path,
+    grid: dict[str, list],
+    base: dict | None = None,
+    work_dir: Path | None = None,
+    generate: bool = False,
+) -> list[SweepResult]:
+    """Index ``corpus`` and evaluate ``questions`` for each configuration.
+
+    Args:
+        questions: Labeled questions.
+        corpus: File or directory to ingest.
+        grid: Settings field → values to sweep, e.g. ``{"chunk_size": [256, 512]}``.
+        base: Settings overrides shared by every configuration.
+        work_dir: Where the per-configuration indexes are built; a temporary
+            directory (removed afterwards) by default.
+        generate: Also run generation, so latency covers the full query
+            rather than retrieval alone. Much slower.
+
+    Returns:
+        One result per configuration, in grid order.
+    """
+    with tempfile.TemporaryDirectory(prefix="localrag-sweep-") as tmp:
+        root = work_dir or Path(tmp)
+        indexes: dict[tuple, tuple[Path, float]] = {}
+        results = []
+
+        for config in expand_grid(grid):
+            overrides = {**(base or {}), **config}
+            # Storage locations are the sweep's own, one per index
+            for field_name in ("chroma_path", "parse_cache_path"):
+                overrides.pop(field_name, None)
+            index_key = tuple(repr(overrides.get(f)) for f in INDEX_FIELDS)
+
+            if index_key not in indexes:
+                index_path = root / f"index-{len(indexes)}"
+                rag = LocalRAG(**overrides, **_storage(index_path))
+                started = time.perf_counter()
+                rag.ingest(corpus)
+                indexes[index_key] = (index_path, time.perf_counter() - started)
+
+            index_path, ingest_seconds = indexes[index_key]
+            rag = LocalRAG(**overrides, **_storage(index_path))
+            result = _evaluate(rag, questions, config, ingest_seconds, generate)
+            results.append(result)
+            logger.info(
+                f"Sweep {config} | recall@k={result.recall_at_k:.3f} mrr={result.mrr:.3f} "
+                f"ndcg@k={result.ndcg_at_k:.3f} | p50={result.latency_ms_p50}ms "
+                f"tokens={result.prompt_tokens:.0f}"
+            )
+
+    return results
+
+
+def select_cheapest(
+    results: list[SweepResult],
+    min_recall: float = 0.0,
+    min_mrr: float = 0.0,
+    min_ndcg: float = 0.0,
+    cost: str = "prompt_tokens",
+) -> SweepResult | None:
+    """Pick the lowest-cost configuration that meets every quality bar.
+
+    Args:
+        results: Output of :func:`run_sweep`.
+        min_recall: Minimum mean recall@k.
+        min_mrr: Minimum mean reciprocal rank.
+        min_ndcg: Minimum mean nDCG@k.
+        cost: Result field to minimize, e.g. ``prompt_tokens``,
+            ``latency_ms_p95`` or ``index_bytes``.
+
+    Returns:
+        The cheapest qualifying result, or None if none qualifies.
+    """
+    qualifying = [
+        r
+        for r in results
+        if r.recall_at_k >= min_recall and r.mrr >= min_mrr and r.ndcg_at_k >= min_ndcg
+    ]
+    if not qualifying:
+        return None
+    # Ties on cost go to the better-quality configuration
+    return min(qualifying, key=lambda r: (getattr(r, cost), -r.ndcg_at_k))
+
+
+def _evaluate(
+    rag: LocalRAG,
+    questions: list[EvalQuestion],
+    config: dict,
+    ingest_seconds: float,
+    generate: bool,
+) -> SweepResult:
+    k = rag.settings.top_k
+    per_question = []
+
+    for q in questions:
+        started = time.perf_counter()
+        retrieved = rag.retrieve(q.question, top_k=k, priority=Priority.BATCH)
+        latency_ms = (time.perf_counter() - started) * 1000
+        if generate:
+            started = time.perf_counter()
+            rag.query(q.question, top_k=k, priority=Priority.BATCH)
+            latency_ms = (time.perf_counter() - started) * 1000
+
+        keys = [_relevance_key(doc, q.relevant) for doc in retrieved]
+        messages = build_messages(q.question, format_context(retrieved))
+        prompt = "".join(m["content"] for m in messages)
+        per_question.append(
+            {
+                "question": q.question,
+                "recall_at_k": recall_at_k(keys, q.relevant, k),
+                "reciprocal_rank": reciprocal_rank(keys, q.relevant, k),
+                "ndcg_at_k": ndcg_at_k(keys, q.relevant, k),
+                "latency_ms": latency_ms,
+                "prompt_tokens": count_tokens(prompt),
+            }
+        )
+
+    def mean(key: str) -> float:
+        return round(statistics.fmean(p[key] for p in per_question), 4) if per_question else 0.0
+
+    latencies = sorted(p["latency_ms"] for p in per_question) or [0.0]
+    return SweepResult(
+        config=config,
+        recall_at_k=mean("recall_at_k"),
+        mrr=mean("reciprocal_rank"),
+        ndcg_at_k=mean("ndcg_at_k"),
+        index_chunks=rag.get_stats()["total_chunks"],
+        index_bytes=_dir_size(rag.settings.chroma_path),
+        ingest_seconds=round(ingest_seconds, 3),
+        latency_ms_p50=round(latencies[len(latencies) // 2], 1),
+        latency_ms_p95=round(latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))], 1),
+        prompt_tokens=mean("prompt_tokens"),
+        per_question=per_question,
+    )
+
+
+def _storage(index_path: Path) -> dict:
+    """Settings giving an index its own parse cache, next to it.
+
+    A parse cache shared between indexes would let every build after the
+    first skip parsing, so ``ingest_seconds`` would not be comparable. It is
+    kept outside ``index_path`` so it does not count towards ``index_bytes``.
+    """
+    return {
+        "chroma_path": index_path,
+        "parse_cache_path": index_path.with_name(f"{index_path.name}-parse-cache"),
+    }
+
+
+def _relevance_key(doc: Document, relevant: set[str]) -> str:
+    """Map a retrieved chunk to the label granularity used for its question."""
+    source = doc.metadata.get("source", "")
+    page_key = f"{source}#{doc.metadata.get('page')}"
+    return page_key if page_key in relevant else source
+
+
+def _dir_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
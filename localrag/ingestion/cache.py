@@ -0,0 +1,78 @@
+"""Persistent cache of parsed document text.
+
+Parsing (especially PDF text extraction) is by far the slowest ingestion step
+and its output does not depend on chunking or embedding settings. Parsed
+documents are stored on disk keyed by the file's content hash and the parser
+version, so re-ingesting with a new ``chunk_size`` or embed model skips
+parsing entirely.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+from langchain_core.documents import Document
+from loguru import logger
+
+from localrag.ingestion.parsers import PARSER_VERSION
+
+
+def file_sha256(file_path: Path) -> str:
+    """Hash a file's contents without loading it into memory."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ParsedTextCache:
+    """Gzipped JSON cache of parser output, one entry per file content hash."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _entry_path(self, file_path: Path, file_hash: str) -> Path:
+        suffix = file_path.suffix.lower().lstrip(".")
+        return self.root / f"{file_hash}.{suffix}.v{PARSER_VERSION}.json.gz"
+
+    def get(self, file_path: Path, file_hash: str) -> list[Document] | None:
+        """Return cached documents for ``file_path``, or None on a miss."""
+        entry = self._entry_path(file_path, file_hash)
+        if not entry.exists():
+            return None
+
+        try:
+            with gzip.open(entry, "rt", encoding="utf-8") as f:
+                records = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable parse cache entry {entry.name}: {e}")
+            entry.unlink(missing_ok=True)
+            return None
+
+        documents = []
+        for record in records:
+            # The same content may have been cached under another file name
+            metadata = {**record["metadata"], "source": file_path.name}
+            documents.append(Document(page_content=record["text"], metadata=metadata))
+        return documents
+
+    def put(self, file_path: Path, file_hash: str, documents: list[Document]) -> None:
+        """Store parser output for ``file_path``."""
+        entry = self._entry_path(file_path, file_hash)
+        records = [{"text": d.page_content, "metadata": d.metadata} for d in documents]
+
+        # Write to a temp file and rename so readers never see a partial entry
+        tmp = entry.with_name(f"{entry.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(records, f)
+        os.replace(tmp, entry)
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        for entry in self.root.glob("*.json.gz"):
+            entry.unlink(missing_ok=True)
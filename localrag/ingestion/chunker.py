@@ -2,6 +2,9 @@
 
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+from loguru import logger
+
+_SEPARATORS = ["\n\n", "\n", ". ", "! ", "? ", "; ", ", ", " ", ""]
 
 
 class SemanticChunker:
@@ -11,14 +14,25 @@ class SemanticChunker:
     prioritizing natural language boundaries (paragraphs > sentences > words).
     """
 
-    def __init__(self, chunk_size: int = 512, chunk_overlap: int = 50):
+    def __init__(self, chunk_size: int = 512, chunk_overlap: int = 50, parent_chunk_size: int = 0):
         self.splitter = RecursiveCharacterTextSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
-            separators=["\n\n", "\n", ". ", "! ", "? ", "; ", ", ", " ", ""],
+            separators=_SEPARATORS,
             length_function=len,
             is_separator_regex=False,
         )
+        self.parent_splitter = (
+            RecursiveCharacterTextSplitter(
+                chunk_size=parent_chunk_size,
+                chunk_overlap=0,
+                separators=_SEPARATORS,
+                length_function=len,
+                is_separator_regex=False,
+            )
+            if parent_chunk_size
+            else None
+        )
 
     def split(self, documents: list[Document]) -> list[Document]:
         """Split a list of documents into chunks, preserving metadata."""
@@ -29,3 +43,40 @@ class SemanticChunker:
             chunk.metadata["chunk_index"] = i
 
         return chunks
+
+    def split_with_parents(
+        self, documents: list[Document]
+    ) -> tuple[list[Document], list[Document]]:
+        """Split documents into parent sections and the smaller chunks within them.
+
+        Returns:
+            ``(parents, chunks)``. Each chunk's metadata has ``parent_index``,
+            the position of its parent in ``parents``, and ``parent_start``,
+            its character offset within the parent (left out if the chunk
+            cannot be located in it).
+        """
+        if self.parent_splitter is None:
+            raise ValueError("parent_chunk_size is not set")
+
+        parents = self.parent_splitter.split_documents(documents)
+        chunks = []
+        for parent_index, parent in enumerate(parents):
+            text, search_from = parent.page_content, 0
+            for piece in self.splitter.split_text(text):
+                metadata = {
+                    **parent.metadata,
+                    "chunk_index": len(chunks),
+                    "parent_index": parent_index,
+                }
+                start = text.find(piece, search_from)
+                if start >= 0:
+                    metadata["parent_start"] = start
+                    search_from = start + 1
+                else:
+                    # Expansion then falls back to the whole parent
+                    logger.warning(
+                        f"Chunk {len(chunks)} not found in its parent section; "
+                        "its offset is left out"
+                    )
+                chunks.append(Document(page_content=piece, metadata=metadata))
+        return parents, chunks
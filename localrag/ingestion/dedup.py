@@ -0,0 +1,299 @@
+"""Boilerplate stripping and near-duplicate chunk detection.
+
+Two stages keep repeated text out of the index:
+
+* :func:`strip_repeated_lines` removes header and footer lines that recur at
+  the top or bottom of most pages of a document, before chunking.
+* :class:`ChunkDeduplicator` fingerprints every chunk with an exact hash of
+  its normalized text and a MinHash signature, indexed by LSH bands in a
+  SQLite file next to the Chroma collection. A chunk matching an already
+  stored one (exactly, or with estimated Jaccard similarity at or above the
+  threshold) is not embedded again; the stored chunk records it as another
+  source instead.
+"""
+
+import hashlib
+import json
+import math
+import re
+import sqlite3
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from langchain_core.documents import Document
+
+_WORD = re.compile(r"\w+")
+_DIGITS = re.compile(r"\d+")
+
+_NUM_PERM = 128
+_BANDS = 16
+_SHINGLE_WORDS = 5
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+# Fixed seed: signatures must be comparable across processes and restarts.
+# Shingle hashes and both coefficients are below 2**32, so a * x + b stays
+# below 2**64 and the uint64 arithmetic never wraps before the modulo.
+_rng = np.random.default_rng(0x10CA1)
+_PERM_A = _rng.integers(1, int(_MAX_HASH), _NUM_PERM, dtype=np.uint64, endpoint=True)
+_PERM_B = _rng.integers(0, int(_MAX_HASH), _NUM_PERM, dtype=np.uint64, endpoint=True)
+
+
+def strip_repeated_lines(
+    pages: list[Document],
+    edge_lines: int = 3,
+    min_fraction: float = 0.5,
+    min_pages: int = 3,
+) -> list[Document]:
+    """Remove header/footer lines repeated across the pages of one document.
+
+    A line is boilerplate if it is among the first or last ``edge_lines``
+    non-blank lines of at least ``min_fraction`` of the pages. Digits are
+    ignored when comparing, so "Page 3 of 10" matches on every page. At most
+    half of a page's lines count as edges, so a page's only line or its body
+    is never stripped, and a page that would be left empty is kept whole.
+    """
+    if len(pages) < min_pages:
+        return pages
+
+    def edges(lines: list[str]) -> set[int]:
+        filled = [i for i, line in enumerate(lines) if line.strip()]
+        n = min(edge_lines, len(filled) // 2)
+        return set(filled[:n] + filled[len(filled) - n :])
+
+    def key(line: str) -> str:
+        return _DIGITS.sub("#", " ".join(line.lower().split()))
+
+    split = [page.page_content.splitlines() for page in pages]
+    counts = Counter()
+    for lines in split:
+        counts.update({key(lines[i]) for i in edges(lines)})
+
+    threshold = max(2, math.ceil(min_fraction * len(pages)))
+    repeated = {k for k, n in counts.items() if n >= threshold}
+    if not repeated:
+        return pages
+
+    stripped = []
+    for page, lines in zip(pages, split):
+        edge = edges(lines)
+        kept = [line for i, line in enumerate(lines) if i not in edge or key(line) not in repeated]
+        if not any(line.strip() for line in kept):
+            stripped.append(page)
+            continue
+        stripped.append(Document(page_content="\n".join(kept), metadata=page.metadata))
+    return stripped
+
+
+@dataclass
+class Fingerprint:
+    """Exact hash and MinHash signature of a chunk's normalized text."""
+
+    exact: str
+    signature: np.ndarray
+
+    @classmethod
+    def of(cls, text: str) -> "Fingerprint":
+        words = _WORD.findall(text.lower())
+        normalized = " ".join(words)
+        exact = hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+
+        n = max(1, len(words) - _SHINGLE_WORDS + 1)
+        shingles = {" ".join(words[i : i + _SHINGLE_WORDS]) for i in range(n)}
+        hashes = np.fromiter(
+            (
+                int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "big")
+                for s in shingles
+            ),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+        permuted = (np.outer(hashes, _PERM_A) + _PERM_B) % _MERSENNE_PRIME & _MAX_HASH
+        return cls(exact, permuted.min(axis=0).astype(np.uint32))
+
+    def bands(self) -> list[int]:
+        """LSH bucket keys, one per band of the signature."""
+        rows = _NUM_PERM // _BANDS
+        return [
+            int.from_bytes(
+                hashlib.blake2b(
+                    self.signature[i * rows : (i + 1) * rows].tobytes(), digest_size=8
+                ).digest(),
+                "big",
+                signed=True,
+            )
+            for i in range(_BANDS)
+        ]
+
+    def similarity(self, signature: np.ndarray) -> float:
+        """Estimated Jaccard similarity with another signature."""
+        return float(np.mean(self.signature == signature))
+
+
+def chunk_ref(metadata: dict) -> dict:
+    """The part of a chunk's metadata that identifies where it came from."""
+    return {
+        "source": metadata.get("source", "unknown"),
+        "source_path": metadata.get("source_path"),
+        "page": metadata.get("page"),
+        "parent_id": metadata.get("parent_id"),
+        "parent_start": metadata.get("parent_start"),
+    }
+
+
+class ChunkDeduplicator:
+    """Persistent fingerprint index of stored chunks, partitioned by shard.
+
+    Not thread-safe on its own; callers serialize access (the retrieval
+    engine uses it under its write lock) and call :meth:`commit` or
+    :meth:`rollback` once per batch.
+    """
+
+    def __init__(self, path: Path, threshold: float = 0.9):
+        self.threshold = threshold
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=60)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS chunks (
+                id TEXT PRIMARY KEY, shard TEXT NOT NULL, exact TEXT NOT NULL,
+                signature BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS chunks_exact ON chunks (shard, exact);
+            CREATE TABLE IF NOT EXISTS bands (
+                shard TEXT NOT NULL, band INTEGER NOT NULL, bucket INTEGER NOT NULL,
+                id TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS bands_bucket ON bands (shard, band, bucket);
+            CREATE INDEX IF NOT EXISTS bands_id ON bands (id);
+            CREATE TABLE IF NOT EXISTS refs (
+                id TEXT NOT NULL, source_path TEXT, ref TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS refs_id ON refs (id);
+            CREATE INDEX IF NOT EXISTS refs_source_path ON refs (source_path);
+            """
+        )
+
+    def find(self, fingerprint: Fingerprint, shard: str) -> str | None:
+        """Return the id of a stored chunk in ``shard`` that this one duplicates."""
+        row = self._db.execute(
+            "SELECT id FROM chunks WHERE shard = ? AND exact = ? LIMIT 1",
+            (shard, fingerprint.exact),
+        ).fetchone()
+        if row:
+            return row[0]
+
+        candidates = set()
+        for band, bucket in enumerate(fingerprint.bands()):
+            rows = self._db.execute(
+                "SELECT id FROM bands WHERE shard = ? AND band = ? AND bucket = ?",
+                (shard, band, bucket),
+            )
+            candidates.update(r[0] for r in rows)
+
+        best, best_score = None, self.threshold
+        for chunk_id in sorted(candidates):
+            (blob,) = self._db.execute(
+                "SELECT signature FROM chunks WHERE id = ?", (chunk_id,)
+            ).fetchone()
+            score = fingerprint.similarity(np.frombuffer(blob, dtype=np.uint32))
+            if score >= best_score:
+                best, best_score = chunk_id, score
+        return best
+
+    def add(self, chunk_id: str, shard: str, fingerprint: Fingerprint, ref: dict) -> None:
+        """Register a newly stored chunk and its first source."""
+        self.forget([chunk_id])
+        self._db.execute(
+            "INSERT INTO chunks (id, shard, exact, signature) VALUES (?, ?, ?, ?)",
+            (chunk_id, shard, fingerprint.exact, fingerprint.signature.tobytes()),
+        )
+        self._db.executemany(
+            "INSERT INTO bands (shard, band, bucket, id) VALUES (?, ?, ?, ?)",
+            [(shard, band, bucket, chunk_id) for band, bucket in enumerate(fingerprint.bands())],
+        )
+        self.add_ref(chunk_id, ref)
+
+    def add_ref(self, chunk_id: str, ref: dict) -> None:
+        """Record another source of a stored chunk."""
+        encoded = json.dumps(ref, sort_keys=True)
+        exists = self._db.execute(
+            "SELECT 1 FROM refs WHERE id = ? AND ref = ?", (chunk_id, encoded)
+        ).fetchone()
+        if not exists:
+            self._db.execute(
+                "INSERT INTO refs (id, source_path, ref) VALUES (?, ?, ?)",
+                (chunk_id, ref.get("source_path"), encoded),
+            )
+
+    def refs(self, chunk_id: str) -> list[dict]:
+        """Sources of a stored chunk, first-ingested first."""
+        rows = self._db.execute("SELECT ref FROM refs WHERE id = ? ORDER BY rowid", (chunk_id,))
+        return [json.loads(r[0]) for r in rows]
+
+    def source_paths(self, shards: list[str]) -> set[str]:
+        """Paths of every file referenced by a stored chunk in ``shards``."""
+        paths = set()
+        for shard in shards:
+            rows = self._db.execute(
+                "SELECT DISTINCT r.source_path FROM refs r JOIN chunks c ON c.id = r.id "
+                "WHERE c.shard = ? AND r.source_path IS NOT NULL",
+                (shard,),
+            )
+            paths.update(r[0] for r in rows)
+        return paths
+
+    def shard_of(self, chunk_id: str) -> str | None:
+        row = self._db.execute("SELECT shard FROM chunks WHERE id = ?", (chunk_id,)).fetchone()
+        return row[0] if row else None
+
+    def remove_source(self, source_path: str) -> list[str]:
+        """Drop every reference to ``source_path``.
+
+        Returns:
+            Ids of the chunks that referenced it; chunks with no references
+            left should be deleted by the caller.
+        """
+        rows = self._db.execute("SELECT id FROM refs WHERE source_path = ?", (source_path,))
+        affected = sorted({r[0] for r in rows})
+        self._db.execute("DELETE FROM refs WHERE source_path = ?", (source_path,))
+        return affected
+
+    def rename_source(self, old: str, new: str) -> list[str]:
+        """Point every reference to ``old`` at ``new`` instead.
+
+        Returns:
+            Ids of the chunks whose references changed.
+        """
+        rows = self._db.execute(
+            "SELECT rowid, id, ref FROM refs WHERE source_path = ?", (old,)
+        ).fetchall()
+        self._db.executemany(
+            "UPDATE refs SET source_path = ?, ref = ? WHERE rowid = ?",
+            [
+                (new, json.dumps({**json.loads(ref), "source_path": new}, sort_keys=True), rowid)
+                for rowid, _, ref in rows
+            ],
+        )
+        return sorted({chunk_id for _, chunk_id, _ in rows})
+
+    def forget(self, chunk_ids: list[str]) -> None:
+        """Remove chunks from the index, e.g. after deleting them."""
+        for table in ("chunks", "bands", "refs"):
+            self._db.executemany(f"DELETE FROM {table} WHERE id = ?", [(i,) for i in chunk_ids])
+
+    def drop_shard(self, shard: str) -> None:
+        ids = [r[0] for r in self._db.execute("SELECT id FROM chunks WHERE shard = ?", (shard,))]
+        self.forget(ids)
+
+    def clear(self) -> None:
+        for table in ("chunks", "bands", "refs"):
+            self._db.execute(f"DELETE FROM {table}")
+
+    def commit(self) -> None:
+        self._db.commit()
+
+    def rollback(self) -> None:
+        self._db.rollback()
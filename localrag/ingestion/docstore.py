@@ -0,0 +1,305 @@
+"""Parent section store for small-to-big retrieval.
+
+Small chunks embed precisely, but on their own they give the LLM fragments.
+With ``parent_chunk_size`` set, the chunks that are embedded are cut from
+larger parent sections, and at query time each hit is replaced by its parent
+(or the text around it). Parents are kept here rather than in Chroma
+metadata, so each one is stored once however many chunks point at it:
+
+* Texts are zlib-compressed and appended to a segment file that readers
+  memory-map, so fetching a parent is an index lookup and a slice.
+* An SQLite index maps each parent id (a hash of its text, so identical
+  sections of different files share an entry) to its place in the segment,
+  and records which source files reference it.
+* Removing a file drops its references and deletes the parents nobody else
+  references. Once most of the segment is dead space it is rewritten.
+"""
+
+import hashlib
+import mmap
+import os
+import sqlite3
+import threading
+import zlib
+from collections.abc import Iterable
+from pathlib import Path
+
+from langchain_core.documents import Document
+from loguru import logger
+
+from localrag.utils.locking import FileLock
+
+# Rewrite the segment once dead bytes exceed live bytes and this size
+_COMPACT_MIN_BYTES = 1 << 20
+
+
+class ParentStore:
+    """Content-addressed, memory-mapped store of parent sections.
+
+    Shared by threads and worker processes: writes hold a file lock, reads
+    only touch the SQLite index and the mapped segment.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._write_lock = FileLock(root / ".write.lock")
+        self._map: tuple[str, mmap.mmap] | None = None
+
+        self._db = sqlite3.connect(root / "index.sqlite3", check_same_thread=False, timeout=60)
+        # WAL lets queries read while another process is ingesting
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS parents (
+                id TEXT PRIMARY KEY, segment TEXT NOT NULL, offset INTEGER NOT NULL,
+                length INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS refs (
+                id TEXT NOT NULL, source_path TEXT NOT NULL, PRIMARY KEY (id, source_path)
+            );
+            CREATE INDEX IF NOT EXISTS refs_source_path ON refs (source_path);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+            INSERT OR IGNORE INTO meta (key, value) VALUES ('generation', 0);
+            """
+        )
+        self._db.commit()
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+    def put(self, texts: list[str], source_path: str) -> list[str]:
+        """Store the parent sections of one file.
+
+        Returns:
+            The id of each text, in order; texts already stored are not
+            written again.
+        """
+        ids = [self.key(text) for text in texts]
+        with self._write_lock, self._lock:
+            segment = self._segment()
+            new: dict[str, bytes] = {}
+            for parent_id, text in zip(ids, texts):
+                if parent_id in new or self._exists(parent_id):
+                    continue
+                new[parent_id] = zlib.compress(text.encode("utf-8"))
+
+            if new:
+                rows = []
+                with open(self.root / segment, "ab") as f:
+                    offset = f.seek(0, os.SEEK_END)
+                    for parent_id, blob in new.items():
+                        f.write(blob)
+                        rows.append((parent_id, segment, offset, len(blob)))
+                        offset += len(blob)
+                self._db.executemany(
+                    "INSERT INTO parents (id, segment, offset, length) VALUES (?, ?, ?, ?)", rows
+                )
+            self._db.executemany(
+                "INSERT OR IGNORE INTO refs (id, source_path) VALUES (?, ?)",
+                [(parent_id, source_path) for parent_id in set(ids)],
+            )
+            self._db.commit()
+        return ids
+
+    def get(self, ids: Iterable[str]) -> dict[str, str]:
+        """Texts of the requested parents; ids that are not stored are left out."""
+        found = {}
+        with self._lock:
+            for parent_id in set(ids):
+                row = self._db.execute(
+                    "SELECT segment, offset, length FROM parents WHERE id = ?", (parent_id,)
+                ).fetchone()
+                if row is None:
+                    continue
+                segment, offset, length = row
+                data = self._mapped(segment, offset + length)
+                if data is not None:
+                    found[parent_id] = zlib.decompress(data[offset : offset + length]).decode()
+        return found
+
+    def remove_source(self, source_path: str) -> int:
+        """Drop a file's references and delete parents no other file references.
+
+        Returns:
+            Number of parents deleted.
+        """
+        with self._write_lock, self._lock:
+            self._db.execute("DELETE FROM refs WHERE source_path = ?", (source_path,))
+            return self._collect_garbage()
+
+    def rename_source(self, old: str, new: str) -> None:
+        """Move a file's references to another source path."""
+        with self._write_lock, self._lock:
+            self._db.execute(
+                "UPDATE OR IGNORE refs SET source_path = ? WHERE source_path = ?", (new, old)
+            )
+            # Left over where ``new`` already referenced the same parent
+            self._db.execute("DELETE FROM refs WHERE source_path = ?", (old,))
+            self._db.commit()
+
+    def retain(self, source_paths: set[str]) -> int:
+        """Drop references from every file not in ``source_paths``.
+
+        Returns:
+            Number of parents deleted.
+        """
+        with self._write_lock, self._lock:
+            known = [r[0] for r in self._db.execute("SELECT DISTINCT source_path FROM refs")]
+            self._db.executemany(
+                "DELETE FROM refs WHERE source_path = ?",
+                [(p,) for p in known if p not in source_paths],
+            )
+            return self._collect_garbage()
+
+    def clear(self) -> None:
+        with self._write_lock, self._lock:
+            old = self._segment()
+            self._db.execute("DELETE FROM refs")
+            self._db.execute("DELETE FROM parents")
+            self._db.execute("UPDATE meta SET value = value + 1 WHERE key = 'generation'")
+            self._db.commit()
+            self._unlink(old)
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, stored = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM parents"
+            ).fetchone()
+        return {"parents": count, "bytes": stored}
+
+    def _segment(self) -> str:
+        (generation,) = self._db.execute(
+            "SELECT value FROM meta WHERE key = 'generation'"
+        ).fetchone()
+        return f"parents-{generation:06d}.bin"
+
+    def _exists(self, parent_id: str) -> bool:
+        return (
+            self._db.execute("SELECT 1 FROM parents WHERE id = ?", (parent_id,)).fetchone()
+            is not None
+        )
+
+    def _mapped(self, segment: str, end: int) -> mmap.mmap | None:
+        """Map ``segment``, remapping when it has grown past the current map."""
+        if self._map is not None and self._map[0] == segment and len(self._map[1]) >= end:
+            return self._map[1]
+        try:
+            with open(self.root / segment, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            # Another process compacted the segment after we looked the id up
+            return None
+        if self._map is not None:
+            self._map[1].close()
+        self._map = (segment, mapped)
+        return mapped
+
+    def _unlink(self, segment: str) -> None:
+        if self._map is not None and self._map[0] == segment:
+            self._map[1].close()
+            self._map = None
+        try:
+            (self.root / segment).unlink(missing_ok=True)
+        except OSError as e:  # Windows: still mapped by another process
+            logger.warning(f"Could not remove old parent segment {segment}: {e}")
+
+    def _collect_garbage(self) -> int:
+        deleted = self._db.execute(
+            "DELETE FROM parents WHERE id NOT IN (SELECT id FROM refs)"
+        ).rowcount
+        self._db.commit()
+
+        segment = self._segment()
+        path = self.root / segment
+        size = path.stat().st_size if path.exists() else 0
+        (live,) = self._db.execute(
+            "SELECT COALESCE(SUM(length), 0) FROM parents WHERE segment = ?", (segment,)
+        ).fetchone()
+        if size >= _COMPACT_MIN_BYTES and size > 2 * live:
+            self._compact(segment)
+        return deleted
+
+    def _compact(self, segment: str) -> None:
+        """Copy the live parents into a new segment and delete the old one."""
+        rows = self._db.execute(
+            "SELECT id, offset, length FROM parents WHERE segment = ? ORDER BY offset", (segment,)
+        ).fetchall()
+        self._db.execute("UPDATE meta SET value = value + 1 WHERE key = 'generation'")
+        target = self._segment()
+
+        moved = []
+        with open(self.root / segment, "rb") as src, open(self.root / target, "wb") as dst:
+            for parent_id, offset, length in rows:
+                src.seek(offset)
+                moved.append((target, dst.tell(), parent_id))
+                dst.write(src.read(length))
+        self._db.executemany("UPDATE parents SET segment = ?, offset = ? WHERE id = ?", moved)
+        self._db.commit()
+        self._unlink(segment)
+        logger.info(f"Compacted parent store: {len(rows)} parents kept in {target}")
+
+
+def expand_to_parents(hits: list[Document], store: ParentStore, window: int = 0) -> list[Document]:
+    """Replace retrieved chunks with the parent text around them.
+
+    Chunks of the same parent collapse into one document, at the rank and
+    with the metadata of the best of them. With ``window`` > 0 only that many
+    characters either side of each chunk are kept (overlapping spans are
+    merged) instead of the whole parent; if any of the chunks has no known
+    offset in its parent, the whole parent is kept. Chunks whose parent is
+    not stored are returned unchanged.
+
+    Args:
+        hits: Retrieved chunks, best first.
+        store: Where their parents are stored.
+        window: Characters of context to keep around each chunk; 0 keeps the
+            whole parent.
+    """
+    texts = store.get(h.metadata["parent_id"] for h in hits if h.metadata.get("parent_id"))
+
+    groups: dict[str, list[Document]] = {}
+    ranked: list[str | Document] = []
+    for hit in hits:
+        parent_id = hit.metadata.get("parent_id")
+        if parent_id not in texts:
+            ranked.append(hit)
+        elif parent_id in groups:
+            groups[parent_id].append(hit)
+        else:
+            groups[parent_id] = [hit]
+            ranked.append(parent_id)
+
+    expanded = []
+    for item in ranked:
+        if isinstance(item, Document):
+            expanded.append(item)
+            continue
+        parent, members = texts[item], groups[item]
+        located = all("parent_start" in m.metadata for m in members)
+        content = _windows(parent, members, window) if window > 0 and located else parent
+        expanded.append(
+            Document(
+                page_content=content,
+                metadata={**members[0].metadata, "matched_chunks": len(members)},
+            )
+        )
+    return expanded
+
+
+def _windows(parent: str, members: list[Document], window: int) -> str:
+    spans = []
+    for member in members:
+        start = member.metadata["parent_start"]
+        end = start + len(member.page_content)
+        spans.append((max(0, start - window), min(len(parent), end + window)))
+    spans.sort()
+    merged = [list(spans[0])]
+    for start, end in spans[1:]:
+        if start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return "\n...\n".join(parent[start:end].strip() for start, end in merged)
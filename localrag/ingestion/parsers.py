@@ -1,12 +1,35 @@
 """Document parsers for different file formats."""
 
+import csv
+import math
+import multiprocessing
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 
 from langchain_core.documents import Document
 from loguru import logger
 
+# Bump whenever parser output changes so cached parse results are invalidated
+PARSER_VERSION = 1
 
-def parse_file(file_path: Path) -> list[Document]:
+
+@dataclass
+class ParseOptions:
+    """Tuning knobs passed through to the individual parsers."""
+
+    # Worker processes for PDF text extraction (1 = serial)
+    pdf_workers: int = 1
+    # PDFs with fewer pages than this are always extracted serially
+    pdf_parallel_min_pages: int = 64
+    # Group consecutive CSV rows into documents instead of one per row
+    csv_group_rows: bool = False
+    # Maximum characters per grouped CSV document, header included
+    csv_max_chars: int = 512
+
+
+def parse_file(file_path: Path, options: ParseOptions | None = None) -> list[Document]:
     """Parse a file into a list of LangChain Documents.
 
     Each document represents a logical unit (e.g., a page in a PDF).
@@ -17,36 +40,63 @@ def parse_file(file_path: Path) -> list[Document]:
     if parser is None:
         raise ValueError(f"No parser available for {suffix}")
 
-    return parser(file_path)
+    return parser(file_path, options or ParseOptions())
 
 
-def _parse_pdf(file_path: Path) -> list[Document]:
-    """Parse PDF using pypdf."""
+def _parse_pdf(file_path: Path, options: ParseOptions) -> list[Document]:
+    """Parse PDF using pypdf, splitting large files into parallel page ranges."""
     from pypdf import PdfReader
 
     reader = PdfReader(str(file_path))
-    documents = []
-
-    for i, page in enumerate(reader.pages):
-        text = page.extract_text() or ""
-        if text.strip():
-            documents.append(
-                Document(
-                    page_content=text,
-                    metadata={
-                        "source": file_path.name,
-                        "page": i + 1,
-                        "total_pages": len(reader.pages),
-                        "file_type": "pdf",
-                    },
-                )
+    total_pages = len(reader.pages)
+
+    workers = min(options.pdf_workers, total_pages)
+    if workers > 1 and total_pages >= options.pdf_parallel_min_pages:
+        # Several ranges per worker so one slow range doesn't stall the pool
+        step = math.ceil(total_pages / (workers * 4))
+        ranges = [(start, min(start + step, total_pages)) for start in range(0, total_pages, step)]
+        # Spawn rather than fork: parsing runs on server, watcher and read-ahead
+        # threads, and a forked child can inherit locks another thread holds
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            results = pool.map(
+                _extract_pdf_pages,
+                [str(file_path)] * len(ranges),
+                [start for start, _ in ranges],
+                [stop for _, stop in ranges],
             )
+            pages = [page for result in results for page in result]
+    else:
+        pages = [(i, page.extract_text() or "") for i, page in enumerate(reader.pages)]
+
+    documents = [
+        Document(
+            page_content=text,
+            metadata={
+                "source": file_path.name,
+                "page": i + 1,
+                "total_pages": total_pages,
+                "file_type": "pdf",
+            },
+        )
+        for i, text in pages
+        if text.strip()
+    ]
 
     logger.debug(f"PDF parsed: {file_path.name} → {len(documents)} pages")
     return documents
 
 
-def _parse_docx(file_path: Path) -> list[Document]:
+def _extract_pdf_pages(path: str, start: int, stop: int) -> list[tuple[int, str]]:
+    """Extract text for pages ``[start, stop)`` — runs in a worker process."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    return [(i, reader.pages[i].extract_text() or "") for i in range(start, stop)]
+
+
+def _parse_docx(file_path: Path, options: ParseOptions) -> list[Document]:
     """Parse DOCX using python-docx."""
     from docx import Document as DocxDocument
 
@@ -64,7 +114,7 @@ def _parse_docx(file_path: Path) -> list[Document]:
     ]
 
 
-def _parse_text(file_path: Path) -> list[Document]:
+def _parse_text(file_path: Path, options: ParseOptions) -> list[Document]:
     """Parse plain text or markdown files."""
     text = file_path.read_text(encoding="utf-8")
 
@@ -79,9 +129,14 @@ def _parse_text(file_path: Path) -> list[Document]:
     ]
 
 
-def _parse_csv(file_path: Path) -> list[Document]:
-    """Parse CSV files — each row becomes a document."""
-    import csv
+def _parse_csv(file_path: Path, options: ParseOptions) -> list[Document]:
+    """Parse CSV files — each row becomes a document, or rows are grouped.
+
+    Grouping is enabled by ``options.csv_group_rows``; see
+    :func:`iter_csv_documents`.
+    """
+    if options.csv_group_rows:
+        return list(iter_csv_documents(file_path, options.csv_max_chars))
 
     documents = []
     with open(file_path, newline="", encoding="utf-8") as f:
@@ -102,6 +157,57 @@ def _parse_csv(file_path: Path) -> list[Document]:
     return documents
 
 
+def iter_csv_documents(file_path: Path, max_chars: int) -> Iterator[Document]:
+    """Stream a CSV as documents of consecutive rows, in constant memory.
+
+    Each document starts with the header line so it can be understood on its
+    own, and holds as many following rows as fit in ``max_chars``. A single
+    row longer than that gets a document of its own. Row numbers are
+    1-based and exclude the header; ``row_start``/``row_end`` in the
+    metadata identify the rows for citations.
+    """
+    with open(file_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        header_line = " | ".join(header)
+
+        lines: list[str] = []
+        size = len(header_line)
+        row_start = row_end = 0
+
+        for i, row in enumerate(reader, start=1):
+            line = " | ".join(row)
+            if not line.strip(" |"):
+                continue
+            if lines and size + 1 + len(line) > max_chars:
+                yield _csv_group(file_path, header_line, lines, row_start, row_end)
+                lines, size = [], len(header_line)
+            if not lines:
+                row_start = i
+            lines.append(line)
+            size += 1 + len(line)
+            row_end = i
+
+        if lines:
+            yield _csv_group(file_path, header_line, lines, row_start, row_end)
+
+
+def _csv_group(
+    file_path: Path, header_line: str, lines: list[str], row_start: int, row_end: int
+) -> Document:
+    return Document(
+        page_content="\n".join([header_line, *lines]),
+        metadata={
+            "source": file_path.name,
+            "row_start": row_start,
+            "row_end": row_end,
+            "file_type": "csv",
+        },
+    )
+
+
 PARSERS = {
     ".pdf": _parse_pdf,
     ".docx": _parse_docx,
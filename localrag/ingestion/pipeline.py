@@ -1,17 +1,59 @@
 """Document ingestion pipeline — parse, chunk, and prepare documents for indexing."""
 
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date
 from pathlib import Path
 
 from langchain_core.documents import Document
 from loguru import logger
 
 from localrag.config import Settings
-from localrag.ingestion.parsers import parse_file
+from localrag.ingestion.cache import ParsedTextCache, file_sha256
+from localrag.ingestion.dedup import strip_repeated_lines
+from localrag.ingestion.docstore import ParentStore
+from localrag.ingestion.parsers import ParseOptions, iter_csv_documents, parse_file
 from localrag.ingestion.chunker import SemanticChunker
 
 
 SUPPORTED_EXTENSIONS = {".pdf", ".docx", ".txt", ".md", ".csv"}
 
+# Formats whose parsing is expensive enough to be worth caching
+CACHED_EXTENSIONS = {".pdf", ".docx"}
+
+# Chunk metadata carrying the parent section's text from parsing to storage;
+# removed by IngestionPipeline.store_parents before the chunk is indexed
+_PARENT_TEXT = "_parent_text"
+
+
+def list_supported_files(dir_path: Path) -> list[Path]:
+    """Return the supported files under a directory, in ingestion order."""
+    return sorted(
+        f for f in dir_path.rglob("*") if f.is_file() and f.suffix.lower() in SUPPORTED_EXTENSIONS
+    )
+
+
+@dataclass
+class ParseStats:
+    """Parse throughput counters accumulated over an ingestion run."""
+
+    pages: int = 0
+    seconds: float = 0.0
+    cache_hits: int = 0
+
+    @property
+    def pages_per_second(self) -> float:
+        return round(self.pages / self.seconds, 1) if self.seconds else 0.0
+
+    def add(self, other: "ParseStats") -> None:
+        """Fold another run's counters into this one."""
+        self.pages += other.pages
+        self.seconds += other.seconds
+        self.cache_hits += other.cache_hits
+
 
 class IngestionPipeline:
     """Orchestrates document parsing and chunking."""
@@ -21,34 +63,188 @@ class IngestionPipeline:
         self.chunker = SemanticChunker(
             chunk_size=settings.chunk_size,
             chunk_overlap=settings.chunk_overlap,
+            parent_chunk_size=settings.parent_chunk_size,
+        )
+        self.parse_options = ParseOptions(
+            pdf_workers=settings.parse_workers,
+            pdf_parallel_min_pages=settings.pdf_parallel_min_pages,
+            csv_group_rows=settings.csv_group_rows,
+            csv_max_chars=settings.chunk_size,
+        )
+        self.cache = (
+            ParsedTextCache(settings.parse_cache_path) if settings.use_parse_cache else None
+        )
+        # Parent sections for small-to-big retrieval live next to the index
+        self.parents = (
+            ParentStore(settings.chroma_path / "parents") if settings.parent_chunk_size else None
         )
 
-    def process_file(self, file_path: Path) -> list[Document]:
+    def parse(self, file_path: Path, stats: ParseStats | None = None) -> list[Document]:
+        """Parse a file, reusing cached parser output when the content is unchanged."""
+        stats = stats if stats is not None else ParseStats()
+        cacheable = self.cache is not None and file_path.suffix.lower() in CACHED_EXTENSIONS
+
+        started = time.perf_counter()
+        if cacheable:
+            file_hash = file_sha256(file_path)
+            cached = self.cache.get(file_path, file_hash)
+            if cached is not None:
+                stats.cache_hits += 1
+                logger.debug(f"Parse cache hit: {file_path.name}")
+                return cached
+
+        raw_docs = parse_file(file_path, self.parse_options)
+        stats.pages += len(raw_docs)
+        stats.seconds += time.perf_counter() - started
+
+        if cacheable:
+            self.cache.put(file_path, file_hash, raw_docs)
+        return raw_docs
+
+    def process_file(self, file_path: Path, stats: ParseStats | None = None) -> list[Document]:
         """Process a single file into chunked documents."""
+        return list(self.iter_file(file_path, stats))
+
+    def process_directory(self, dir_path: Path, stats: ParseStats | None = None) -> list[Document]:
+        """Process all supported files in a directory."""
+        return list(self.iter_directory(dir_path, stats))
+
+    def iter_file(self, file_path: Path, stats: ParseStats | None = None) -> Iterator[Document]:
+        """Yield chunked documents for a single file."""
         if file_path.suffix.lower() not in SUPPORTED_EXTENSIONS:
             logger.warning(f"Unsupported file type: {file_path.suffix}")
-            return []
+            return
 
         logger.info(f"Parsing: {file_path.name}")
-        raw_docs = parse_file(file_path)
-
-        chunks = self.chunker.split(raw_docs)
-        logger.info(f"  → {len(raw_docs)} pages → {len(chunks)} chunks")
-
+        if self._streams(file_path):
+            chunks = self._iter_csv_chunks(file_path, stats)
+        else:
+            raw_docs = self.parse(file_path, stats)
+            # Only PDF pages have running headers; other formats' "pages" are
+            # rows or sections whose repeated lines are content
+            if self.settings.strip_page_boilerplate and file_path.suffix.lower() == ".pdf":
+                raw_docs = strip_repeated_lines(raw_docs)
+            if self.parents is not None:
+                chunks = self._split_with_parents(file_path, raw_docs)
+            else:
+                chunks = self.chunker.split(raw_docs)
+                logger.info(f"  → {len(raw_docs)} pages → {len(chunks)} chunks")
+
+        # Document date (file modification day), used for date sharding, and
+        # the absolute path, used to find a file's chunks when it changes
+        doc_date = date.fromtimestamp(file_path.stat().st_mtime).isoformat()
+        source_path = str(file_path.resolve())
+        for chunk in chunks:
+            chunk.metadata.setdefault("doc_date", doc_date)
+            chunk.metadata["source_path"] = source_path
+            yield chunk
+
+    def _split_with_parents(self, file_path: Path, raw_docs: list[Document]) -> list[Document]:
+        """Chunk a file, linking each chunk to its parent section.
+
+        The parents are not stored yet: callers may drop some of the chunks
+        (e.g. when rebuilding one shard), so :meth:`store_parents` stores
+        only the parents of the chunks that are kept.
+        """
+        parents, chunks = self.chunker.split_with_parents(raw_docs)
+        for chunk in chunks:
+            text = parents[chunk.metadata.pop("parent_index")].page_content
+            chunk.metadata["parent_id"] = ParentStore.key(text)
+            chunk.metadata[_PARENT_TEXT] = text
+        logger.info(f"  → {len(raw_docs)} pages → {len(parents)} parents → {len(chunks)} chunks")
         return chunks
 
-    def process_directory(self, dir_path: Path) -> list[Document]:
-        """Process all supported files in a directory."""
-        all_chunks = []
-        files = [
-            f for f in dir_path.rglob("*")
-            if f.is_file() and f.suffix.lower() in SUPPORTED_EXTENSIONS
-        ]
-
+    def store_parents(self, chunks: list[Document]) -> None:
+        """Store the parent sections of chunks about to be indexed.
+
+        Must be called on every chunk from this pipeline before it is
+        indexed; it also strips the parent text from the chunk's metadata.
+        """
+        by_source: dict[str, dict[str, str]] = {}
+        for chunk in chunks:
+            text = chunk.metadata.pop(_PARENT_TEXT, None)
+            if text is not None:
+                texts = by_source.setdefault(chunk.metadata["source_path"], {})
+                texts[chunk.metadata["parent_id"]] = text
+        if self.parents is not None:
+            for source_path, texts in by_source.items():
+                self.parents.put(list(texts.values()), source_path)
+
+    def iter_directory(
+        self, dir_path: Path, stats: ParseStats | None = None, workers: int = 1
+    ) -> Iterator[Document]:
+        """Yield chunked documents for all supported files in a directory.
+
+        Args:
+            dir_path: Directory to walk recursively.
+            stats: Parse counters to accumulate into.
+            workers: Files parsed concurrently ahead of the consumer, so
+                parsing overlaps with embedding. Chunks are still yielded in
+                file order. Streamed files (row-grouped CSVs) are not read
+                ahead; they are parsed as they are consumed, so their memory
+                use stays constant.
+        """
+        files = list_supported_files(dir_path)
         logger.info(f"Found {len(files)} supported files in {dir_path}")
 
-        for file_path in sorted(files):
-            chunks = self.process_file(file_path)
-            all_chunks.extend(chunks)
+        if workers <= 1:
+            for file_path in files:
+                yield from self.iter_file(file_path, stats)
+            return
+
+        stats = stats if stats is not None else ParseStats()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="localrag-parse") as pool:
+            # Bound the read-ahead so at most 2 * workers parsed files sit in memory
+            pending: deque[Future | Path] = deque()
+            for file_path in files:
+                if self._streams(file_path):
+                    pending.append(file_path)
+                else:
+                    pending.append(pool.submit(self._parse_chunks, file_path))
+                if len(pending) >= 2 * workers:
+                    yield from self._collect(pending.popleft(), stats)
+            while pending:
+                yield from self._collect(pending.popleft(), stats)
+
+    def _streams(self, file_path: Path) -> bool:
+        """Whether a file is chunked as it is read rather than parsed whole."""
+        return file_path.suffix.lower() == ".csv" and self.parse_options.csv_group_rows
+
+    def _parse_chunks(self, file_path: Path) -> tuple[list[Document], ParseStats]:
+        file_stats = ParseStats()
+        return self.process_file(file_path, file_stats), file_stats
+
+    def _collect(self, item: Future | Path, stats: ParseStats) -> Iterable[Document]:
+        if isinstance(item, Path):
+            return self.iter_file(item, stats)
+        chunks, file_stats = item.result()
+        stats.add(file_stats)
+        return chunks
 
-        return all_chunks
+    def _iter_csv_chunks(self, file_path: Path, stats: ParseStats | None) -> Iterator[Document]:
+        """Stream row-grouped CSV documents; groups are already chunk-sized."""
+        stats = stats if stats is not None else ParseStats()
+        groups = iter_csv_documents(file_path, self.parse_options.csv_max_chars)
+        chunks = 0
+
+        while True:
+            # Time only the parsing, not whatever the consumer does between yields
+            started = time.perf_counter()
+            group = next(groups, None)
+            stats.seconds += time.perf_counter() - started
+            if group is None:
+                break
+            stats.pages += 1
+
+            # Only a single oversized row can exceed the limit; split it as text
+            parts = (
+                self.chunker.splitter.split_documents([group])
+                if len(group.page_content) > self.parse_options.csv_max_chars
+                else [group]
+            )
+            for part in parts:
+                part.metadata["chunk_index"] = chunks
+                chunks += 1
+                yield part
+
+        logger.info(f"  → {file_path.name}: {chunks} row-group chunks")
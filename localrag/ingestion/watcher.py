@@ -0,0 +1,276 @@
+"""Watch folders and keep the index in sync with them.
+
+Changes are detected with OS file events (inotify, FSEvents, ...) when the
+optional ``watchdog`` package is installed, and by polling with stat-only
+snapshots otherwise. Either way a file is only processed once it has been
+quiet for the debounce interval, so a burst of writes to one file costs a
+single re-ingest.
+
+The ``(mtime_ns, size)`` of every indexed file is persisted in a cursor file.
+On restart only files that differ from the cursor are re-ingested, and files
+that disappeared while the watcher was down have their chunks removed.
+"""
+
+import json
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+from localrag.ingestion.pipeline import SUPPORTED_EXTENSIONS
+
+if TYPE_CHECKING:
+    from localrag.core import LocalRAG
+
+FileState = tuple[int, int]
+
+# watchdog event types that can mean content changed; opens and read-only
+# closes (including our own parsing) are ignored
+_CHANGE_EVENTS = {"created", "modified", "deleted", "moved", "closed"}
+
+
+def _is_supported(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in SUPPORTED_EXTENSIONS
+
+
+def _stat(path: str) -> FileState | None:
+    try:
+        st = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def scan_tree(root: Path) -> dict[str, FileState]:
+    """Stat every supported file under ``root`` without reading it."""
+    states = {}
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            if _is_supported(path) and (state := _stat(path)) is not None:
+                states[path] = state
+    return states
+
+
+class WatchCursor:
+    """Last indexed state of each watched file, persisted as JSON."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.files: dict[str, FileState] = {}
+        if path.exists():
+            data = json.loads(path.read_text(encoding="utf-8"))
+            self.files = {p: tuple(state) for p, state in data.get("files", {}).items()}
+
+    def under(self, root: Path) -> list[str]:
+        """Cursor entries inside ``root``."""
+        prefix = os.path.join(str(root), "")
+        return [p for p in self.files if p.startswith(prefix)]
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"files": self.files}), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+class FolderWatcher:
+    """Incrementally ingest new, modified and deleted files under some directories.
+
+    Usage:
+        watcher = FolderWatcher(rag, ["./inbox"])
+        watcher.run()  # blocks; pass a threading.Event to stop it
+    """
+
+    def __init__(
+        self,
+        rag: "LocalRAG",
+        roots: Iterable[str | Path],
+        cursor_path: Path | None = None,
+        debounce: float | None = None,
+        poll_interval: float | None = None,
+        use_events: bool | None = None,
+        on_change: Callable[[dict], None] | None = None,
+    ):
+        """Initialize the watcher.
+
+        Args:
+            rag: Instance whose index is kept in sync.
+            roots: Directories to watch recursively.
+            cursor_path: Cursor file; defaults to ``settings.watch_cursor_path``.
+            debounce: Seconds a file must be quiet before it is processed.
+            poll_interval: Seconds between scans when polling.
+            use_events: Force (True) or disable (False) OS file events;
+                by default they are used when ``watchdog`` is installed.
+            on_change: Called with a summary dict for every file processed.
+        """
+        self.rag = rag
+        self.roots = [Path(r).resolve() for r in roots]
+        for root in self.roots:
+            if not root.is_dir():
+                raise FileNotFoundError(f"Not a directory: {root}")
+
+        settings = rag.settings
+        self.cursor = WatchCursor(cursor_path or settings.watch_cursor_path)
+        self.debounce = settings.watch_debounce if debounce is None else debounce
+        self.poll_interval = (
+            settings.watch_poll_interval if poll_interval is None else poll_interval
+        )
+        self.use_events = use_events
+        self.on_change = on_change
+
+        self._lock = threading.Lock()
+        self._pending: dict[str, float] = {}
+        self._observed: dict[str, FileState] = {}
+
+    def run(self, stop: threading.Event | None = None) -> None:
+        """Reconcile with the cursor, then watch until ``stop`` is set."""
+        stop = stop or threading.Event()
+        self._reconcile()
+        observer = self._start_observer()
+        logger.info(
+            f"Watching {[str(r) for r in self.roots]} "
+            f"({'events' if observer else 'polling'}, debounce={self.debounce}s)"
+        )
+
+        tick = min(self.poll_interval, max(self.debounce / 2, 0.1))
+        last_poll = time.monotonic()
+        try:
+            while not stop.wait(tick):
+                if observer is None and time.monotonic() - last_poll >= self.poll_interval:
+                    self._poll()
+                    last_poll = time.monotonic()
+                self.flush()
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
+
+    def flush(self, force: bool = False) -> list[dict]:
+        """Process files that have been quiet for the debounce interval.
+
+        Args:
+            force: Process every pending file regardless of debounce.
+
+        Returns:
+            One summary dict per file ingested or removed.
+        """
+        now = time.monotonic()
+        with self._lock:
+            ready = [p for p, t in self._pending.items() if force or now - t >= self.debounce]
+            for path in ready:
+                del self._pending[path]
+
+        changes = [c for c in (self._apply(path) for path in sorted(ready)) if c]
+        if changes:
+            self.cursor.save()
+        return changes
+
+    def _apply(self, path: str) -> dict | None:
+        state = _stat(path)
+        if state == self.cursor.files.get(path):
+            return None
+
+        started = time.perf_counter()
+        known = path in self.cursor.files
+        if state is None:
+            removed = self.rag.delete_document(path) if known else 0
+            self.cursor.files.pop(path, None)
+            change = {"action": "deleted", "path": path, "chunks_removed": removed}
+        else:
+            try:
+                # A changed file keeps its old chunks until the new ones are stored
+                summary = self.rag.replace_document(path) if known else self.rag.ingest(path)
+            except Exception as e:  # keep watching; the file is retried when it changes again
+                logger.error(f"Failed to ingest {path}: {e}")
+                change = {"action": "failed", "path": path, "error": str(e)}
+            else:
+                self.cursor.files[path] = state
+                change = {
+                    "action": "updated" if known else "added",
+                    "path": path,
+                    "chunks_removed": summary.get("chunks_removed", 0),
+                    "chunks_stored": summary["chunks_stored"],
+                }
+
+        change["seconds"] = round(time.perf_counter() - started, 3)
+        logger.info(f"Watch: {change}")
+        if self.on_change is not None:
+            self.on_change(change)
+        return change
+
+    def _reconcile(self) -> None:
+        """Queue everything that changed while the watcher was not running."""
+        if self.cursor.files and self.rag.get_stats()["total_chunks"] == 0:
+            logger.warning("Index is empty but the watch cursor is not; re-ingesting all files")
+            self.cursor.files.clear()
+
+        # Files already quiet for the debounce interval are processed on the first tick
+        since = time.monotonic() - self.debounce
+        with self._lock:
+            for path in self._changed_paths():
+                self._pending.setdefault(path, since)
+
+    def _changed_paths(self) -> list[str]:
+        """Paths whose on-disk state differs from the cursor, including deletions."""
+        changed, observed = [], {}
+        for root in self.roots:
+            current = scan_tree(root)
+            changed.extend(p for p, s in current.items() if self.cursor.files.get(p) != s)
+            changed.extend(p for p in self.cursor.under(root) if p not in current)
+            observed.update(current)
+        self._observed = observed
+        return changed
+
+    def _poll(self) -> None:
+        now = time.monotonic()
+        previous = self._observed
+        changed = self._changed_paths()
+        with self._lock:
+            for path in changed:
+                # Restart the debounce while the file is still being written
+                if path not in self._pending or previous.get(path) != self._observed.get(path):
+                    self._pending[path] = now
+
+    def _mark(self, path: str, is_directory: bool) -> None:
+        """Record activity on a path reported by a file event."""
+        now = time.monotonic()
+        if is_directory:
+            # Directory created, moved or removed: queue everything under it
+            paths = [*scan_tree(Path(path)), *self.cursor.under(Path(path))]
+        else:
+            paths = [path] if _is_supported(path) else []
+        with self._lock:
+            for p in paths:
+                self._pending[p] = now
+
+    def _start_observer(self):
+        if self.use_events is False:
+            return None
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            if self.use_events:
+                raise RuntimeError("File events need the watchdog package: pip install watchdog")
+            return None
+
+        watcher = self
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.event_type not in _CHANGE_EVENTS:
+                    return
+                watcher._mark(os.fsdecode(event.src_path), event.is_directory)
+                if getattr(event, "dest_path", ""):
+                    watcher._mark(os.fsdecode(event.dest_path), event.is_directory)
+
+        observer = Observer()
+        for root in self.roots:
+            observer.schedule(_Handler(), str(root), recursive=True)
+        observer.start()
+        return observer
@@ -3,6 +3,7 @@
 from abc import ABC, abstractmethod
 
 from localrag.config import Settings
+from localrag.utils.deadline import Deadline
 
 
 class BaseLLMClient(ABC):
@@ -12,14 +13,22 @@ class BaseLLMClient(ABC):
         self.settings = settings
 
     @abstractmethod
-    def generate(self, question: str, context: str) -> str:
+    def generate(self, question: str, context: str, deadline: Deadline | None = None) -> str:
         """Generate an answer given a question and retrieved context.
 
         Args:
             question: The user's question.
             context: Concatenated relevant document chunks.
+            deadline: When set, shorten the answer to fit the time left and
+                stop generating once it passes.
 
         Returns:
             Generated answer string.
+
+        Raises:
+            DeadlineExceededError: If the answer could not be finished in time.
         """
         ...
+
+    def preload(self) -> None:
+        """Warm up the model ahead of the first request; a no-op by default."""
@@ -1,36 +1,170 @@
 """Ollama client for local LLM inference."""
 
+import time
+from functools import cache
+
+import httpx
 import ollama as ollama_sdk
 from loguru import logger
 
 from localrag.config import Settings
 from localrag.llm.base import BaseLLMClient
-from localrag.llm.prompts import RAG_SYSTEM_PROMPT, format_rag_prompt
+from localrag.llm.prompts import build_messages
+from localrag.utils.deadline import Deadline, DeadlineExceededError
+from localrag.utils.tokens import count_tokens
+
+# Our token count approximates the model's own tokenizer; leave headroom
+_TOKEN_MARGIN = 1.15
+# Share of the time left that a deadline-capped answer may spend decoding;
+# the rest covers prompt evaluation, which is not known up front
+_DECODE_SHARE = 0.7
+
+
+@cache
+def _shared_client(host: str, timeout: float) -> ollama_sdk.Client:
+    """One pooled, keep-alive HTTP client per server, shared within the process."""
+    return ollama_sdk.Client(
+        host=host,
+        timeout=timeout,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=300),
+    )
+
+
+def _keep_alive(value: str) -> str | float:
+    """Ollama takes a duration string ("30m") or a number of seconds."""
+    try:
+        return float(value)
+    except ValueError:
+        return value
 
 
 class OllamaClient(BaseLLMClient):
-    """Local LLM inference via Ollama."""
+    """Local LLM inference via Ollama.
+
+    Every request sends ``keep_alive`` so the model stays loaded between
+    queries. Ollama reloads the model whenever ``num_ctx`` changes, so the
+    context window comes from a short fixed ladder (``ollama_num_ctx``,
+    doubling up to ``ollama_num_ctx_max``) and depends only on the request:
+    every worker process sends the same size for the same prompt, and a
+    reload happens only when a prompt needs a larger step than the last one.
+
+    Under a deadline the answer is streamed so it can be cut off when time
+    runs out (closing the stream makes Ollama stop generating), and
+    ``num_predict`` is lowered to what the measured decode rate can produce
+    in the time left.
+    """
 
     def __init__(self, settings: Settings):
         super().__init__(settings)
         self.model = settings.llm_model
-        self.client = ollama_sdk.Client(host=settings.ollama_base_url)
-        logger.info(f"OllamaClient initialized | model={self.model}")
+        self.client = _shared_client(settings.ollama_base_url, settings.ollama_timeout)
+        self.keep_alive = _keep_alive(settings.ollama_keep_alive)
+        self._decode_rate: float | None = None  # tokens/s, moving average
+        logger.info(
+            f"OllamaClient initialized | model={self.model} | num_ctx={settings.ollama_num_ctx}"
+        )
+
+    def preload(self) -> None:
+        """Load the model and prefill the stable prompt prefix on the server.
+
+        Failures are logged rather than raised; the first query then pays
+        the load instead.
+        """
+        if not self.settings.ollama_preload:
+            return
 
-    def generate(self, question: str, context: str) -> str:
+        started = time.perf_counter()
+        system = build_messages(question="", context="")[0]
+        try:
+            self.client.chat(
+                model=self.model,
+                messages=[system],
+                options=self._options(num_predict=1),
+                keep_alive=self.keep_alive,
+            )
+        except (ollama_sdk.ResponseError, httpx.HTTPError, ConnectionError) as e:
+            logger.warning(f"Could not preload {self.model}: {e}")
+            return
+        logger.info(
+            f"Preloaded {self.model} in {time.perf_counter() - started:.1f}s "
+            f"| keep_alive={self.keep_alive}"
+        )
+
+    def generate(self, question: str, context: str, deadline: Deadline | None = None) -> str:
         """Generate answer using local Ollama model."""
-        user_prompt = format_rag_prompt(question=question, context=context)
+        messages = build_messages(question=question, context=context)
+        prompt_tokens = sum(count_tokens(m["content"]) for m in messages)
+        options = self._options(num_ctx=self._fit_context(prompt_tokens))
+
+        if deadline is not None:
+            options["num_predict"] = self._predict_budget(deadline.remaining())
+            return self._stream(messages, options, deadline)
 
         response = self.client.chat(
             model=self.model,
-            messages=[
-                {"role": "system", "content": RAG_SYSTEM_PROMPT},
-                {"role": "user", "content": user_prompt},
-            ],
-            options={
-                "temperature": self.settings.temperature,
-                "num_predict": self.settings.max_tokens,
-            },
+            messages=messages,
+            options=options,
+            keep_alive=self.keep_alive,
         )
+        self._record_rate(response)
 
         return response["message"]["content"]
+
+    def _stream(self, messages: list[dict], options: dict, deadline: Deadline) -> str:
+        parts = []
+        stream = self.client.chat(
+            model=self.model,
+            messages=messages,
+            options=options,
+            keep_alive=self.keep_alive,
+            stream=True,
+        )
+        try:
+            for chunk in stream:
+                parts.append(chunk["message"]["content"])
+                if chunk.get("done"):
+                    self._record_rate(chunk)
+                elif deadline.expired:
+                    raise DeadlineExceededError(
+                        f"{self.model} was cut off after {len(parts)} tokens by the deadline"
+                    )
+        finally:
+            stream.close()
+        return "".join(parts)
+
+    def _predict_budget(self, seconds: float) -> int:
+        """Largest ``num_predict`` the model is expected to decode in ``seconds``."""
+        if self._decode_rate is None:
+            return self.settings.max_tokens
+        budget = int(seconds * _DECODE_SHARE * self._decode_rate)
+        return max(1, min(self.settings.max_tokens, budget))
+
+    def _record_rate(self, response) -> None:
+        count, duration = response.get("eval_count"), response.get("eval_duration")
+        if not count or not duration:
+            return
+        rate = count / (duration / 1e9)
+        if self._decode_rate is not None:
+            rate = 0.8 * self._decode_rate + 0.2 * rate
+        self._decode_rate = rate
+
+    def _options(self, **overrides) -> dict:
+        return {
+            "temperature": self.settings.temperature,
+            "num_predict": self.settings.max_tokens,
+            "num_ctx": self.settings.ollama_num_ctx,
+            **overrides,
+        }
+
+    def _fit_context(self, prompt_tokens: int) -> int:
+        """Return the smallest step of the num_ctx ladder that fits the request."""
+        needed = int(prompt_tokens * _TOKEN_MARGIN) + self.settings.max_tokens
+        num_ctx = self.settings.ollama_num_ctx
+        while num_ctx < needed and num_ctx < self.settings.ollama_num_ctx_max:
+            num_ctx = min(num_ctx * 2, self.settings.ollama_num_ctx_max)
+        if needed > num_ctx:
+            logger.warning(
+                f"Prompt needs ~{needed} tokens but num_ctx is capped at {num_ctx}; "
+                "Ollama will truncate it"
+            )
+        return num_ctx
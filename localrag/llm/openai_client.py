@@ -1,11 +1,12 @@
 """OpenAI client for cloud LLM inference."""
 
-from openai import OpenAI
+from openai import NOT_GIVEN, APITimeoutError, OpenAI
 from loguru import logger
 
 from localrag.config import Settings
 from localrag.llm.base import BaseLLMClient
-from localrag.llm.prompts import RAG_SYSTEM_PROMPT, format_rag_prompt
+from localrag.llm.prompts import build_messages
+from localrag.utils.deadline import Deadline, DeadlineExceededError
 
 
 class OpenAIClient(BaseLLMClient):
@@ -17,18 +18,17 @@ class OpenAIClient(BaseLLMClient):
         self.client = OpenAI(api_key=settings.openai_api_key)
         logger.info(f"OpenAIClient initialized | model={self.model}")
 
-    def generate(self, question: str, context: str) -> str:
+    def generate(self, question: str, context: str, deadline: Deadline | None = None) -> str:
         """Generate answer using OpenAI API."""
-        user_prompt = format_rag_prompt(question=question, context=context)
-
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": RAG_SYSTEM_PROMPT},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=self.settings.temperature,
-            max_tokens=self.settings.max_tokens,
-        )
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=build_messages(question=question, context=context),
+                temperature=self.settings.temperature,
+                max_tokens=self.settings.max_tokens,
+                timeout=deadline.remaining() if deadline else NOT_GIVEN,
+            )
+        except APITimeoutError as e:
+            raise DeadlineExceededError("OpenAI did not answer before the deadline") from e
 
         return response.choices[0].message.content
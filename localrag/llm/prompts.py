@@ -1,5 +1,7 @@
 """Prompt templates for RAG generation."""
 
+from langchain_core.documents import Document
+
 RAG_SYSTEM_PROMPT = """You are a helpful document assistant powered by LocalRAG. Your job is to answer questions based ONLY on the provided context from the user's documents.
 
 Rules:
@@ -10,13 +12,47 @@ Rules:
 5. If multiple documents are relevant, synthesize information across them."""
 
 
-def format_rag_prompt(question: str, context: str) -> str:
-    """Format the user prompt with question and retrieved context."""
-    return f"""Based on the following document excerpts, answer the question.
+RAG_INSTRUCTIONS = (
+    "Each request contains excerpts from the user's documents, each headed by its source "
+    "and location, followed by a question. Answer the question from those excerpts with a "
+    "clear, concise answer and references to the source documents."
+)
+
+
+def build_messages(question: str, context: str) -> list[dict[str, str]]:
+    """Chat messages for a RAG answer.
+
+    The system prompt and instructions come first and never vary between
+    requests, so the model server can reuse their cached prefill; only the
+    context and question that follow are processed per request.
+    """
+    return [
+        {"role": "system", "content": f"{RAG_SYSTEM_PROMPT}\n\n{RAG_INSTRUCTIONS}"},
+        {"role": "user", "content": format_rag_prompt(question=question, context=context)},
+    ]
 
-CONTEXT:
+
+def format_rag_prompt(question: str, context: str) -> str:
+    """Format the per-request part of the prompt: retrieved context and question."""
+    return f"""CONTEXT:
 {context}
 
-QUESTION: {question}
+QUESTION: {question}"""
+
+
+def format_context(documents: list[Document]) -> str:
+    """Join retrieved chunks into the prompt context, each with its citation."""
+    return "\n\n---\n\n".join(
+        f"[Source: {d.metadata.get('source', 'unknown')}, "
+        f"{_format_location(d.metadata)}]\n{d.page_content}"
+        for d in documents
+    )
+
 
-Provide a clear, concise answer with references to the source documents."""
+def _format_location(metadata: dict) -> str:
+    """Describe where in its source a chunk came from, for citations."""
+    if "row_start" in metadata:
+        return f"Rows: {metadata['row_start']}-{metadata['row_end']}"
+    if "row" in metadata:
+        return f"Row: {metadata['row']}"
+    return f"Page: {metadata.get('page', 'N/A')}"
@@ -0,0 +1,193 @@
+"""HNSW calibration — measure recall and latency of index settings on live data.
+
+Recall is measured against exact brute-force search over the same stored
+vectors, so no embedding model calls are needed: a sample of stored chunk
+embeddings is used as the query set. ``search_ef`` candidates are tried on
+the live collection (and restored afterwards); ``M`` / ``construction_ef``
+candidates need a rebuild, so they are measured on scratch copies of the
+collection that are deleted when done. Chroma only applies a changed
+``ef_search`` when it loads an index, so each candidate is measured on a
+freshly reopened collection.
+"""
+
+import time
+
+import numpy as np
+from chromadb.errors import ChromaError
+from loguru import logger
+
+from localrag.retrieval.engine import RetrievalEngine
+
+_PAGE_SIZE = 4096
+
+
+def calibrate_index(
+    engine: RetrievalEngine,
+    search_efs: list[int],
+    build_params: list[tuple[int, int]] | None = None,
+    sample_size: int = 200,
+    k: int = 10,
+    target_recall: float = 0.95,
+    seed: int = 0,
+) -> dict:
+    """Measure recall@k and latency for candidate HNSW settings.
+
+    Args:
+        engine: Engine whose collection is calibrated.
+        search_efs: Query-time ``ef`` values to try.
+        build_params: Optional ``(M, construction_ef)`` pairs to try on
+            scratch copies of the collection. Copying takes time and disk
+            proportional to the collection size.
+        sample_size: Number of stored vectors used as queries.
+        k: Neighbours compared against exact search.
+        target_recall: Recall the recommendation must reach.
+        seed: Seed for sampling query vectors.
+
+    Returns:
+        ``{"current": ..., "candidates": [...], "recommended": ...}`` where each
+        candidate has ``M``, ``construction_ef``, ``search_ef``, ``recall``,
+        ``latency_ms_p50`` and ``latency_ms_p99``. ``recommended`` is the
+        fastest candidate (by p99) reaching ``target_recall``, or None.
+    """
+    collection = engine.collection()
+    current = engine.index_params()
+    count = collection.count()
+    if count == 0:
+        raise ValueError("Collection is empty; ingest documents before calibrating")
+
+    rng = np.random.default_rng(seed)
+    sample_offsets = np.sort(rng.choice(count, size=min(sample_size, count), replace=False))
+    queries = _vectors_at(collection, sample_offsets)
+    exact = _exact_top_k(collection, queries, k, current["space"])
+    logger.info(f"Calibrating on {len(queries)} sampled vectors of {count} | k={k}")
+
+    candidates = []
+    try:
+        for ef in search_efs:
+            if not engine.set_search_ef(ef):
+                logger.warning(f"Skipping search_ef={ef}: it could not be applied")
+                continue
+            candidates.append(
+                {
+                    "M": current["M"],
+                    "construction_ef": current["construction_ef"],
+                    "search_ef": ef,
+                    **_measure(engine.collection(), queries, exact, k),
+                }
+            )
+    finally:
+        if current["search_ef"] is not None:
+            engine.set_search_ef(current["search_ef"])
+
+    for m, construction_ef in build_params or []:
+        candidates.extend(
+            _measure_rebuild(engine, queries, exact, k, m, construction_ef, search_efs, current)
+        )
+
+    reaching = [c for c in candidates if c["recall"] >= target_recall]
+    recommended = min(reaching, key=lambda c: c["latency_ms_p99"]) if reaching else None
+    return {"current": current, "candidates": candidates, "recommended": recommended}
+
+
+def _measure(collection, queries: np.ndarray, exact: list[set[str]], k: int) -> dict:
+    latencies, recalls = [], []
+    for query, truth in zip(queries, exact):
+        started = time.perf_counter()
+        result = collection.query(query_embeddings=[query.tolist()], n_results=k, include=[])
+        latencies.append((time.perf_counter() - started) * 1000)
+        recalls.append(len(truth.intersection(result["ids"][0])) / len(truth))
+
+    latencies.sort()
+    return {
+        "recall": round(float(np.mean(recalls)), 4),
+        "latency_ms_p50": round(latencies[len(latencies) // 2], 2),
+        "latency_ms_p99": round(latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))], 2),
+    }
+
+
+def _measure_rebuild(
+    engine: RetrievalEngine,
+    queries: np.ndarray,
+    exact: list[set[str]],
+    k: int,
+    m: int,
+    construction_ef: int,
+    search_efs: list[int],
+    current: dict,
+) -> list[dict]:
+    """Copy the collection with different build parameters and measure it."""
+    name = f"{engine.settings.collection_name}-calibrate-m{m}-ef{construction_ef}"
+    metadata = {
+        "hnsw:space": current["space"],
+        "hnsw:M": m,
+        "hnsw:construction_ef": construction_ef,
+    }
+    source = engine.collection()
+
+    logger.info(f"Building scratch index {name} for calibration")
+    with engine.scratch_collection(name, metadata) as scratch:
+        for offset in range(0, source.count(), _PAGE_SIZE):
+            page = source.get(include=["embeddings"], limit=_PAGE_SIZE, offset=offset)
+            scratch.add(ids=page["ids"], embeddings=page["embeddings"])
+
+        results = []
+        for ef in search_efs:
+            try:
+                scratch.modify(configuration={"hnsw": {"ef_search": ef}})
+            except (TypeError, ValueError, ChromaError) as e:
+                logger.warning(f"Skipping search_ef={ef} on {name}: {e}")
+                continue
+            results.append(
+                {
+                    "M": m,
+                    "construction_ef": construction_ef,
+                    "search_ef": ef,
+                    **_measure(engine.reload_collection(name), queries, exact, k),
+                }
+            )
+        return results
+
+
+def _vectors_at(collection, offsets: np.ndarray) -> np.ndarray:
+    """Fetch the stored embeddings at the given positions."""
+    vectors = []
+    for offset in offsets:
+        page = collection.get(include=["embeddings"], limit=1, offset=int(offset))
+        vectors.append(np.asarray(page["embeddings"][0], dtype=np.float32))
+    return np.stack(vectors)
+
+
+def _exact_top_k(collection, queries: np.ndarray, k: int, space: str) -> list[set[str]]:
+    """Brute-force top-k ids for each query, streaming the collection in pages."""
+    best_dist = np.full((len(queries), 0), np.inf, dtype=np.float32)
+    best_ids = np.empty((len(queries), 0), dtype=object)
+    for offset in range(0, collection.count(), _PAGE_SIZE):
+        page = collection.get(include=["embeddings"], limit=_PAGE_SIZE, offset=offset)
+        vectors = np.asarray(page["embeddings"], dtype=np.float32)
+        ids = np.asarray(page["ids"], dtype=object)
+
+        dist = _distances(queries, vectors, space)
+        best_dist = np.concatenate([best_dist, dist], axis=1)
+        best_ids = np.concatenate([best_ids, np.broadcast_to(ids, dist.shape)], axis=1)
+        if best_dist.shape[1] > k:
+            keep = np.argpartition(best_dist, k - 1, axis=1)[:, :k]
+            best_dist = np.take_along_axis(best_dist, keep, axis=1)
+            best_ids = np.take_along_axis(best_ids, keep, axis=1)
+
+    return [set(row) for row in best_ids]
+
+
+def _distances(queries: np.ndarray, vectors: np.ndarray, space: str) -> np.ndarray:
+    """Distances as Chroma defines them for each space (smaller is closer)."""
+    if space == "cosine":
+        q = queries / np.linalg.norm(queries, axis=1, keepdims=True).clip(min=1e-12)
+        v = vectors / np.linalg.norm(vectors, axis=1, keepdims=True).clip(min=1e-12)
+        return 1.0 - q @ v.T
+    if space == "ip":
+        return 1.0 - queries @ vectors.T
+    # Squared L2
+    return (
+        (queries**2).sum(axis=1)[:, None]
+        - 2 * queries @ vectors.T
+        + (vectors**2).sum(axis=1)[None, :]
+    )
@@ -4,6 +4,9 @@ from langchain_core.embeddings import Embeddings
 from loguru import logger
 
 from localrag.config import LLMMode, Settings
+from localrag.utils.admission import AdmissionController
+
+OPENAI_EMBED_MODEL = "text-embedding-3-small"
 
 
 def create_embedding_function(settings: Settings) -> Embeddings:
@@ -14,6 +17,17 @@ def create_embedding_function(settings: Settings) -> Embeddings:
         return _create_openai_embeddings(settings)
 
 
+def embedding_model_id(settings: Settings) -> str:
+    """Identify the model that produces embeddings, e.g. ``local:nomic-embed-text``.
+
+    Vectors from different models are not comparable, so this is recorded in
+    snapshots and checked before they are loaded.
+    """
+    if settings.mode == LLMMode.LOCAL:
+        return f"local:{settings.embed_model}"
+    return f"cloud:{OPENAI_EMBED_MODEL}"
+
+
 def _create_ollama_embeddings(settings: Settings) -> Embeddings:
     """Create Ollama-based local embeddings."""
     from langchain_community.embeddings import OllamaEmbeddings
@@ -29,8 +43,28 @@ def _create_openai_embeddings(settings: Settings) -> Embeddings:
     """Create OpenAI cloud embeddings."""
     from langchain_openai import OpenAIEmbeddings
 
-    logger.info("Using OpenAI embeddings: text-embedding-3-small")
+    logger.info(f"Using OpenAI embeddings: {OPENAI_EMBED_MODEL}")
     return OpenAIEmbeddings(
-        model="text-embedding-3-small",
+        model=OPENAI_EMBED_MODEL,
         api_key=settings.openai_api_key,
     )
+
+
+class AdmittedEmbeddings(Embeddings):
+    """Wrap an embedding function so every call holds an admission slot.
+
+    The slot is taken under the caller's current priority, so query-time
+    embeddings from interactive requests go ahead of bulk ingestion.
+    """
+
+    def __init__(self, inner: Embeddings, admission: AdmissionController):
+        self.inner = inner
+        self.admission = admission
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        with self.admission.slot():
+            return self.inner.embed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        with self.admission.slot():
+            return self.inner.embed_query(text)
@@ -1,49 +1,401 @@
 """Retrieval engine — vector search, BM25, and hybrid retrieval."""
 
+import heapq
+import json
+import os
+import threading
+import uuid
+from collections import defaultdict
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
 import chromadb
+import numpy as np
+from chromadb.api.client import SharedSystemClient
+from chromadb.errors import ChromaError
 from langchain_chroma import Chroma
 from langchain_core.documents import Document
 from loguru import logger
 
 from localrag.config import LLMMode, Settings
-from localrag.retrieval.embeddings import create_embedding_function
+from localrag.ingestion.dedup import ChunkDeduplicator, Fingerprint, chunk_ref
+from localrag.ingestion.docstore import ParentStore
+from localrag.retrieval.embeddings import (
+    AdmittedEmbeddings,
+    create_embedding_function,
+    embedding_model_id,
+)
+from localrag.retrieval.sharding import ShardRouter, relevance_from_distance
+from localrag.retrieval.snapshot import Snapshot, build_manifest, read_snapshot, write_snapshot
+from localrag.utils.admission import AdmissionController
+from localrag.utils.locking import FileLock, ReadWriteLock
 
 
 class RetrievalEngine:
-    """Manages document storage and retrieval via ChromaDB."""
+    """Manages document storage and retrieval via ChromaDB.
+
+    Several worker processes may open the same ``chroma_path``. Writes are
+    serialized through a file lock, and each write bumps a generation stamp
+    on disk; readers that see a newer generation reopen the client, because
+    Chroma otherwise keeps serving its stale in-memory vector index.
 
-    def __init__(self, settings: Settings):
+    The corpus may be partitioned over several shard collections (see
+    :mod:`localrag.retrieval.sharding`); searches then fan out to every shard
+    in parallel and the results are merged into one top-k by relevance.
+    """
+
+    def __init__(self, settings: Settings, admission: AdmissionController | None = None):
         self.settings = settings
         self.settings.chroma_path.mkdir(parents=True, exist_ok=True)
 
         self._embedding_fn = create_embedding_function(settings)
+        if admission is not None:
+            self._embedding_fn = AdmittedEmbeddings(self._embedding_fn, admission)
+
+        self._router = ShardRouter(settings)
+        self._dedup = (
+            ChunkDeduplicator(settings.chroma_path / "dedup.sqlite3", settings.dedup_threshold)
+            if settings.dedup_chunks
+            else None
+        )
+        self._stores_lock = threading.Lock()
+        self._pool: ThreadPoolExecutor | None = None
+
+        self._write_lock = FileLock(settings.chroma_path / ".write.lock")
+        self._generation_file = settings.chroma_path / ".generation"
+        self._generation = self._read_generation()
+        self._open_lock = ReadWriteLock()
+        self._open()
+        self._check_index_params()
+
+        logger.info(
+            f"RetrievalEngine initialized | collection={settings.collection_name} "
+            f"| shards={len(self._shards)} ({settings.shard_by}) | storage={settings.chroma_path}"
+        )
 
+    def _open(self) -> None:
         self._client = chromadb.PersistentClient(
-            path=str(settings.chroma_path)
+            path=str(self.settings.chroma_path)
         )
+        self._stores: dict[str, Chroma] = {}
+
+        existing = [getattr(c, "name", c) for c in self._client.list_collections()]
+        names = set(self._router.initial_shards())
+        names.update(n for n in existing if self._router.is_shard(n))
+        for name in names:
+            self._stores[name] = self._make_vectorstore(name)
 
-        self._vectorstore = Chroma(
+    @property
+    def _shards(self) -> list[str]:
+        return sorted(self._stores)
+
+    def _store(self, name: str) -> Chroma:
+        """Return the vector store for a shard, creating the shard if needed."""
+        store = self._stores.get(name)
+        if store is None:
+            with self._stores_lock:
+                store = self._stores.get(name)
+                if store is None:
+                    logger.info(f"Creating shard {name}")
+                    store = self._stores[name] = self._make_vectorstore(name)
+        return store
+
+    def _make_vectorstore(self, name: str) -> Chroma:
+        """Open a collection, creating it with the configured HNSW parameters."""
+        return Chroma(
             client=self._client,
-            collection_name=settings.collection_name,
+            collection_name=name,
             embedding_function=self._embedding_fn,
+            collection_metadata={
+                "hnsw:space": self.settings.hnsw_space,
+                "hnsw:M": self.settings.hnsw_m,
+                "hnsw:construction_ef": self.settings.hnsw_construction_ef,
+                "hnsw:search_ef": self.settings.hnsw_search_ef,
+            },
         )
 
-        logger.info(
-            f"RetrievalEngine initialized | collection={settings.collection_name} "
-            f"| storage={settings.chroma_path}"
+    def _check_index_params(self) -> None:
+        """Warn about build-time mismatches and apply search_ef to the live collection."""
+        params = self.index_params()
+        for key, wanted in (
+            ("space", self.settings.hnsw_space),
+            ("M", self.settings.hnsw_m),
+            ("construction_ef", self.settings.hnsw_construction_ef),
+        ):
+            if params.get(key) is not None and params[key] != wanted:
+                logger.warning(
+                    f"Collection was built with hnsw {key}={params[key]}, settings ask for "
+                    f"{wanted}; rebuild the collection (reset + re-ingest) to apply it"
+                )
+        # Only shards that differ are touched: modifying takes the write lock
+        # and makes every other worker reopen the index
+        self.set_search_ef(self.settings.hnsw_search_ef)
+
+    def index_params(self) -> dict:
+        """Return the HNSW parameters the live collection (first shard) actually uses."""
+        if not self._shards:
+            return {}
+        collection = self._client.get_collection(self._shards[0])
+        hnsw = (getattr(collection, "configuration", None) or {}).get("hnsw")
+        if hnsw:
+            return {
+                "space": hnsw.get("space"),
+                "M": hnsw.get("max_neighbors"),
+                "construction_ef": hnsw.get("ef_construction"),
+                "search_ef": hnsw.get("ef_search"),
+            }
+        # Older Chroma releases only expose the creation-time metadata
+        metadata = collection.metadata or {}
+        return {
+            "space": metadata.get("hnsw:space", "l2"),
+            "M": metadata.get("hnsw:M"),
+            "construction_ef": metadata.get("hnsw:construction_ef"),
+            "search_ef": metadata.get("hnsw:search_ef"),
+        }
+
+    def set_search_ef(self, search_ef: int) -> bool:
+        """Change the query-time HNSW ``ef`` of the live collection.
+
+        Other worker processes pick the change up on their next query, and
+        this one reopens the index right away. Shards already using
+        ``search_ef`` are left alone, and if none differ the index is not
+        written at all.
+
+        Returns:
+            False if this Chroma version can't change it after creation.
+        """
+        stale = [name for name in self._shards if self._search_ef(name) != search_ef]
+        if not stale:
+            return True
+        with self._writing():
+            applied = self._modify_search_ef(search_ef, stale)
+        self._reopen()
+        return applied
+
+    def _search_ef(self, name: str) -> int | None:
+        collection = self._client.get_collection(name)
+        hnsw = (getattr(collection, "configuration", None) or {}).get("hnsw")
+        if hnsw:
+            return hnsw.get("ef_search")
+        return (collection.metadata or {}).get("hnsw:search_ef")
+
+    def _modify_search_ef(self, search_ef: int, shards: list[str]) -> bool:
+        for name in shards:
+            collection = self._client.get_collection(name)
+            try:
+                collection.modify(configuration={"hnsw": {"ef_search": search_ef}})
+            except (TypeError, ValueError, ChromaError) as e:
+                logger.warning(f"Cannot change search_ef on an existing collection: {e}")
+                return False
+        return True
+
+    def collection(self):
+        """Return the underlying Chroma collection, for maintenance tools.
+
+        When sharded this is the largest shard, which is representative of
+        the recall/latency trade-off of the others.
+        """
+        self._refresh_if_stale()
+        collections = [self._client.get_collection(name) for name in self._shards]
+        if not collections:
+            raise ValueError("No shards exist yet; ingest documents first")
+        return max(collections, key=lambda c: c.count())
+
+    def reload_collection(self, name: str):
+        """Return a collection from a freshly opened client.
+
+        Chroma keeps using the ``ef_search`` an index was loaded with, so a
+        changed value only takes effect once the collection is reopened.
+        """
+        self._reopen()
+        return self._client.get_collection(name)
+
+    @contextmanager
+    def scratch_collection(self, name: str, metadata: dict) -> Iterator:
+        """Create a temporary collection next to the live one, deleted on exit."""
+        collection = self._client.create_collection(
+            name, metadata=metadata, embedding_function=None
         )
+        try:
+            yield collection
+        finally:
+            self._client.delete_collection(name)
+
+    def _read_generation(self) -> int:
+        try:
+            return int(self._generation_file.read_text() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _reopen(self) -> None:
+        with self._open_lock.write():
+            SharedSystemClient.clear_system_cache()
+            self._open()
+
+    def _refresh_if_stale(self) -> None:
+        """Reopen the client if another process has written since we opened it."""
+        generation = self._read_generation()
+        if generation == self._generation:
+            return
+
+        with self._open_lock.write():
+            if generation != self._generation:
+                logger.debug(f"Index changed on disk (generation {generation}), reopening")
+                SharedSystemClient.clear_system_cache()
+                self._open()
+                self._generation = generation
+
+    @contextmanager
+    def _reading(self) -> Iterator[None]:
+        self._refresh_if_stale()
+        with self._open_lock.read():
+            yield
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        with self._write_lock:
+            # Never write through a stale view of another process's changes
+            self._refresh_if_stale()
+            try:
+                with self._open_lock.read():
+                    yield
+            finally:
+                self._generation += 1
+                # Atomic replace so concurrent readers never see a partial stamp
+                tmp = self._generation_file.with_suffix(f".{os.getpid()}.tmp")
+                tmp.write_text(str(self._generation))
+                os.replace(tmp, self._generation_file)
+
+    def shard_for(self, metadata: dict) -> str:
+        """Return the shard a chunk with this metadata is stored in."""
+        return self._router.shard_for(metadata)
 
     def add_documents(self, documents: list[Document]) -> int:
         """Add documents to the vector store.
 
+        With deduplication on, a chunk that duplicates one already stored in
+        the same shard is not embedded; the stored chunk records it as an
+        additional source instead.
+
         Returns:
-            Number of chunks successfully stored.
+            Number of new chunks stored.
         """
         if not documents:
             return 0
 
-        self._vectorstore.add_documents(documents)
-        return len(documents)
+        # Fingerprint outside the write lock; it is pure CPU work
+        fingerprints = (
+            [Fingerprint.of(doc.page_content) for doc in documents]
+            if self._dedup is not None
+            else [None] * len(documents)
+        )
+
+        by_shard: dict[str, list[tuple[str, Document]]] = defaultdict(list)
+        duplicated: set[str] = set()
+        with self._writing():
+            try:
+                for doc, fingerprint in zip(documents, fingerprints):
+                    name = self._router.shard_for(doc.metadata)
+                    chunk_id = str(uuid.uuid4())
+                    if fingerprint is not None:
+                        ref = chunk_ref(doc.metadata)
+                        existing = self._dedup.find(fingerprint, name)
+                        if existing is not None:
+                            self._dedup.add_ref(existing, ref)
+                            duplicated.add(existing)
+                            continue
+                        self._dedup.add(chunk_id, name, fingerprint, ref)
+                    by_shard[name].append((chunk_id, doc))
+
+                for name, items in by_shard.items():
+                    self._store(name).add_documents(
+                        [doc for _, doc in items], ids=[chunk_id for chunk_id, _ in items]
+                    )
+                self._sync_sources(duplicated)
+            except BaseException:
+                if self._dedup is not None:
+                    self._dedup.rollback()
+                raise
+            if self._dedup is not None:
+                self._dedup.commit()
+
+        stored = sum(len(items) for items in by_shard.values())
+        if stored < len(documents):
+            logger.info(f"Deduplicated {len(documents) - stored} of {len(documents)} chunks")
+        return stored
+
+    def delete_source(self, source_path: str) -> int:
+        """Delete every chunk ingested from the file at ``source_path``.
+
+        Deduplicated chunks that other files also contain are kept and
+        attributed to one of those files instead.
+
+        Returns:
+            Number of chunks deleted.
+        """
+        where = {"source_path": source_path}
+        deleted = 0
+        with self._writing():
+            shared = set(self._dedup.remove_source(source_path)) if self._dedup else set()
+            for name in self._shards:
+                collection = self._client.get_collection(name)
+                ids = collection.get(where=where, include=[])["ids"]
+                doomed = [i for i in ids if self._dedup is None or not self._dedup.refs(i)]
+                if doomed:
+                    collection.delete(ids=doomed)
+                    deleted += len(doomed)
+                if self._dedup is not None:
+                    self._dedup.forget(doomed)
+                shared.difference_update(doomed)
+            self._sync_sources(shared)
+            if self._dedup is not None:
+                self._dedup.commit()
+        return deleted
+
+    def rename_source(self, old: str, new: str) -> int:
+        """Attribute every chunk ingested from ``old`` to ``new`` instead.
+
+        Returns:
+            Number of chunks whose metadata changed.
+        """
+        where = {"source_path": old}
+        renamed = 0
+        with self._writing():
+            for name in self._shards:
+                collection = self._client.get_collection(name)
+                ids = collection.get(where=where, include=[])["ids"]
+                if ids:
+                    collection.update(ids=ids, metadatas=[{"source_path": new}] * len(ids))
+                    renamed += len(ids)
+            if self._dedup is not None:
+                self._dedup.rename_source(old, new)
+                self._dedup.commit()
+        return renamed
+
+    def _sync_sources(self, chunk_ids: set[str]) -> None:
+        """Write the recorded sources of deduplicated chunks into their metadata."""
+        if self._dedup is None:
+            return
+        for chunk_id in sorted(chunk_ids):
+            refs = self._dedup.refs(chunk_id)
+            shard = self._dedup.shard_of(chunk_id)
+            if not refs or shard is None:
+                continue
+            primary, others = refs[0], refs[1:]
+            duplicate_sources = sorted({r["source"] for r in others})
+            # Chroma merges metadata on update; None removes a key
+            self._client.get_collection(shard).update(
+                ids=[chunk_id],
+                metadatas=[
+                    {
+                        **primary,
+                        "duplicate_count": len(others) or None,
+                        "duplicate_sources": json.dumps(duplicate_sources) if others else None,
+                    }
+                ],
+            )
 
     def search(self, query: str, top_k: int = 5) -> list[Document]:
         """Search for relevant document chunks.
@@ -55,9 +407,14 @@ class RetrievalEngine:
         Returns:
             List of relevant Documents with metadata.
         """
-        results = self._vectorstore.similarity_search_with_relevance_scores(
-            query, k=top_k
-        )
+        with self._reading():
+            stores = list(self._stores.values())
+            if not stores:
+                return []
+            if len(stores) == 1:
+                results = stores[0].similarity_search_with_relevance_scores(query, k=top_k)
+            else:
+                results = self._search_shards(stores, query, top_k)
 
         documents = []
         for doc, score in results:
@@ -67,21 +424,284 @@ class RetrievalEngine:
         logger.debug(f"Retrieved {len(documents)} chunks for query: '{query[:50]}...'")
         return documents
 
+    def _search_shards(
+        self, stores: list[Chroma], query: str, top_k: int
+    ) -> list[tuple[Document, float]]:
+        """Embed once, query every shard concurrently and merge a global top-k."""
+        if self._pool is None:
+            with self._stores_lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.settings.shard_search_workers,
+                        thread_name_prefix="localrag-shard",
+                    )
+
+        vector = self._embedding_fn.embed_query(query)
+        futures = [
+            self._pool.submit(
+                store.similarity_search_by_vector_with_relevance_scores, vector, top_k
+            )
+            for store in stores
+        ]
+
+        space = self.settings.hnsw_space
+        hits = [
+            (doc, relevance_from_distance(distance, space))
+            for future in futures
+            for doc, distance in future.result()
+        ]
+        return heapq.nlargest(top_k, hits, key=lambda hit: hit[1])
+
+    def shard_counts(self) -> dict[str, int]:
+        """Return the number of chunks in each shard."""
+        with self._reading():
+            return {name: self._client.get_collection(name).count() for name in self._shards}
+
+    def source_paths(self, shards: list[str] | None = None) -> set[str]:
+        """Return the path of every file that has chunks in the index.
+
+        Args:
+            shards: Only look in these shards instead of the whole index.
+        """
+        paths = set()
+        with self._reading():
+            page_size = self._client.get_max_batch_size()
+            names = self._shards if shards is None else [n for n in shards if n in self._stores]
+            for name in names:
+                collection = self._client.get_collection(name)
+                for offset in range(0, collection.count(), page_size):
+                    page = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+                    paths.update(
+                        m["source_path"] for m in page["metadatas"] if m and "source_path" in m
+                    )
+            if self._dedup is not None:
+                paths.update(self._dedup.source_paths(names))
+        return paths
+
     def get_stats(self) -> dict:
         """Return collection statistics."""
-        collection = self._client.get_collection(self.settings.collection_name)
-        return {
+        counts = self.shard_counts()
+        stats = {
             "collection": self.settings.collection_name,
-            "total_chunks": collection.count(),
+            "total_chunks": sum(counts.values()),
             "storage_path": str(self.settings.chroma_path),
+            "index": self.index_params(),
         }
+        if self._router.enabled:
+            stats["shards"] = counts
+        return stats
+
+    def drop_shard(self, name: str) -> int:
+        """Delete one shard's chunks without touching the others.
+
+        Hash shards are recreated empty so new chunks can still route to
+        them; date shards are removed entirely.
+
+        Returns:
+            Number of chunks deleted.
+
+        Raises:
+            ValueError: If ``name`` is not a shard of this index.
+        """
+        with self._writing():
+            if name not in self._stores:
+                raise ValueError(f"Unknown shard: {name}")
+            removed = self._drop(name)
+        logger.warning(f"Dropped shard {name} ({removed} chunks)")
+        return removed
+
+    def shards_before(self, year: int) -> list[str]:
+        """Return every date shard covering a year before ``year``.
+
+        Raises:
+            ValueError: If the index is not sharded by date.
+        """
+        if self.settings.shard_by != "date":
+            raise ValueError("Retention by age requires LOCALRAG_SHARD_BY=date")
+        return [
+            name
+            for name in self._shards
+            if self._router.shard_year(name) is not None and self._router.shard_year(name) < year
+        ]
+
+    def drop_shards_before(self, year: int) -> list[str]:
+        """Drop every date shard covering a year before ``year``.
+
+        Returns:
+            Names of the dropped shards.
+
+        Raises:
+            ValueError: If the index is not sharded by date.
+        """
+        with self._writing():
+            expired = self.shards_before(year)
+            for name in expired:
+                self._drop(name)
+        if expired:
+            logger.warning(f"Dropped shards older than {year}: {expired}")
+        return expired
 
     def reset(self) -> None:
         """Delete all documents in the collection."""
-        self._client.delete_collection(self.settings.collection_name)
-        # Recreate empty collection
-        self._vectorstore = Chroma(
-            client=self._client,
-            collection_name=self.settings.collection_name,
-            embedding_function=self._embedding_fn,
+        with self._writing():
+            self._reset_collection()
+
+    def _drop(self, name: str) -> int:
+        removed = self._client.get_collection(name).count()
+        self._client.delete_collection(name)
+        if self._dedup is not None:
+            self._dedup.drop_shard(name)
+            self._dedup.commit()
+        with self._stores_lock:
+            del self._stores[name]
+            if name in self._router.initial_shards():
+                self._stores[name] = self._make_vectorstore(name)
+        return removed
+
+    def _reset_collection(self) -> None:
+        for name in self._shards:
+            self._drop(name)
+
+    def export_snapshot(self, path: Path, parents: ParentStore | None = None) -> dict:
+        """Write every chunk, its metadata and embedding to a snapshot file.
+
+        The write lock is held while chunks are read, so the snapshot is
+        consistent even when other processes are ingesting.
+
+        Args:
+            path: Snapshot file to write.
+            parents: Store to copy the chunks' parent sections from.
+
+        Returns:
+            The snapshot manifest.
+        """
+        ids, documents, metadatas, embeddings, refs = [], [], [], [], []
+        with self._write_lock:
+            self._refresh_if_stale()
+            page_size = self._client.get_max_batch_size()
+            for name in self._shards:
+                collection = self._client.get_collection(name)
+                for offset in range(0, collection.count(), page_size):
+                    page = collection.get(
+                        include=["documents", "metadatas", "embeddings"],
+                        limit=page_size,
+                        offset=offset,
+                    )
+                    if not page["ids"]:
+                        continue
+                    ids.extend(page["ids"])
+                    documents.extend(page["documents"])
+                    metadatas.extend(m or {} for m in page["metadatas"])
+                    embeddings.append(np.asarray(page["embeddings"], dtype=np.float32))
+                    if self._dedup is not None:
+                        refs.extend(self._dedup.refs(i) for i in page["ids"])
+
+            parent_texts = {}
+            if parents is not None:
+                parent_ids = {
+                    ref["parent_id"]
+                    for row in range(len(ids))
+                    for ref in _chunk_refs(metadatas, refs, row)
+                    if ref.get("parent_id")
+                }
+                parent_texts = parents.get(parent_ids)
+
+        vectors = np.concatenate(embeddings) if embeddings else np.zeros((0, 0), np.float32)
+        manifest = build_manifest(
+            collection=self.settings.collection_name,
+            embed_model=embedding_model_id(self.settings),
+            count=len(ids),
+            dim=int(vectors.shape[1]) if vectors.ndim == 2 else 0,
+        )
+        write_snapshot(
+            path, Snapshot(manifest, ids, documents, metadatas, vectors, refs, parent_texts)
         )
+
+        logger.info(
+            f"Exported {len(ids)} chunks and {len(parent_texts)} parents to snapshot {path}"
+        )
+        return manifest
+
+    def _restore_refs(self, snapshot: Snapshot, row: int, shard: str) -> None:
+        """Register an imported chunk with every source recorded in the snapshot."""
+        refs = _chunk_refs(snapshot.metadatas, snapshot.refs, row)
+        chunk_id = snapshot.ids[row]
+        self._dedup.add(chunk_id, shard, Fingerprint.of(snapshot.documents[row]), refs[0])
+        for ref in refs[1:]:
+            self._dedup.add_ref(chunk_id, ref)
+
+    def _restore_parents(self, snapshot: Snapshot, parents: ParentStore) -> None:
+        """Store the snapshot's parent sections under every file that uses them."""
+        by_source: dict[str, dict[str, str]] = defaultdict(dict)
+        for row in range(len(snapshot)):
+            for ref in _chunk_refs(snapshot.metadatas, snapshot.refs, row):
+                parent_id = ref.get("parent_id")
+                if ref.get("source_path") and parent_id in snapshot.parents:
+                    by_source[ref["source_path"]][parent_id] = snapshot.parents[parent_id]
+        for source_path, texts in by_source.items():
+            parents.put(list(texts.values()), source_path)
+
+    def import_snapshot(
+        self, path: Path, replace: bool = False, parents: ParentStore | None = None
+    ) -> dict:
+        """Bulk-load a snapshot without calling the embedding model.
+
+        Args:
+            path: Snapshot file written by :meth:`export_snapshot`.
+            replace: Drop the existing collection first instead of upserting
+                into it.
+            parents: Store to load the snapshot's parent sections into.
+
+        Returns:
+            The snapshot manifest.
+
+        Raises:
+            ValueError: If the snapshot was built with a different embedding
+                model than the one currently configured.
+        """
+        snapshot = read_snapshot(path)
+        expected = embedding_model_id(self.settings)
+        if snapshot.manifest["embed_model"] != expected:
+            raise ValueError(
+                f"Snapshot embeddings come from {snapshot.manifest['embed_model']}, "
+                f"but this index uses {expected}"
+            )
+
+        # Chunks are re-routed, so a snapshot loads into any shard layout
+        by_shard: dict[str, list[int]] = defaultdict(list)
+        for i, metadata in enumerate(snapshot.metadatas):
+            by_shard[self._router.shard_for(metadata)].append(i)
+
+        with self._writing():
+            if replace:
+                self._reset_collection()
+            # Parents first, so an imported chunk is never searchable without its parent
+            if parents is not None and snapshot.parents:
+                self._restore_parents(snapshot, parents)
+
+            batch_size = self._client.get_max_batch_size()
+            for name, rows in by_shard.items():
+                self._store(name)
+                collection = self._client.get_collection(name)
+                for start in range(0, len(rows), batch_size):
+                    batch = rows[start : start + batch_size]
+                    collection.upsert(
+                        ids=[snapshot.ids[i] for i in batch],
+                        documents=[snapshot.documents[i] for i in batch],
+                        # Chroma rejects empty metadata dicts
+                        metadatas=[snapshot.metadatas[i] or None for i in batch],
+                        embeddings=snapshot.embeddings[batch],
+                    )
+                    if self._dedup is not None:
+                        for i in batch:
+                            self._restore_refs(snapshot, i, name)
+            if self._dedup is not None:
+                self._dedup.commit()
+
+        logger.info(f"Imported {len(snapshot)} chunks from snapshot {path}")
+        return snapshot.manifest
+
+
+def _chunk_refs(metadatas: list[dict], refs: list[list[dict]], row: int) -> list[dict]:
+    """Every source of one exported chunk; just its own metadata without dedup refs."""
+    return (refs[row] if refs else None) or [chunk_ref(metadatas[row])]
@@ -0,0 +1,78 @@
+"""Shard routing — which collection a chunk lives in.
+
+With ``shard_by="source"`` the corpus is split over ``num_shards`` collections
+by a stable hash of the source file name, so every chunk of a file lands in the
+same shard. With ``shard_by="date"`` there is one collection per year of the
+document date (``doc_date`` metadata, taken from the file's modification time
+at ingestion), which makes age-based retention a matter of dropping whole
+shards. ``shard_by="none"`` keeps the single ``collection_name`` collection.
+"""
+
+import hashlib
+import math
+import re
+from datetime import date
+
+from localrag.config import Settings
+
+
+class ShardRouter:
+    """Map chunk metadata to shard collection names."""
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.base = settings.collection_name
+        self.scheme = settings.shard_by
+        self._pattern = re.compile(rf"^{re.escape(self.base)}-(s\d{{3}}|y\d{{4}})$")
+
+    @property
+    def enabled(self) -> bool:
+        return self.scheme != "none"
+
+    def shard_for(self, metadata: dict) -> str:
+        """Return the collection a chunk with this metadata belongs in."""
+        if self.scheme == "source":
+            source = str(metadata.get("source", "")).encode("utf-8")
+            digest = hashlib.blake2b(source, digest_size=8).digest()
+            return self._hash_shard(int.from_bytes(digest, "big") % self.settings.num_shards)
+        if self.scheme == "date":
+            doc_date = str(metadata.get("doc_date") or date.today().isoformat())
+            return f"{self.base}-y{doc_date[:4]}"
+        return self.base
+
+    def initial_shards(self) -> list[str]:
+        """Shards that always exist: the fixed hash shards, or the single collection."""
+        if self.scheme == "source":
+            return [self._hash_shard(i) for i in range(self.settings.num_shards)]
+        if self.scheme == "date":
+            return []
+        return [self.base]
+
+    def is_shard(self, name: str) -> bool:
+        """Whether a collection name belongs to this router's scheme."""
+        if not self.enabled:
+            return name == self.base
+        match = self._pattern.match(name)
+        return bool(match) and match.group(1)[0] == ("s" if self.scheme == "source" else "y")
+
+    def shard_year(self, name: str) -> int | None:
+        """Year covered by a date shard, or None for other shards."""
+        match = self._pattern.match(name)
+        if match and match.group(1).startswith("y"):
+            return int(match.group(1)[1:])
+        return None
+
+    def _hash_shard(self, index: int) -> str:
+        return f"{self.base}-s{index:03d}"
+
+
+def relevance_from_distance(distance: float, space: str) -> float:
+    """Turn a Chroma distance into the same relevance score LangChain reports.
+
+    Needed to merge results from several shards on a common scale.
+    """
+    if space == "cosine":
+        return 1.0 - distance
+    if space == "ip":
+        return 1.0 - distance if distance > 0 else -1.0 * distance
+    return 1.0 - distance / math.sqrt(2)
@@ -0,0 +1,152 @@
+"""Index snapshots — portable, compressed dumps of a vector collection.
+
+A snapshot is a single ``.npz`` archive holding every chunk's id, text,
+metadata and embedding, every source recorded for deduplicated chunks, the
+parent sections the chunks point to, and a JSON manifest recording the format
+version and the embedding model that produced the vectors. Loading a snapshot
+writes the stored embeddings straight into Chroma, so a new replica never has
+to call the embedding model.
+
+Strings are stored columnar as one UTF-8 byte buffer plus an offsets array,
+which keeps the archive free of pickled objects.
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+@dataclass
+class Snapshot:
+    """In-memory contents of a snapshot file."""
+
+    manifest: dict
+    ids: list[str]
+    documents: list[str]
+    metadatas: list[dict]
+    embeddings: np.ndarray
+    # Every source of each chunk, parallel to ``ids``; empty when the index
+    # does not deduplicate chunks
+    refs: list[list[dict]] = field(default_factory=list)
+    # Parent section text by parent id, for small-to-big retrieval
+    parents: dict[str, str] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def build_manifest(collection: str, embed_model: str, count: int, dim: int) -> dict:
+    from localrag import __version__
+
+    return {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "localrag_version": __version__,
+        "collection": collection,
+        "embed_model": embed_model,
+        "count": count,
+        "dim": dim,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def write_snapshot(path: Path, snapshot: Snapshot) -> None:
+    """Write a snapshot atomically to ``path``."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    id_bytes, id_offsets = _pack_strings(snapshot.ids)
+    doc_bytes, doc_offsets = _pack_strings(snapshot.documents)
+    meta_bytes, meta_offsets = _pack_strings(
+        [json.dumps(m, separators=(",", ":")) for m in snapshot.metadatas]
+    )
+    ref_bytes, ref_offsets = _pack_strings(
+        [json.dumps(r, separators=(",", ":")) for r in snapshot.refs]
+    )
+    parent_id_bytes, parent_id_offsets = _pack_strings(list(snapshot.parents))
+    parent_bytes, parent_offsets = _pack_strings(list(snapshot.parents.values()))
+
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        np.savez_compressed(
+            f,
+            manifest=np.frombuffer(json.dumps(snapshot.manifest).encode(), dtype=np.uint8),
+            ids=id_bytes,
+            id_offsets=id_offsets,
+            documents=doc_bytes,
+            document_offsets=doc_offsets,
+            metadatas=meta_bytes,
+            metadata_offsets=meta_offsets,
+            embeddings=snapshot.embeddings.astype(np.float32, copy=False),
+            refs=ref_bytes,
+            ref_offsets=ref_offsets,
+            parent_ids=parent_id_bytes,
+            parent_id_offsets=parent_id_offsets,
+            parents=parent_bytes,
+            parent_offsets=parent_offsets,
+        )
+    os.replace(tmp, path)
+
+
+def read_snapshot(path: Path) -> Snapshot:
+    """Load a snapshot written by :func:`write_snapshot`.
+
+    Raises:
+        FileNotFoundError: If ``path`` does not exist.
+        ValueError: If the file is not a snapshot of a supported version.
+    """
+    if not path.is_file():
+        raise FileNotFoundError(f"Snapshot not found: {path}")
+
+    with np.load(path, allow_pickle=False) as data:
+        if "manifest" not in data:
+            raise ValueError(f"{path} is not a LocalRAG snapshot")
+        manifest = json.loads(data["manifest"].tobytes().decode())
+        if manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported snapshot format {manifest.get('format_version')} "
+                f"(expected {SNAPSHOT_FORMAT_VERSION})"
+            )
+
+        # Snapshots written before refs and parents were recorded lack their arrays
+        refs = (
+            [json.loads(r) for r in _unpack_strings(data["refs"], data["ref_offsets"])]
+            if "refs" in data
+            else []
+        )
+        parents = (
+            dict(
+                zip(
+                    _unpack_strings(data["parent_ids"], data["parent_id_offsets"]),
+                    _unpack_strings(data["parents"], data["parent_offsets"]),
+                )
+            )
+            if "parents" in data
+            else {}
+        )
+        return Snapshot(
+            manifest=manifest,
+            ids=_unpack_strings(data["ids"], data["id_offsets"]),
+            documents=_unpack_strings(data["documents"], data["document_offsets"]),
+            metadatas=[
+                json.loads(m) for m in _unpack_strings(data["metadatas"], data["metadata_offsets"])
+            ],
+            embeddings=data["embeddings"],
+            refs=refs,
+            parents=parents,
+        )
+
+
+def _pack_strings(values: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    encoded = [v.encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _unpack_strings(buffer: np.ndarray, offsets: np.ndarray) -> list[str]:
+    raw = buffer.tobytes()
+    return [raw[offsets[i] : offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
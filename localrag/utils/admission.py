@@ -0,0 +1,285 @@
+"""Admission control — bounded, prioritized concurrency limits for model calls.
+
+Generation and embedding calls are expensive and share a single backend
+(usually one Ollama server). Instead of letting every request hit the backend
+at once and slow down together, callers acquire a slot from an
+:class:`AdmissionController`. When all slots are busy, callers wait in a
+bounded priority queue; when the queue is full, or the wait takes too long,
+the call is rejected with a retry hint so the API can answer 429/503.
+
+The limits apply per process unless the controller is given a
+:class:`~localrag.utils.locking.FileSemaphore`. Every process using the same
+semaphore directory (API workers, CLI bulk loads, the watcher) then shares
+``max_concurrent`` slots, and priority classes are honoured across them.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+
+from loguru import logger
+
+from localrag.utils.deadline import current_deadline
+from localrag.utils.locking import FileSemaphore
+
+
+class Priority(IntEnum):
+    """Priority classes, lower values are admitted first."""
+
+    INTERACTIVE = 0
+    INGEST = 1
+    BATCH = 2
+
+
+_current_priority: ContextVar[Priority] = ContextVar(
+    "localrag_priority", default=Priority.INTERACTIVE
+)
+
+
+@contextmanager
+def priority_scope(priority: Priority) -> Iterator[None]:
+    """Run the enclosed model calls under the given priority class."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> Priority:
+    """Return the priority class of the calling context."""
+    return _current_priority.get()
+
+
+class AdmissionError(RuntimeError):
+    """Raised when a call cannot be admitted.
+
+    Attributes:
+        status_code: HTTP status the API should answer with.
+        retry_after: Suggested client back-off in seconds.
+    """
+
+    status_code = 503
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class QueueFullError(AdmissionError):
+    """The wait queue is at capacity — the caller should back off."""
+
+    status_code = 429
+
+
+class AdmissionTimeoutError(AdmissionError):
+    """The caller waited longer than the admission timeout."""
+
+    status_code = 503
+
+
+class AdmissionController:
+    """Limit concurrent calls with a bounded, prioritized wait queue.
+
+    Args:
+        name: Label used in logs and stats (e.g. "llm", "embeddings").
+        max_concurrent: Calls allowed to run at the same time.
+        max_queue: Callers allowed to wait for a slot; beyond this new
+            callers are rejected immediately with :class:`QueueFullError`.
+        timeout: Default maximum wait for a slot, in seconds.
+        shared: Semaphore of ``max_concurrent`` slots shared with other
+            processes; after a call is admitted here it also waits for one of
+            those slots. None limits this process only.
+    """
+
+    _WAIT_WINDOW = 1000
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrent: int,
+        max_queue: int,
+        timeout: float,
+        shared: FileSemaphore | None = None,
+    ):
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+        if max_queue < 0:
+            raise ValueError("max_queue must not be negative")
+
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._shared = shared
+
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiters: list[tuple[int, int]] = []
+        self._counter = itertools.count()
+
+        self._closed = False
+
+        self._admitted = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._waits: deque[float] = deque(maxlen=self._WAIT_WINDOW)
+        self._service_time = 0.0
+
+    @contextmanager
+    def slot(
+        self, priority: Priority | None = None, timeout: float | None = None
+    ) -> Iterator[None]:
+        """Hold a concurrency slot for the duration of the ``with`` block.
+
+        Args:
+            priority: Priority class; defaults to the current
+                :func:`priority_scope`.
+            timeout: Maximum wait in seconds; defaults to the controller's.
+                Never longer than the time left before the current
+                request deadline, if one is set.
+
+        Raises:
+            QueueFullError: If the wait queue is already full.
+            AdmissionTimeoutError: If no slot frees up in time.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = current_deadline()
+        if deadline is not None:
+            timeout = min(timeout, deadline.remaining())
+        priority = current_priority() if priority is None else priority
+        requested = time.monotonic()
+        self._acquire(priority, timeout)
+        shared_slot = None
+        if self._shared is not None:
+            shared_slot = self._shared.acquire(
+                int(priority), timeout - (time.monotonic() - requested)
+            )
+            if shared_slot is None:
+                self._release()
+                self._reject_timeout(timeout)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            if shared_slot is not None:
+                self._shared.release(shared_slot)
+            self._release(time.monotonic() - started)
+
+    def _acquire(self, priority: Priority, timeout: float) -> None:
+        requested = time.monotonic()
+        with self._cond:
+            if self._closed:
+                raise AdmissionError(f"{self.name} is shutting down", retry_after=5.0)
+
+            if not self._waiters and self._active < self.max_concurrent:
+                self._admit(0.0)
+                return
+
+            if len(self._waiters) >= self.max_queue:
+                self._rejected += 1
+                logger.warning(f"{self.name} admission rejected: queue full")
+                raise QueueFullError(
+                    f"{self.name} queue is full ({self.max_queue} waiting)",
+                    retry_after=self._retry_after(),
+                )
+
+            ticket = (int(priority), next(self._counter))
+            heapq.heappush(self._waiters, ticket)
+            deadline = requested + max(timeout, 0.0)
+
+            while self._waiters[0] != ticket or self._active >= self.max_concurrent:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._waiters.remove(ticket)
+                    heapq.heapify(self._waiters)
+                    # Our departure may unblock the next waiter in line
+                    self._cond.notify_all()
+                    self._reject_timeout(timeout)
+                self._cond.wait(remaining)
+
+            heapq.heappop(self._waiters)
+            self._admit(time.monotonic() - requested)
+            self._cond.notify_all()
+
+    def _admit(self, waited: float) -> None:
+        self._active += 1
+        self._admitted += 1
+        self._waits.append(waited)
+
+    def _reject_timeout(self, timeout: float) -> None:
+        with self._cond:
+            self._timed_out += 1
+            logger.warning(f"{self.name} admission timed out after {timeout:.1f}s")
+            raise AdmissionTimeoutError(
+                f"{self.name} admission timed out after {timeout:.1f}s",
+                retry_after=self._retry_after(),
+            )
+
+    def _release(self, elapsed: float | None = None) -> None:
+        """Free a slot; ``elapsed`` is how long the call ran, if it ran."""
+        with self._cond:
+            self._active -= 1
+            # Exponentially weighted service time drives Retry-After estimates
+            if elapsed is not None:
+                self._service_time = (
+                    0.8 * self._service_time + 0.2 * elapsed if self._service_time else elapsed
+                )
+            self._cond.notify_all()
+
+    def drain(self, timeout: float) -> bool:
+        """Stop admitting new calls and wait for queued and running ones to finish.
+
+        Returns:
+            True if everything finished within ``timeout`` seconds.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._closed = True
+            while self._active or self._waiters:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def _retry_after(self) -> float:
+        """Estimate how long until the current backlog drains."""
+        backlog = len(self._waiters) + self._active
+        estimate = backlog * self._service_time / self.max_concurrent
+        return max(1.0, round(estimate, 1))
+
+    def get_stats(self) -> dict:
+        """Return queue depth, wait times and rejection counters."""
+        with self._cond:
+            waits = sorted(self._waits)
+            queued_by_priority = {p.name.lower(): 0 for p in Priority}
+            for priority, _ in self._waiters:
+                queued_by_priority[Priority(priority).name.lower()] += 1
+            stats = {
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "active": self._active,
+                "queued": len(self._waiters),
+                "queued_by_priority": queued_by_priority,
+                "admitted": self._admitted,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+                "wait_ms_p50": _percentile_ms(waits, 0.50),
+                "wait_ms_p99": _percentile_ms(waits, 0.99),
+                "avg_service_ms": round(self._service_time * 1000, 1),
+            }
+        return stats
+
+
+def _percentile_ms(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(q * len(sorted_values)))
+    return round(sorted_values[idx] * 1000, 1)
@@ -0,0 +1,55 @@
+"""Per-request deadlines.
+
+A :class:`Deadline` is fixed when a request arrives and travels with it
+through :func:`deadline_scope`, the same way admission priority does. Each
+stage checks the time left: admission waits are capped by it, generation is
+shortened or cancelled, and a request that runs out of time returns what it
+already has instead of failing.
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+
+class DeadlineExceededError(TimeoutError):
+    """A stage could not finish before the request deadline."""
+
+
+@dataclass(frozen=True)
+class Deadline:
+    """A point on the ``time.monotonic()`` clock by which a request must finish."""
+
+    at: float
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        return cls(time.monotonic() + seconds)
+
+    def remaining(self) -> float:
+        """Seconds left, never negative."""
+        return max(0.0, self.at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.at
+
+
+_current_deadline: ContextVar[Deadline | None] = ContextVar("localrag_deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(deadline: Deadline | None) -> Iterator[None]:
+    """Run the enclosed work under the given deadline (``None`` for no limit)."""
+    token = _current_deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _current_deadline.reset(token)
+
+
+def current_deadline() -> Deadline | None:
+    """Return the deadline of the calling context, if any."""
+    return _current_deadline.get()
@@ -0,0 +1,170 @@
+"""Locks for sharing one on-disk index between threads and worker processes."""
+
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """Exclusive lock held across processes via an OS file lock.
+
+    Also serializes threads within a process, which OS file locks alone do
+    not. The lock is blocking and not re-entrant.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._thread_lock = threading.Lock()
+        self._fd: int | None = None
+
+    def __enter__(self) -> "FileLock":
+        self._thread_lock.acquire()
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            else:
+                msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+        except BaseException:
+            self._close()
+            self._thread_lock.release()
+            raise
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            self._close()
+            self._thread_lock.release()
+
+    def _close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class FileSemaphore:
+    """Counting semaphore shared by every process that uses the same directory.
+
+    Each of the ``size`` slots is a lock file that a holder keeps locked, so
+    slots held by a process that dies are freed by the OS. Waiters hold a
+    shared lock on a file for their priority class while they wait; a caller
+    only takes a free slot when no process is waiting with a higher priority
+    (a lower value). Waiting is by polling, every ``poll_interval`` seconds.
+
+    On Windows, where the OS has no shared file locks, slots are still
+    shared but priority between processes is not.
+    """
+
+    def __init__(self, root: Path, size: int, poll_interval: float = 0.02):
+        self.root = root
+        self.size = size
+        self.poll_interval = poll_interval
+        root.mkdir(parents=True, exist_ok=True)
+
+    def acquire(self, priority: int, timeout: float) -> int | None:
+        """Take a slot, waiting up to ``timeout`` seconds.
+
+        Returns:
+            The slot to pass to :meth:`release`, or None on timeout.
+        """
+        deadline = time.monotonic() + max(timeout, 0.0)
+        waiting = self._open(f"waiting-{priority}.lock")
+        try:
+            if fcntl is not None:
+                fcntl.flock(waiting, fcntl.LOCK_SH)
+            while True:
+                if not self._higher_waiting(priority):
+                    for slot in range(self.size):
+                        fd = self._open(f"slot-{slot}.lock")
+                        if _try_lock(fd):
+                            return fd
+                        os.close(fd)
+                if time.monotonic() >= deadline:
+                    return None
+                time.sleep(self.poll_interval)
+        finally:
+            os.close(waiting)
+
+    def release(self, slot: int) -> None:
+        """Give back a slot returned by :meth:`acquire`."""
+        os.close(slot)  # closing the descriptor drops its lock
+
+    def _higher_waiting(self, priority: int) -> bool:
+        if fcntl is None:
+            return False
+        for higher in range(priority):
+            fd = self._open(f"waiting-{higher}.lock")
+            try:
+                # Fails while any process holds its shared "waiting" lock
+                if not _try_lock(fd):
+                    return True
+            finally:
+                os.close(fd)
+        return False
+
+    def _open(self, name: str) -> int:
+        return os.open(self.root / name, os.O_RDWR | os.O_CREAT, 0o644)
+
+
+def _try_lock(fd: int) -> bool:
+    """Take an exclusive lock on ``fd`` without blocking."""
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+class ReadWriteLock:
+    """Many concurrent readers or a single writer, within one process."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writing = False
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        with self._cond:
+            while self._writing:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        with self._cond:
+            while self._writing or self._readers:
+                self._cond.wait()
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
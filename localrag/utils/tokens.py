@@ -0,0 +1,28 @@
+"""Token counting for prompt budgeting."""
+
+from functools import lru_cache
+
+from loguru import logger
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:  # not installed, or the encoding can't be fetched offline
+        logger.debug(f"tiktoken unavailable, estimating tokens from length: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with tiktoken, or estimate at ~4 characters per token.
+
+    Local models use their own tokenizers, so this is an approximation
+    either way; it is meant for budgeting and comparing prompts.
+    """
+    encoding = _encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
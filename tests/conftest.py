@@ -0,0 +1,31 @@
+"""Shared test fixtures."""
+
+import math
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+import localrag.retrieval.engine as engine
+
+
+class FakeEmbeddings(Embeddings):
+    """Cheap deterministic embeddings: texts of equal length embed identically.
+
+    Vectors are unit length and close together, so relevance scores stay in
+    [0, 1] under every distance space.
+    """
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_query(t) for t in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        angle = len(text) % 100 / 100 * math.pi / 4
+        return [math.cos(angle), math.sin(angle), 0.0]
+
+
+@pytest.fixture
+def fake_embeddings(monkeypatch) -> FakeEmbeddings:
+    """Make every retrieval engine built in the test use :class:`FakeEmbeddings`."""
+    embeddings = FakeEmbeddings()
+    monkeypatch.setattr(engine, "create_embedding_function", lambda settings: embeddings)
+    return embeddings
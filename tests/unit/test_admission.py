@@ -0,0 +1,97 @@
+"""Tests for admission control."""
+
+import threading
+import time
+
+import pytest
+
+from localrag.utils.admission import (
+    AdmissionController,
+    AdmissionTimeoutError,
+    Priority,
+    QueueFullError,
+    priority_scope,
+)
+
+
+def _hold(controller: AdmissionController, release: threading.Event) -> threading.Thread:
+    """Occupy one slot in a background thread until ``release`` is set."""
+    acquired = threading.Event()
+
+    def run():
+        with controller.slot():
+            acquired.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    acquired.wait(5)
+    return thread
+
+
+class TestAdmissionController:
+    """Test concurrency limits, queueing and rejection."""
+
+    def test_admits_up_to_limit(self):
+        controller = AdmissionController("test", max_concurrent=2, max_queue=0, timeout=1)
+        with controller.slot(), controller.slot():
+            assert controller.get_stats()["active"] == 2
+        assert controller.get_stats()["active"] == 0
+
+    def test_queue_full_is_rejected(self):
+        controller = AdmissionController("test", max_concurrent=1, max_queue=0, timeout=1)
+        release = threading.Event()
+        holder = _hold(controller, release)
+
+        with pytest.raises(QueueFullError) as exc_info:
+            with controller.slot():
+                pass
+        release.set()
+        holder.join()
+
+        assert exc_info.value.status_code == 429
+        assert exc_info.value.retry_after >= 1
+        assert controller.get_stats()["rejected"] == 1
+
+    def test_wait_times_out(self):
+        controller = AdmissionController("test", max_concurrent=1, max_queue=4, timeout=0.05)
+        release = threading.Event()
+        holder = _hold(controller, release)
+
+        with pytest.raises(AdmissionTimeoutError) as exc_info:
+            with controller.slot():
+                pass
+        release.set()
+        holder.join()
+
+        assert exc_info.value.status_code == 503
+        assert controller.get_stats()["queued"] == 0
+
+    def test_interactive_admitted_before_batch(self):
+        controller = AdmissionController("test", max_concurrent=1, max_queue=4, timeout=5)
+        release = threading.Event()
+        holder = _hold(controller, release)
+        order = []
+
+        def waiter(priority: Priority):
+            with priority_scope(priority), controller.slot():
+                order.append(priority)
+
+        batch = threading.Thread(target=waiter, args=(Priority.BATCH,))
+        batch.start()
+        while controller.get_stats()["queued"] < 1:
+            time.sleep(0.001)
+        interactive = threading.Thread(target=waiter, args=(Priority.INTERACTIVE,))
+        interactive.start()
+        while controller.get_stats()["queued"] < 2:
+            time.sleep(0.001)
+
+        stats = controller.get_stats()
+        assert stats["queued_by_priority"]["batch"] == 1
+        assert stats["queued_by_priority"]["interactive"] == 1
+
+        release.set()
+        for thread in (holder, batch, interactive):
+            thread.join()
+
+        assert order == [Priority.INTERACTIVE, Priority.BATCH]
@@ -0,0 +1,70 @@
+"""Tests for HNSW calibration helpers."""
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+import localrag.retrieval.engine as engine
+from localrag.config import Settings
+from localrag.retrieval import calibration
+
+
+@pytest.mark.usefixtures("fake_embeddings")
+class TestCalibrateIndex:
+    """Test that candidates are measured with their own ef on real Chroma indexes."""
+
+    def test_recall_follows_search_ef(self, tmp_path):
+        settings = Settings(
+            chroma_path=tmp_path,
+            dedup_chunks=False,
+            hnsw_m=4,
+            hnsw_construction_ef=10,
+            hnsw_search_ef=10,
+        )
+        retrieval = engine.RetrievalEngine(settings)
+        vectors = np.random.default_rng(0).random((3000, 32), dtype=np.float32)
+        for start in range(0, len(vectors), 1000):
+            retrieval.collection().add(
+                ids=[f"v{i}" for i in range(start, start + 1000)],
+                embeddings=vectors[start : start + 1000],
+            )
+
+        result = calibration.calibrate_index(
+            retrieval, search_efs=[10, 400], build_params=[(4, 10)], sample_size=50
+        )
+        recall = {
+            (c["M"], c["search_ef"], i > 1): c["recall"] for i, c in enumerate(result["candidates"])
+        }
+        for scratch in (False, True):
+            assert recall[(4, 400, scratch)] >= 0.75
+            assert recall[(4, 400, scratch)] - recall[(4, 10, scratch)] > 0.3
+        assert retrieval.index_params()["search_ef"] == 10
+
+
+@pytest.mark.usefixtures("fake_embeddings")
+class TestSearchEf:
+    """Test applying and calibrating query-time ef on the live collection."""
+
+    def _engine(self, tmp_path, **overrides) -> engine.RetrievalEngine:
+        settings = Settings(chroma_path=tmp_path, dedup_chunks=False, **overrides)
+        return engine.RetrievalEngine(settings)
+
+    def test_unchanged_ef_does_not_write(self, tmp_path):
+        first = self._engine(tmp_path)
+        first.add_documents([Document(page_content="some text")])
+        generation = first._read_generation()
+
+        self._engine(tmp_path)
+        assert first._read_generation() == generation
+
+        changed = self._engine(tmp_path, hnsw_search_ef=50)
+        assert first._read_generation() == generation + 1
+        assert changed.index_params()["search_ef"] == 50
+
+    def test_unapplied_candidates_are_skipped(self, monkeypatch, tmp_path):
+        retrieval = self._engine(tmp_path)
+        retrieval.add_documents([Document(page_content="x" * i) for i in range(1, 20)])
+        monkeypatch.setattr(retrieval, "_modify_search_ef", lambda ef, shards: ef != 20)
+
+        result = calibration.calibrate_index(retrieval, search_efs=[10, 20], sample_size=5, k=3)
+        assert [c["search_ef"] for c in result["candidates"]] == [10]
@@ -0,0 +1,56 @@
+"""Tests for the command-line interface."""
+
+import pytest
+
+from localrag.cli import _read_questions, build_parser
+from localrag.config import Settings
+from localrag.ingestion.pipeline import IngestionPipeline
+
+
+class TestParser:
+    """Test argument parsing for the bulk commands."""
+
+    def test_ingest_options_map_to_settings(self):
+        args = build_parser().parse_args(["ingest", "docs", "--workers", "3"])
+        assert args.ingest_workers == 3
+        assert args.ingest_batch_size is None
+        assert set(args.settings_fields) == {"ingest_workers", "ingest_batch_size"}
+
+    def test_questions_from_file_skip_blank_lines(self, tmp_path):
+        questions = tmp_path / "q.txt"
+        questions.write_text("first?\n\n  second?  \n")
+        args = build_parser().parse_args(["query", "-f", str(questions)])
+        assert _read_questions(args) == ["first?", "second?"]
+
+    def test_query_without_questions_is_an_error(self):
+        args = build_parser().parse_args(["query"])
+        with pytest.raises(ValueError):
+            _read_questions(args)
+
+
+class TestParallelIngestion:
+    """Test that concurrent parsing keeps file order."""
+
+    def test_workers_yield_chunks_in_file_order(self, tmp_path):
+        for i in range(6):
+            (tmp_path / f"doc{i}.txt").write_text(f"document {i}")
+        pipeline = IngestionPipeline(Settings(use_parse_cache=False))
+
+        sequential = [d.page_content for d in pipeline.iter_directory(tmp_path)]
+        parallel = [d.page_content for d in pipeline.iter_directory(tmp_path, workers=3)]
+        assert parallel == sequential == [f"document {i}" for i in range(6)]
+
+    def test_grouped_csvs_stream_outside_the_pool(self, tmp_path, monkeypatch):
+        (tmp_path / "a.txt").write_text("document a")
+        (tmp_path / "b.csv").write_text("name,value\nx,1\ny,2\n")
+        (tmp_path / "c.txt").write_text("document c")
+        pipeline = IngestionPipeline(Settings(use_parse_cache=False, csv_group_rows=True))
+
+        pooled = []
+        parse_chunks = pipeline._parse_chunks
+        monkeypatch.setattr(
+            pipeline, "_parse_chunks", lambda p: pooled.append(p.name) or parse_chunks(p)
+        )
+        chunks = [d.metadata["source"] for d in pipeline.iter_directory(tmp_path, workers=2)]
+        assert sorted(pooled) == ["a.txt", "c.txt"]
+        assert [c.rsplit("/", 1)[-1] for c in dict.fromkeys(chunks)] == ["a.txt", "b.csv", "c.txt"]
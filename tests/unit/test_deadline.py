@@ -0,0 +1,116 @@
+"""Tests for per-request deadlines and graceful degradation."""
+
+import threading
+import time
+
+import pytest
+from langchain_core.documents import Document
+
+import localrag.core as core
+from localrag.config import Settings
+from localrag.llm.base import BaseLLMClient
+from localrag.llm.ollama_client import OllamaClient
+from localrag.utils.admission import AdmissionController, AdmissionTimeoutError
+from localrag.utils.deadline import Deadline, DeadlineExceededError, deadline_scope
+
+
+class _SlowLLM(BaseLLMClient):
+    """Takes ``delay`` seconds, giving up early like a real client would."""
+
+    delay = 0.0
+
+    def generate(self, question: str, context: str, deadline: Deadline | None = None) -> str:
+        finish = time.monotonic() + self.delay
+        while time.monotonic() < finish:
+            if deadline is not None and deadline.expired:
+                raise DeadlineExceededError("cut off")
+            time.sleep(0.01)
+        return "generated"
+
+
+def _rag(monkeypatch, tmp_path, delay: float) -> core.LocalRAG:
+    monkeypatch.setattr(core, "create_llm_client", _SlowLLM)
+    monkeypatch.setattr(_SlowLLM, "delay", delay)
+    rag = core.LocalRAG(chroma_path=tmp_path / "chroma", dedup_chunks=False)
+    rag._retrieval.add_documents([Document(page_content="The fee is $5.")])
+    return rag
+
+
+class TestAdmissionDeadline:
+    """Test that admission waits never outlast the request deadline."""
+
+    def test_wait_is_capped_by_deadline(self):
+        controller = AdmissionController("test", max_concurrent=1, max_queue=4, timeout=30)
+        release = threading.Event()
+        held = threading.Event()
+
+        def hold():
+            with controller.slot():
+                held.set()
+                release.wait(5)
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        held.wait(5)
+        started = time.monotonic()
+        try:
+            with deadline_scope(Deadline.after(0.2)), pytest.raises(AdmissionTimeoutError):
+                with controller.slot():
+                    pass
+        finally:
+            release.set()
+            thread.join()
+        assert time.monotonic() - started < 2
+
+
+@pytest.mark.usefixtures("fake_embeddings")
+class TestQueryDeadline:
+    """Test that queries return sources when the answer can't finish in time."""
+
+    def test_fast_answer_is_not_degraded(self, monkeypatch, tmp_path):
+        answer = _rag(monkeypatch, tmp_path, delay=0).query("fee?", timeout=5)
+        assert answer.text == "generated"
+        assert not answer.degraded
+
+    def test_slow_answer_falls_back_to_sources(self, monkeypatch, tmp_path):
+        rag = _rag(monkeypatch, tmp_path, delay=5)
+        rag.settings.query_min_generation = 0.1
+
+        started = time.monotonic()
+        answer = rag.query("fee?", timeout=0.5)
+        assert time.monotonic() - started < 2
+        assert answer.degraded
+        assert answer.sources[0].chunk_text == "The fee is $5."
+
+    def test_retrieval_timeout_returns_degraded_answer(self, monkeypatch, tmp_path):
+        rag = _rag(monkeypatch, tmp_path, delay=0)
+
+        def saturated(*args, **kwargs):
+            raise AdmissionTimeoutError("embeddings: timed out waiting for a slot", retry_after=1)
+
+        monkeypatch.setattr(rag._retrieval, "search", saturated)
+        answer = rag.query("fee?", timeout=0.5)
+        assert answer.degraded
+        assert answer.sources == []
+        assert "in time" in answer.text
+
+        with pytest.raises(AdmissionTimeoutError):
+            rag.query("fee?")
+
+    def test_generation_skipped_when_budget_is_short(self, monkeypatch, tmp_path):
+        rag = _rag(monkeypatch, tmp_path, delay=0)
+        answer = rag.query("fee?", timeout=0.5)  # below query_min_generation
+        assert answer.degraded
+        assert rag.get_stats()["admission"]["llm"]["admitted"] == 0
+
+
+class TestOllamaPredictBudget:
+    """Test that num_predict shrinks to what fits in the time left."""
+
+    def test_budget_follows_decode_rate(self):
+        client = OllamaClient(Settings(max_tokens=512))
+        assert client._predict_budget(1.0) == 512  # no rate measured yet
+
+        client._record_rate({"eval_count": 100, "eval_duration": 2_000_000_000})
+        assert client._predict_budget(2.0) == 70
+        assert client._predict_budget(60.0) == 512
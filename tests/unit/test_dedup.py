@@ -0,0 +1,124 @@
+"""Tests for boilerplate stripping and near-duplicate detection."""
+
+import hashlib
+import random
+
+from langchain_core.documents import Document
+
+from localrag.config import Settings
+from localrag.ingestion import dedup as dedup_module
+from localrag.ingestion.dedup import ChunkDeduplicator, Fingerprint, strip_repeated_lines
+from localrag.ingestion.pipeline import IngestionPipeline
+
+
+def _text(seed: int, words: int = 120) -> str:
+    rng = random.Random(seed)
+    return " ".join(f"w{rng.randrange(5000)}" for _ in range(words))
+
+
+class TestStripRepeatedLines:
+    """Test header/footer removal across pages."""
+
+    def test_strips_headers_and_numbered_footers(self):
+        bodies = ["Terms apply.", "Payment is due.", "Notice is required.", "Law governs."]
+        pages = [
+            Document(
+                page_content=f"ACME Corp Confidential\n{body}\nPage {i} of 4",
+                metadata={"page": i},
+            )
+            for i, body in enumerate(bodies, start=1)
+        ]
+        stripped = strip_repeated_lines(pages)
+        assert [p.page_content for p in stripped] == bodies
+        assert stripped[0].metadata == {"page": 1}
+
+    def test_keeps_short_documents(self):
+        pages = [Document(page_content="Header\nBody"), Document(page_content="Header\nOther")]
+        assert strip_repeated_lines(pages) == pages
+
+    def test_never_strips_a_pages_only_line_or_body(self):
+        rows = [Document(page_content=f"2024-01-0{i},{i}.5") for i in range(1, 5)]
+        assert strip_repeated_lines(rows) == rows
+
+        pages = [Document(page_content="Header\nSame body\nFooter") for _ in range(4)]
+        assert [p.page_content for p in strip_repeated_lines(pages)] == ["Same body"] * 4
+
+    def test_default_ingestion_keeps_csv_and_single_page_files(self, tmp_path):
+        csv = tmp_path / "values.csv"
+        csv.write_text(
+            "date,value\n2024-01-01,1.5\n2024-01-02,2.5\n2024-01-03,3.5\n2024-01-04,4.5\n"
+        )
+        note = tmp_path / "note.txt"
+        note.write_text("Quarterly report\nRevenue grew 4%.")
+        pipeline = IngestionPipeline(Settings(use_parse_cache=False))
+
+        assert len(pipeline.process_file(csv)) == 4
+        assert [c.page_content for c in pipeline.process_file(note)] == [
+            "Quarterly report\nRevenue grew 4%."
+        ]
+
+
+class TestFingerprint:
+    """Test exact and MinHash fingerprints."""
+
+    def test_exact_hash_ignores_case_and_whitespace(self):
+        assert Fingerprint.of("Hello,  World").exact == Fingerprint.of("hello world").exact
+
+    def test_signature_matches_exact_arithmetic(self):
+        text = "one two three four five six seven"
+        words = text.split()
+        shingles = {" ".join(words[i : i + 5]) for i in range(len(words) - 4)}
+        hashes = [
+            int.from_bytes(hashlib.blake2b(s.encode(), digest_size=4).digest(), "big")
+            for s in shingles
+        ]
+        prime = (1 << 61) - 1
+        expected = [
+            min(((int(a) * x + int(b)) % prime) & 0xFFFFFFFF for x in hashes)
+            for a, b in zip(dedup_module._PERM_A, dedup_module._PERM_B)
+        ]
+        assert Fingerprint.of(text).signature.tolist() == expected
+
+    def test_known_jaccard_similarity(self, tmp_path):
+        # 200 shingles each, 190 shared: Jaccard 190 / 210 = 0.90
+        words = [f"w{i}" for i in range(214)]
+        text, similar = " ".join(words[:204]), " ".join(words[10:])
+        dissimilar = " ".join(f"x{i}" for i in range(204))
+        assert abs(Fingerprint.of(text).similarity(Fingerprint.of(similar).signature) - 0.9) < 0.1
+
+        dedup = ChunkDeduplicator(tmp_path / "dedup.sqlite3", threshold=0.8)
+        dedup.add("c1", "s0", Fingerprint.of(text), {"source_path": "/a.txt"})
+        assert dedup.find(Fingerprint.of(similar), "s0") == "c1"
+        assert dedup.find(Fingerprint.of(dissimilar), "s0") is None
+
+    def test_similarity_tracks_overlap(self):
+        text = _text(1)
+        edited = text.replace(text.split()[60], "edited", 1)
+        assert Fingerprint.of(text).similarity(Fingerprint.of(edited).signature) > 0.8
+        assert Fingerprint.of(text).similarity(Fingerprint.of(_text(2)).signature) < 0.1
+
+
+class TestChunkDeduplicator:
+    """Test the persisted fingerprint index."""
+
+    def test_finds_near_duplicates_within_a_shard(self, tmp_path):
+        dedup = ChunkDeduplicator(tmp_path / "dedup.sqlite3", threshold=0.8)
+        text = _text(3)
+        dedup.add("c1", "s0", Fingerprint.of(text), {"source": "a.pdf", "source_path": "/a.pdf"})
+        dedup.commit()
+
+        words = text.split()
+        words[-1] = "changed"
+        near = Fingerprint.of(" ".join(words))
+        assert dedup.find(near, "s0") == "c1"
+        assert dedup.find(near, "s1") is None
+        assert dedup.find(Fingerprint.of(_text(4)), "s0") is None
+
+    def test_remove_source_reports_affected_chunks(self, tmp_path):
+        dedup = ChunkDeduplicator(tmp_path / "dedup.sqlite3")
+        dedup.add("c1", "s0", Fingerprint.of("shared text"), {"source_path": "/a.pdf"})
+        dedup.add_ref("c1", {"source_path": "/b.pdf"})
+        dedup.commit()
+
+        assert dedup.remove_source("/a.pdf") == ["c1"]
+        assert dedup.refs("c1") == [{"source_path": "/b.pdf"}]
@@ -0,0 +1,164 @@
+"""Tests for the parent section store and small-to-big expansion."""
+
+import pytest
+from langchain_core.documents import Document
+
+import localrag.core as core
+from localrag.ingestion import docstore
+from localrag.ingestion.chunker import SemanticChunker
+from localrag.ingestion.docstore import ParentStore, expand_to_parents
+
+
+def _hit(text: str, parent_id: str, start: int, source: str = "a.txt") -> Document:
+    return Document(
+        page_content=text,
+        metadata={"source": source, "parent_id": parent_id, "parent_start": start},
+    )
+
+
+class TestSplitWithParents:
+    """Test that chunks are cut from parents and point back into them."""
+
+    def test_chunks_locate_their_parent(self):
+        text = "\n\n".join(f"Paragraph {i} has some words in it." for i in range(30))
+        chunker = SemanticChunker(chunk_size=80, chunk_overlap=10, parent_chunk_size=400)
+        parents, chunks = chunker.split_with_parents([Document(page_content=text)])
+
+        assert len(parents) < len(chunks)
+        assert all(len(p.page_content) <= 400 for p in parents)
+        for chunk in chunks:
+            parent = parents[chunk.metadata["parent_index"]].page_content
+            start = chunk.metadata["parent_start"]
+            assert parent[start : start + len(chunk.page_content)] == chunk.page_content
+
+    def test_unlocated_chunk_has_no_offset(self, monkeypatch):
+        chunker = SemanticChunker(chunk_size=80, chunk_overlap=10, parent_chunk_size=400)
+        monkeypatch.setattr(chunker.splitter, "split_text", lambda text: ["not in the text"])
+        _, (chunk,) = chunker.split_with_parents([Document(page_content="Some text.")])
+        assert "parent_start" not in chunk.metadata
+        assert chunk.metadata["parent_index"] == 0
+
+
+class TestParentStore:
+    """Test storage, sharing between files and cleanup."""
+
+    def test_identical_parents_are_stored_once(self, tmp_path):
+        store = ParentStore(tmp_path)
+        first = store.put(["shared section", "only in a"], "/a.txt")
+        second = store.put(["shared section"], "/b.txt")
+
+        assert first[0] == second[0]
+        assert store.get(first + ["missing"]) == {
+            first[0]: "shared section",
+            first[1]: "only in a",
+        }
+        assert store.stats()["parents"] == 2
+
+        assert store.remove_source("/a.txt") == 1
+        assert store.get(first) == {first[0]: "shared section"}
+        assert store.retain(set()) == 1
+        assert store.stats() == {"parents": 0, "bytes": 0}
+
+    def test_compaction_keeps_live_parents_readable(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(docstore, "_COMPACT_MIN_BYTES", 0)
+        store = ParentStore(tmp_path)
+        kept = store.put(["kept text"], "/keep.txt")
+        store.put([f"dropped {i}" for i in range(50)], "/drop.txt")
+        assert store.get(kept) == {kept[0]: "kept text"}
+
+        store.remove_source("/drop.txt")
+        assert [p.name for p in tmp_path.glob("parents-*.bin")] == ["parents-000001.bin"]
+        assert store.get(kept) == {kept[0]: "kept text"}
+        assert ParentStore(tmp_path).get(kept) == {kept[0]: "kept text"}
+
+
+class TestExpandToParents:
+    """Test replacing hits with their parents or nearby text."""
+
+    def test_hits_collapse_into_their_parent(self, tmp_path):
+        store = ParentStore(tmp_path)
+        parent = "alpha beta gamma delta epsilon zeta eta theta"
+        (parent_id,) = store.put([parent], "/a.txt")
+        hits = [
+            _hit("gamma", parent_id, 11),
+            Document(page_content="no parent", metadata={"source": "b.txt"}),
+            _hit("theta", parent_id, 41),
+        ]
+
+        expanded = expand_to_parents(hits, store)
+        assert [d.page_content for d in expanded] == [parent, "no parent"]
+        assert expanded[0].metadata["matched_chunks"] == 2
+
+        windowed = expand_to_parents(hits, store, window=6)
+        assert windowed[0].page_content == "beta gamma delta\n...\neta theta"
+
+    def test_unlocated_hit_expands_to_whole_parent(self, tmp_path):
+        store = ParentStore(tmp_path)
+        parent = "alpha beta gamma delta epsilon zeta eta theta"
+        (parent_id,) = store.put([parent], "/a.txt")
+        unlocated = Document(page_content="theta", metadata={"parent_id": parent_id})
+
+        expanded = expand_to_parents([_hit("gamma", parent_id, 11), unlocated], store, window=6)
+        assert [d.page_content for d in expanded] == [parent]
+
+
+@pytest.mark.usefixtures("fake_embeddings")
+class TestDropShardParents:
+    """Test that dropping a shard removes only its files' parents."""
+
+    def _rag(self, tmp_path) -> tuple[core.LocalRAG, list[tuple[str, str]]]:
+        """A two-shard index and a file name routed to each shard."""
+        rag = core.LocalRAG(
+            chroma_path=tmp_path / "chroma",
+            use_parse_cache=False,
+            shard_by="source",
+            num_shards=2,
+            parent_chunk_size=200,
+        )
+        by_shard = {}
+        for i in range(20):
+            by_shard.setdefault(rag._retrieval.shard_for({"source": f"doc{i}.txt"}), f"doc{i}.txt")
+        return rag, sorted(by_shard.items())
+
+    def test_drop_removes_parents_of_dropped_files(self, monkeypatch, tmp_path):
+        rag, ((dropped, dropped_name), (_, kept_name)) = self._rag(tmp_path)
+        for name in (dropped_name, kept_name):
+            (tmp_path / name).write_text(f"Contents of {name}.")
+            rag.ingest(tmp_path / name)
+
+        scanned = []
+        source_paths = rag._retrieval.source_paths
+        monkeypatch.setattr(
+            rag._retrieval,
+            "source_paths",
+            lambda shards=None: scanned.append(shards) or source_paths(shards),
+        )
+        result = rag.drop_shard(dropped)
+
+        assert scanned == [[dropped]]
+        assert result == {
+            "shard": dropped,
+            "chunks_removed": 1,
+            "files_removed": 1,
+            "parents_removed": 1,
+        }
+        parents = rag._ingestion.parents
+        assert parents.stats()["parents"] == 1
+        assert list(parents.get([parents.key(f"Contents of {kept_name}.")]).values()) == [
+            f"Contents of {kept_name}."
+        ]
+
+    def test_rebuild_stores_only_its_shards_parents(self, tmp_path):
+        rag, ((shard, name), (_, other_name)) = self._rag(tmp_path)
+        docs = tmp_path / "docs"
+        docs.mkdir()
+        (docs / name).write_text(f"Contents of {name}.")
+        rag.ingest(docs / name)
+        # Routed to the other shard, so the rebuild must skip it entirely
+        (docs / other_name).write_text(f"Contents of {other_name}.")
+        before = rag.get_stats()["parents"]
+
+        summary = rag.rebuild_shard(shard, docs)
+
+        assert summary["chunks_stored"] == 1
+        assert rag.get_stats()["parents"] == before
@@ -0,0 +1,62 @@
+"""Tests for retrieval evaluation metrics and sweep helpers."""
+
+import pytest
+
+from localrag.config import Settings
+from localrag.evaluation.metrics import ndcg_at_k, recall_at_k, reciprocal_rank
+from localrag.evaluation.sweep import INDEX_FIELDS, SweepResult, expand_grid, select_cheapest
+
+
+class TestMetrics:
+    """Test recall@k, MRR and nDCG."""
+
+    def test_recall_counts_each_source_once(self):
+        retrieved = ["a.pdf", "a.pdf", "x.pdf", "b.pdf"]
+        assert recall_at_k(retrieved, {"a.pdf", "b.pdf"}, k=4) == 1.0
+        assert recall_at_k(retrieved, {"a.pdf", "b.pdf"}, k=2) == 0.5
+
+    def test_reciprocal_rank(self):
+        assert reciprocal_rank(["x", "y", "a"], {"a"}, k=3) == pytest.approx(1 / 3)
+        assert reciprocal_rank(["x", "y", "a"], {"a"}, k=2) == 0.0
+
+    def test_ndcg_perfect_and_partial(self):
+        assert ndcg_at_k(["a", "b", "x"], {"a", "b"}, k=3) == pytest.approx(1.0)
+        assert 0 < ndcg_at_k(["x", "a", "b"], {"a", "b"}, k=3) < 1.0
+
+
+def _result(config: dict, recall: float, tokens: float) -> SweepResult:
+    return SweepResult(
+        config=config,
+        recall_at_k=recall,
+        mrr=recall,
+        ndcg_at_k=recall,
+        index_chunks=0,
+        index_bytes=0,
+        ingest_seconds=0.0,
+        latency_ms_p50=0.0,
+        latency_ms_p95=0.0,
+        prompt_tokens=tokens,
+    )
+
+
+class TestSweep:
+    """Test grid expansion and configuration selection."""
+
+    def test_expand_grid(self):
+        configs = expand_grid({"chunk_size": [256, 512], "top_k": [3, 5]})
+        assert len(configs) == 4
+        assert configs[0] == {"chunk_size": 256, "top_k": 3}
+
+    def test_index_fields_cover_index_layout(self):
+        assert set(INDEX_FIELDS) <= set(Settings.model_fields)
+        for field_name in ("hnsw_m", "hnsw_construction_ef", "shard_by", "num_shards"):
+            assert field_name in INDEX_FIELDS
+
+    def test_select_cheapest_meeting_bar(self):
+        results = [
+            _result({"top_k": 10}, recall=0.95, tokens=4000),
+            _result({"top_k": 5}, recall=0.90, tokens=2000),
+            _result({"top_k": 3}, recall=0.70, tokens=1200),
+        ]
+        assert select_cheapest(results, min_recall=0.85).config == {"top_k": 5}
+        assert select_cheapest(results, min_recall=0.99) is None
@@ -0,0 +1,29 @@
+"""Tests for prompt layout and Ollama context sizing."""
+
+from localrag.config import Settings
+from localrag.llm.ollama_client import OllamaClient
+from localrag.llm.prompts import build_messages
+
+
+class TestBuildMessages:
+    """Test that the prompt prefix is stable across requests."""
+
+    def test_system_message_does_not_depend_on_request(self):
+        first = build_messages("What is the fee?", "[Source: a.pdf, Page: 1]\nThe fee is $5.")
+        second = build_messages("Who signed?", "[Source: b.pdf, Page: 9]\nSigned by Bo.")
+        assert first[0] == second[0]
+        assert "Who signed?" in second[1]["content"]
+
+
+class TestOllamaContextWindow:
+    """Test that num_ctx comes from a fixed ladder of sizes, up to the cap."""
+
+    def test_size_depends_only_on_the_request(self):
+        settings = Settings(ollama_num_ctx=2048, ollama_num_ctx_max=8192, max_tokens=512)
+        client = OllamaClient(settings)
+        assert client._fit_context(500) == 2048
+        assert client._fit_context(6000) == 8192
+        assert client._fit_context(2000) == 4096
+        assert client._fit_context(100) == 2048
+        assert client._fit_context(50_000) == 8192
+        assert OllamaClient(settings)._fit_context(2000) == 4096
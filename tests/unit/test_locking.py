@@ -0,0 +1,102 @@
+"""Tests for index locks."""
+
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from localrag.utils import locking
+from localrag.utils.admission import AdmissionController, AdmissionTimeoutError
+from localrag.utils.locking import FileLock, FileSemaphore, ReadWriteLock
+
+
+class TestFileLock:
+    """Test exclusive file locking."""
+
+    def test_excludes_threads(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            lock = FileLock(Path(tmp) / ".write.lock")
+            inside = []
+
+            def worker():
+                with lock:
+                    inside.append(1)
+                    assert len(inside) == 1
+                    time.sleep(0.01)
+                    inside.pop()
+
+            threads = [threading.Thread(target=worker) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            assert not inside
+
+
+class TestFileSemaphore:
+    """Test slots and priority shared through a directory of lock files."""
+
+    def test_slots_are_shared_between_instances(self, tmp_path):
+        # Separate instances stand in for separate processes
+        first, second = FileSemaphore(tmp_path, 1), FileSemaphore(tmp_path, 1)
+        slot = first.acquire(priority=0, timeout=1)
+        assert slot is not None
+        assert second.acquire(priority=0, timeout=0.05) is None
+        first.release(slot)
+        second.release(second.acquire(priority=0, timeout=1))
+
+    @pytest.mark.skipif(locking.fcntl is None, reason="needs shared file locks")
+    def test_higher_priority_waiter_goes_first(self, tmp_path):
+        semaphore = FileSemaphore(tmp_path, 2)
+        # Another process waiting with priority 0
+        waiting = os.open(tmp_path / "waiting-0.lock", os.O_RDWR | os.O_CREAT)
+        locking.fcntl.flock(waiting, locking.fcntl.LOCK_SH)
+        try:
+            assert semaphore.acquire(priority=2, timeout=0.05) is None
+            semaphore.release(semaphore.acquire(priority=0, timeout=1))
+        finally:
+            os.close(waiting)
+        semaphore.release(semaphore.acquire(priority=2, timeout=1))
+
+    def test_controllers_share_the_limit(self, tmp_path):
+        controllers = [
+            AdmissionController(
+                "test",
+                max_concurrent=1,
+                max_queue=4,
+                timeout=0.05,
+                shared=FileSemaphore(tmp_path, 1),
+            )
+            for _ in range(2)
+        ]
+        with controllers[0].slot(), pytest.raises(AdmissionTimeoutError):
+            with controllers[1].slot():
+                pass
+        assert controllers[1].get_stats()["active"] == 0
+        assert controllers[1].get_stats()["timed_out"] == 1
+
+
+class TestReadWriteLock:
+    """Test shared readers and exclusive writers."""
+
+    def test_writer_waits_for_readers(self):
+        lock = ReadWriteLock()
+        events = []
+
+        def writer():
+            with lock.write():
+                events.append("write")
+
+        with lock.read():
+            thread = threading.Thread(target=writer)
+            thread.start()
+            time.sleep(0.02)
+            with lock.read():
+                events.append("read")
+        thread.join()
+
+        assert events == ["read", "write"]
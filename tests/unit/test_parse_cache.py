@@ -0,0 +1,50 @@
+"""Tests for the parsed-text cache."""
+
+import tempfile
+from pathlib import Path
+
+from langchain_core.documents import Document
+
+from localrag.ingestion import cache as cache_module
+from localrag.ingestion.cache import ParsedTextCache, file_sha256
+
+
+class TestParsedTextCache:
+    """Test cache round-trips and invalidation."""
+
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ParsedTextCache(Path(tmp))
+            docs = [Document(page_content="page one", metadata={"source": "a.pdf", "page": 1})]
+
+            assert cache.get(Path("a.pdf"), "abc") is None
+            cache.put(Path("a.pdf"), "abc", docs)
+
+            cached = cache.get(Path("a.pdf"), "abc")
+            assert cached[0].page_content == "page one"
+            assert cached[0].metadata["page"] == 1
+
+    def test_same_content_under_new_name(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ParsedTextCache(Path(tmp))
+            docs = [Document(page_content="x", metadata={"source": "a.pdf"})]
+            cache.put(Path("a.pdf"), "abc", docs)
+
+            cached = cache.get(Path("renamed.pdf"), "abc")
+            assert cached[0].metadata["source"] == "renamed.pdf"
+
+    def test_parser_version_invalidates(self, monkeypatch):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ParsedTextCache(Path(tmp))
+            cache.put(Path("a.pdf"), "abc", [Document(page_content="x", metadata={})])
+
+            monkeypatch.setattr(cache_module, "PARSER_VERSION", cache_module.PARSER_VERSION + 1)
+            assert cache.get(Path("a.pdf"), "abc") is None
+
+    def test_file_hash_tracks_content(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "doc.txt"
+            path.write_text("one")
+            first = file_sha256(path)
+            path.write_text("two")
+            assert file_sha256(path) != first
@@ -3,7 +3,31 @@
 import tempfile
 from pathlib import Path
 
-from localrag.ingestion.parsers import parse_file
+from pypdf import PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+from localrag.ingestion.parsers import ParseOptions, iter_csv_documents, parse_file
+
+
+def _write_pdf(path: Path, pages: int) -> None:
+    """Write a PDF whose page ``i`` reads "Page number i"."""
+    writer = PdfWriter()
+    font = DictionaryObject(
+        {
+            NameObject("/Type"): NameObject("/Font"),
+            NameObject("/Subtype"): NameObject("/Type1"),
+            NameObject("/BaseFont"): NameObject("/Helvetica"),
+        }
+    )
+    for i in range(pages):
+        page = writer.add_blank_page(612, 792)
+        page[NameObject("/Resources")] = DictionaryObject(
+            {NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})}
+        )
+        content = DecodedStreamObject()
+        content.set_data(f"BT /F1 12 Tf 72 720 Td (Page number {i}) Tj ET".encode())
+        page.replace_contents(content)
+    writer.write(path)
 
 
 class TestTextParser:
@@ -42,3 +66,45 @@ class TestCSVParser:
             assert len(docs) == 2
             assert "Alice" in docs[0].page_content
             assert docs[0].metadata["row"] == 1
+
+    def test_grouped_csv_repeats_header(self):
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".csv", delete=False) as f:
+            f.write("name,age,city\nAlice,30,NYC\nBob,25,LA\n")
+            f.flush()
+
+            docs = parse_file(Path(f.name), ParseOptions(csv_group_rows=True))
+            assert len(docs) == 1
+            assert docs[0].page_content.splitlines()[0] == "name | age | city"
+            assert docs[0].metadata["row_start"] == 1
+            assert docs[0].metadata["row_end"] == 2
+
+    def test_grouped_csv_respects_max_chars(self):
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".csv", delete=False) as f:
+            f.write("id,value\n")
+            for i in range(100):
+                f.write(f"{i},row-{i}\n")
+            f.flush()
+
+            docs = list(iter_csv_documents(Path(f.name), max_chars=60))
+            assert all(len(d.page_content) <= 60 for d in docs)
+            assert all(d.page_content.startswith("id | value") for d in docs)
+            assert docs[0].metadata["row_start"] == 1
+            assert docs[-1].metadata["row_end"] == 100
+            # Row ranges are contiguous
+            for prev, cur in zip(docs, docs[1:]):
+                assert cur.metadata["row_start"] == prev.metadata["row_end"] + 1
+
+
+class TestPDFParser:
+    """Test PDF text extraction."""
+
+    def test_parallel_extraction_matches_serial(self, tmp_path):
+        pdf = tmp_path / "report.pdf"
+        _write_pdf(pdf, pages=12)
+
+        serial = parse_file(pdf)
+        parallel = parse_file(pdf, ParseOptions(pdf_workers=2, pdf_parallel_min_pages=4))
+        assert [d.page_content for d in serial] == [f"Page number {i}" for i in range(12)]
+        assert [(d.page_content, d.metadata) for d in parallel] == [
+            (d.page_content, d.metadata) for d in serial
+        ]
@@ -0,0 +1,48 @@
+"""Tests for shard routing."""
+
+import pytest
+
+from localrag.config import Settings
+from localrag.retrieval.sharding import ShardRouter, relevance_from_distance
+
+
+class TestShardRouter:
+    """Test mapping chunk metadata to shard collections."""
+
+    def test_unsharded_uses_collection_name(self):
+        router = ShardRouter(Settings(shard_by="none"))
+        assert router.shard_for({"source": "a.pdf"}) == "localrag_docs"
+        assert router.initial_shards() == ["localrag_docs"]
+        assert router.is_shard("localrag_docs")
+        assert not router.is_shard("localrag_docs-s000")
+
+    def test_source_hash_is_stable_and_in_range(self):
+        router = ShardRouter(Settings(shard_by="source", num_shards=3))
+        shards = {router.shard_for({"source": f"file{i}.pdf"}) for i in range(50)}
+        assert shards == set(router.initial_shards())
+        assert router.shard_for({"source": "x.pdf"}) == router.shard_for({"source": "x.pdf"})
+
+    def test_date_shards_by_year(self):
+        router = ShardRouter(Settings(shard_by="date"))
+        name = router.shard_for({"doc_date": "2017-03-09"})
+        assert name == "localrag_docs-y2017"
+        assert router.is_shard(name)
+        assert not router.is_shard("localrag_docs-s001")
+        assert router.shard_year(name) == 2017
+        assert router.initial_shards() == []
+
+    def test_foreign_collections_are_not_shards(self):
+        router = ShardRouter(Settings(shard_by="source"))
+        assert not router.is_shard("localrag_docs-calibrate-m32-ef200")
+        assert not router.is_shard("other-s000")
+
+
+class TestRelevanceFromDistance:
+    """Test the merge score matches LangChain's per-space conversion."""
+
+    @pytest.mark.parametrize(
+        ("space", "distance", "expected"),
+        [("cosine", 0.25, 0.75), ("l2", 0.0, 1.0), ("ip", 0.4, 0.6), ("ip", -0.5, 0.5)],
+    )
+    def test_conversion(self, space, distance, expected):
+        assert relevance_from_distance(distance, space) == pytest.approx(expected)
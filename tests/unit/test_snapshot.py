@@ -0,0 +1,89 @@
+"""Tests for index snapshot files."""
+
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import localrag.core as core
+from localrag.retrieval.snapshot import Snapshot, build_manifest, read_snapshot, write_snapshot
+
+
+class TestSnapshotFile:
+    """Test snapshot serialization."""
+
+    def test_round_trip(self):
+        embeddings = np.random.default_rng(0).random((3, 4), dtype=np.float32)
+        snapshot = Snapshot(
+            manifest=build_manifest("docs", "local:nomic-embed-text", count=3, dim=4),
+            ids=["a", "b", "ç"],
+            documents=["first", "", "dritter Absatz — ünïcode"],
+            metadatas=[{"source": "a.pdf", "page": 1}, {}, {"source": "c.csv", "row_start": 4}],
+            embeddings=embeddings,
+            refs=[[{"source": "a.pdf"}, {"source": "b.pdf"}], [], [{"source": "c.csv"}]],
+            parents={"p1": "a parent section", "p2": "zweiter Abschnitt — ünïcode"},
+        )
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "index.npz"
+            write_snapshot(path, snapshot)
+            loaded = read_snapshot(path)
+
+        assert loaded.ids == snapshot.ids
+        assert loaded.documents == snapshot.documents
+        assert loaded.metadatas == snapshot.metadatas
+        assert loaded.refs == snapshot.refs
+        assert loaded.parents == snapshot.parents
+        assert loaded.manifest["embed_model"] == "local:nomic-embed-text"
+        np.testing.assert_array_equal(loaded.embeddings, embeddings)
+
+    def test_rejects_foreign_npz(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "other.npz"
+            np.savez(path, x=np.zeros(3))
+            with pytest.raises(ValueError, match="not a LocalRAG snapshot"):
+                read_snapshot(path)
+
+
+@pytest.mark.usefixtures("fake_embeddings")
+class TestSnapshotImport:
+    """Test loading a snapshot into a fresh replica."""
+
+    def test_duplicate_sources_survive_import(self, tmp_path):
+        primary = core.LocalRAG(chroma_path=tmp_path / "primary", use_parse_cache=False)
+        text = "The same paragraph appears in both files, word for word."
+        for name in ("a.txt", "b.txt"):
+            (tmp_path / name).write_text(text)
+            primary.ingest(tmp_path / name)
+        assert primary.get_stats()["total_chunks"] == 1
+        primary.export_snapshot(tmp_path / "index.npz")
+
+        replica = core.LocalRAG(chroma_path=tmp_path / "replica", use_parse_cache=False)
+        replica.import_snapshot(tmp_path / "index.npz")
+        assert replica.delete_document(tmp_path / "a.txt") == 0
+
+        stored = replica._retrieval.collection().get()
+        assert stored["documents"] == [text]
+        assert stored["metadatas"][0]["source_path"] == str(tmp_path / "b.txt")
+
+    def test_parents_survive_import(self, tmp_path):
+        settings = {
+            "use_parse_cache": False,
+            "chunk_size": 40,
+            "chunk_overlap": 0,
+            "parent_chunk_size": 400,
+        }
+        primary = core.LocalRAG(chroma_path=tmp_path / "primary", **settings)
+        text = "First paragraph of the file.\n\nSecond paragraph of the file."
+        (tmp_path / "a.txt").write_text(text)
+        primary.ingest(tmp_path / "a.txt")
+        primary.export_snapshot(tmp_path / "index.npz")
+
+        replica = core.LocalRAG(chroma_path=tmp_path / "replica", **settings)
+        replica.import_snapshot(tmp_path / "index.npz")
+        assert replica.get_stats()["parents"] == primary.get_stats()["parents"]
+        assert [d.page_content for d in replica.retrieve("paragraph")] == [text]
+
+        replica.delete_document(tmp_path / "a.txt")
+        assert replica.get_stats()["parents"]["parents"] == 0
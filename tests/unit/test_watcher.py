@@ -0,0 +1,135 @@
+"""Tests for the watch-folder incremental ingestion."""
+
+from pathlib import Path
+
+import pytest
+
+import localrag.core as core
+from localrag.config import Settings
+from localrag.ingestion.watcher import FolderWatcher
+
+
+class _FakeRAG:
+    """Records ingest/delete calls instead of touching an index."""
+
+    def __init__(self):
+        self.settings = Settings()
+        self.chunks: dict[str, int] = {}
+
+    def ingest(self, path: str) -> dict:
+        self.chunks[path] = 1
+        return {"chunks_stored": 1}
+
+    def replace_document(self, path: str) -> dict:
+        if Path(path).read_text() == "broken":
+            raise ValueError("cannot parse")
+        return {**self.ingest(path), "chunks_removed": 1}
+
+    def delete_document(self, path: str) -> int:
+        return self.chunks.pop(path, 0)
+
+    def get_stats(self) -> dict:
+        return {"total_chunks": len(self.chunks)}
+
+
+def _watcher(rag: _FakeRAG, root: Path, cursor: Path, debounce: float = 0) -> FolderWatcher:
+    return FolderWatcher(rag, [root], cursor_path=cursor, debounce=debounce, use_events=False)
+
+
+class TestFolderWatcher:
+    """Test reconciliation against the persisted cursor."""
+
+    def test_restart_only_processes_changes(self, tmp_path):
+        root, cursor = tmp_path / "inbox", tmp_path / "cursor.json"
+        root.mkdir()
+        (root / "a.txt").write_text("a")
+        (root / "b.txt").write_text("b")
+        (root / "skip.bin").write_text("x")
+        rag = _FakeRAG()
+
+        watcher = _watcher(rag, root, cursor)
+        watcher._reconcile()
+        assert [c["action"] for c in watcher.flush()] == ["added", "added"]
+
+        # Unchanged files are not re-ingested after a restart
+        watcher = _watcher(rag, root, cursor)
+        watcher._reconcile()
+        assert watcher.flush() == []
+
+        (root / "a.txt").unlink()
+        (root / "c.txt").write_text("c")
+        watcher = _watcher(rag, root, cursor)
+        watcher._reconcile()
+        changes = {Path(c["path"]).name: c["action"] for c in watcher.flush()}
+        assert changes == {"a.txt": "deleted", "c.txt": "added"}
+        assert sorted(Path(p).name for p in rag.chunks) == ["b.txt", "c.txt"]
+
+    def test_recent_changes_wait_for_debounce(self, tmp_path):
+        root = tmp_path / "inbox"
+        root.mkdir()
+        rag = _FakeRAG()
+        watcher = _watcher(rag, root, tmp_path / "cursor.json", debounce=60)
+        watcher._reconcile()
+
+        (root / "new.txt").write_text("new")
+        watcher._poll()
+        assert watcher.flush() == []
+        assert [c["action"] for c in watcher.flush(force=True)] == ["added"]
+
+    def test_failed_update_is_retried_as_update(self, tmp_path):
+        root = tmp_path / "inbox"
+        root.mkdir()
+        (root / "a.txt").write_text("a")
+        rag = _FakeRAG()
+        watcher = _watcher(rag, root, tmp_path / "cursor.json")
+        watcher._reconcile()
+        watcher.flush()
+
+        (root / "a.txt").write_text("broken")
+        watcher._poll()
+        assert [c["action"] for c in watcher.flush(force=True)] == ["failed"]
+
+        (root / "a.txt").write_text("fixed")
+        watcher._poll()
+        assert [c["action"] for c in watcher.flush(force=True)] == ["updated"]
+
+
+@pytest.mark.usefixtures("fake_embeddings")
+class TestReplaceDocument:
+    """Test that re-ingesting a changed file never loses its old chunks."""
+
+    def _rag(self, tmp_path) -> core.LocalRAG:
+        return core.LocalRAG(
+            chroma_path=tmp_path / "chroma",
+            use_parse_cache=False,
+            chunk_size=40,
+            chunk_overlap=0,
+            parent_chunk_size=200,
+        )
+
+    def _texts(self, rag: core.LocalRAG) -> list[str]:
+        return sorted(rag._retrieval.collection().get()["documents"])
+
+    def test_failed_ingest_keeps_old_chunks(self, monkeypatch, tmp_path):
+        rag = self._rag(tmp_path)
+        doc = tmp_path / "a.txt"
+        doc.write_text("First paragraph stays.\n\nSecond paragraph goes.")
+        rag.ingest(doc)
+        before = self._texts(rag)
+
+        doc.write_text("First paragraph stays.\n\nThird paragraph arrives.")
+        with monkeypatch.context() as m, pytest.raises(RuntimeError):
+            m.setattr(rag._retrieval, "add_documents", _raise)
+            rag.replace_document(doc)
+        assert self._texts(rag) == before
+        assert rag._retrieval.source_paths() == {str(doc.resolve())}
+
+        summary = rag.replace_document(doc)
+        assert summary["chunks_removed"] == 1
+        assert self._texts(rag) == ["First paragraph stays.", "Third paragraph arrives."]
+        assert rag._retrieval.source_paths() == {str(doc.resolve())}
+        assert rag._ingestion.parents.stats()["parents"] == 1
+
+
+def _raise(*args, **kwargs):
+    raise RuntimeError("embedding backend down")